@@ -0,0 +1,109 @@
+"""Benchmark the comparison of spans used in verification.
+
+This compares verification.same_span with the previous implementation, which computed the
+rank of each table and of the two tables stacked together. The tables are tabulations of
+tensor product polynomial spaces at the verification points, which have the same shapes as
+the tables of the largest scalar- and vector-valued examples on each cell.
+
+Run this script from the root of the repository: python -m benchmarks.same_span
+"""
+
+import argparse
+import timeit
+import typing
+
+import numpy as np
+
+from defelement.tools import Array
+from defelement.verification import points, same_span
+
+parser = argparse.ArgumentParser(description="Benchmark verification.same_span")
+parser.add_argument('--repeats', metavar="repeats", default="10",
+                    help="The number of times to run each comparison.")
+args = parser.parse_args()
+
+# The reference cell, the value size, and the polynomial degree in each direction
+cases = [
+    ("quadrilateral", 1, 4),
+    ("quadrilateral", 2, 4),
+    ("hexahedron", 1, 2),
+    ("hexahedron", 3, 2),
+    ("hexahedron", 1, 4),
+    ("hexahedron", 3, 3),
+    ("hexahedron", 3, 4),
+]
+
+
+def same_span_matrix_rank(table0: Array, table1: Array, complete: bool = True) -> bool:
+    """Check if two tables span the same space using the previous implementation.
+
+    Args:
+        table0: First table
+        table1: Second table
+        complete: Should the tables have full rank?
+
+    Returns:
+        True if span is the same, otherwise False
+    """
+    if table0.shape != table1.shape:
+        return False
+
+    ndofs = table0.shape[-1]
+    table0 = table0.reshape(-1, ndofs)
+    table1 = table1.reshape(-1, ndofs)
+
+    rank0 = np.linalg.matrix_rank(table0)
+    rank1 = np.linalg.matrix_rank(table1)
+    if complete and rank0 != ndofs:
+        return False
+
+    if rank0 != rank1:
+        return False
+
+    stack = np.hstack([table0, table1])
+    srank = np.linalg.matrix_rank(stack)
+    return rank0 == srank
+
+
+def tabulate(ref: str, value_size: int, degree: int) -> Array:
+    """Tabulate a tensor product polynomial space at the verification points.
+
+    Args:
+        ref: The reference cell
+        value_size: The value size
+        degree: The polynomial degree in each direction
+
+    Returns:
+        The table
+    """
+    pts = points(ref)
+    scalar = np.ones((pts.shape[0], 1))
+    for d in range(pts.shape[1]):
+        powers = np.stack([pts[:, d] ** i for i in range(degree + 1)], axis=1)
+        scalar = (scalar[:, :, None] * powers[:, None, :]).reshape(pts.shape[0], -1)
+    ndofs = scalar.shape[1] * value_size
+    table = np.zeros((pts.shape[0], value_size, ndofs))
+    for v in range(value_size):
+        table[:, v, v * scalar.shape[1]: (v + 1) * scalar.shape[1]] = scalar
+    return table
+
+
+rng = np.random.default_rng(0)
+repeats = int(args.repeats)
+total: typing.Dict[str, float] = {"old": 0.0, "new": 0.0}
+print(f"{'Space':<30}{'Shape':>18}{'Old (ms)':>10}{'New (ms)':>10}{'Speedup':>9}")
+for ref, value_size, degree in cases:
+    table0 = tabulate(ref, value_size, degree)
+    ndofs = table0.shape[-1]
+    table1 = table0 @ (rng.random((ndofs, ndofs)) + ndofs * np.eye(ndofs))
+
+    assert same_span(table0, table1) and same_span_matrix_rank(table0, table1)
+    old = timeit.timeit(lambda: same_span_matrix_rank(table0, table1), number=repeats) / repeats
+    new = timeit.timeit(lambda: same_span(table0, table1), number=repeats) / repeats
+    total["old"] += old
+    total["new"] += new
+    name = f"{ref} Q{degree}" + ("" if value_size == 1 else f" ({value_size} components)")
+    print(f"{name:<30}{str(table0.shape):>18}{1000 * old:>10.2f}{1000 * new:>10.2f}"
+          f"{old / new:>8.2f}x")
+print(f"{'Total':<48}{1000 * total['old']:>10.2f}{1000 * total['new']:>10.2f}"
+      f"{total['old'] / total['new']:>8.2f}x")
@@ -1,25 +1,32 @@
 """Build DefElement website."""
 
 import argparse
+import functools
 import json
 import os
+import sys
 import typing
 from datetime import datetime
 
 import symfem
-from symfem import create_element
 
-from defelement import plotting, settings
+from defelement import plotting, settings, staging
+from defelement.cache import create_element
 from defelement.citations import make_bibtex, markup_citation
-from defelement.element import Categoriser
+from defelement.element import Categoriser, Element
 from defelement.examples import markup_example
 from defelement.families import keys_and_names
 from defelement.html import make_html_page
 from defelement.implementations import implementations, parse_example, verifications
+from defelement.manifest import html_hash, manifest
 from defelement.markup import (cap_first, heading_with_self_ref, insert_links, markup,
                                python_highlight)
 from defelement.rss import make_rss
-from defelement.tools import comma_and_join, html_local, insert_author_info, parse_metadata
+from defelement.scheduling import TimingDatabase, run_targets, run_tasks
+from defelement.shards import in_shard, parse_shard, unsharded
+from defelement.tools import (comma_and_join, hash_data, hash_files, html_local, insert_author_info,
+                              parse_metadata)
+from defelement.watch import watch
 
 start_all = datetime.now()
 
@@ -34,33 +41,93 @@ parser.add_argument('--processes', metavar="processes", default=None,
                     help="The number of processes to run the building of examples on.")
 parser.add_argument('--verification-json', metavar="verification_json", default=None,
                     help="Provide a verification JSON.")
+parser.add_argument('--only', metavar="only", default=None,
+                    help="Comma separated list of targets to build.")
+parser.add_argument('--skip', metavar="skip", default=None,
+                    help="Comma separated list of targets not to build.")
+parser.add_argument('--shard', metavar="shard", default=None,
+                    help="Only build the examples and images in shard i of N, given as i/N.")
+parser.add_argument('--reproducible', action="store_true",
+                    help="Use the time the source files were last changed as the date of the "
+                    "build, so that building the same source always gives the same output.")
+parser.add_argument('--watch', action="store_true",
+                    help="Serve the website and rebuild it when source files change.")
+parser.add_argument('--port', metavar="port", default="8000",
+                    help="The port to serve the website on when using --watch.")
 
 sitemap = {}
 
 
-def write_html_page(path: str, title: str, content: str):
+def write_html_page(
+    path: str, title: str, content: str, input_hash: typing.Optional[str] = None,
+    files: typing.List[str] = [], pages: typing.Optional[typing.Dict[str, str]] = None
+):
     """Write a HTML page.
 
     Args:
         path: Page path
         title: Page title
         content: Page content
+        input_hash: Hash of the inputs the page is built from, or None if the page should
+            always be rebuilt
+        files: Additional files written alongside the page
+        pages: The sitemap entries to add the page to. If this is None, the page is added
+            to the sitemap
     """
     global sitemap
-    assert html_local(path) not in sitemap
-    sitemap[html_local(path)] = title
+    if pages is None:
+        pages = sitemap
+    assert html_local(path) not in pages
+    pages[html_local(path)] = title
     with open(path, "w") as f:
         f.write(make_html_page(content, title))
+    manifest.record(html_local(path), input_hash, title, files=files, uses=manifest.pop_used())
 
 
-args = parser.parse_args()
-if args.destination is not None:
-    settings.html_path = args.destination
+def html_page_up_to_date(
+    path: str, input_hash: str, pages: typing.Optional[typing.Dict[str, str]] = None
+) -> bool:
+    """Check if a HTML page from a previous build is up to date.
+
+    If the page is up to date, it is added to the sitemap.
+
+    Args:
+        path: Page path
+        input_hash: Hash of the inputs the page is built from
+        pages: The sitemap entries to add the page to. If this is None, the page is added
+            to the sitemap
+
+    Returns:
+        True if the page is up to date, otherwise False
+    """
+    if pages is None:
+        pages = sitemap
+    if manifest.up_to_date(html_local(path), input_hash):
+        title = manifest.title(html_local(path))
+        assert title is not None
+        assert html_local(path) not in pages
+        pages[html_local(path)] = title
+        return True
+    return False
+
+
+def set_html_path(path: str):
+    """Set the folder that the HTML files are written to.
+
+    Args:
+        path: The folder
+    """
+    settings.html_path = path
     settings.htmlelement_path = os.path.join(settings.html_path, "elements")
     settings.htmlimg_path = os.path.join(settings.html_path, "img")
     settings.htmlindices_path = os.path.join(settings.html_path, "lists")
     settings.htmlfamilies_path = os.path.join(settings.html_path, "families")
 
+
+args = parser.parse_args()
+if args.destination is not None:
+    set_html_path(args.destination)
+
 if args.processes is not None:
     settings.processes = int(args.processes)
 
@@ -70,6 +137,15 @@ if args.github_token is not None:
 if args.verification_json is not None:
     settings.verification_json = args.verification_json
 
+if args.reproducible:
+    settings.reproducible = True
+
+if args.shard is not None:
+    try:
+        settings.shard = parse_shard(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+
 if args.test is None:
     test_elements = None
 elif args.test == "auto":
@@ -80,43 +156,59 @@ elif args.test == "auto":
 else:
     test_elements = args.test.split(",")
 
+if args.watch:
+    build_command = [sys.executable, os.path.abspath(__file__), settings.html_path]
+    for arg in ["test", "github_token", "processes", "verification_json", "skip", "shard"]:
+        if getattr(args, arg) is not None:
+            build_command += [f"--{arg.replace('_', '-')}", getattr(args, arg)]
+    if args.reproducible:
+        build_command.append("--reproducible")
+    # The targets selected using --only are passed to the build command by watch
+    watch(build_command, int(args.port), only=None if args.only is None else args.only.split(","))
+    sys.exit()
+
 # Prepare paths
-if os.path.isdir(settings.html_path):
-    os.system(f"rm -rf {settings.html_path}")
-os.mkdir(settings.html_path)
-os.mkdir(settings.htmlelement_path)
-os.mkdir(settings.htmlindices_path)
-os.mkdir(settings.htmlfamilies_path)
-os.mkdir(settings.htmlimg_path)
-os.mkdir(os.path.join(settings.html_path, "badges"))
+# The website is built in a staging folder, which replaces the output folder at the end of the
+# build. Outputs from the previous build are kept and only rebuilt if their inputs have changed.
+output_path = settings.html_path
+set_html_path(staging.prepare(output_path))
+for path in [
+    settings.html_path, settings.htmlelement_path, settings.htmlindices_path,
+    settings.htmlfamilies_path, settings.htmlimg_path, os.path.join(settings.html_path, "badges"),
+    os.path.join(settings.htmlelement_path, "bibtex"),
+    os.path.join(settings.htmlelement_path, "examples"),
+]:
+    os.makedirs(path, exist_ok=True)
+manifest.load(os.path.join(settings.html_path, ".manifest.json"), output_path)
 
 os.system(f"cp -r {settings.dir_path}/people {settings.htmlimg_path}")
-os.mkdir(os.path.join(settings.htmlelement_path, "bibtex"))
-os.mkdir(os.path.join(settings.htmlelement_path, "examples"))
 
 os.system(f"cp -r {settings.files_path}/* {settings.html_path}")
 
 with open(os.path.join(settings.html_path, "CNAME"), "w") as f:
     f.write("defelement.org")
 
-# Make pages
-for file in os.listdir(settings.pages_path):
-    if file.endswith(".md"):
-        start = datetime.now()
-        fname = file[:-3]
-        print(f"{fname}.html", end="", flush=True)
-        with open(os.path.join(settings.pages_path, file)) as f:
-            metadata, content = parse_metadata(f.read())
 
-        if "authors" in metadata:
-            content = insert_author_info(content, metadata["authors"], f"{fname}.html")
+def build_pages():
+    """Build the pages in the pages folder."""
+    for file in sorted(os.listdir(settings.pages_path)):
+        if file.endswith(".md"):
+            start = datetime.now()
+            fname = file[:-3]
+            print(f"{fname}.html", end="", flush=True)
+            with open(os.path.join(settings.pages_path, file)) as f:
+                metadata, content = parse_metadata(f.read())
+
+            if "authors" in metadata:
+                content = insert_author_info(content, metadata["authors"], f"{fname}.html")
 
-        content = markup(content)
+            content = markup(content)
+
+            write_html_page(os.path.join(settings.html_path, f"{fname}.html"),
+                            metadata["title"], content)
+            end = datetime.now()
+            print(f" (completed in {(end - start).total_seconds():.2f}s)")
 
-        write_html_page(os.path.join(settings.html_path, f"{fname}.html"),
-                        metadata["title"], content)
-        end = datetime.now()
-        print(f" (completed in {(end - start).total_seconds():.2f}s)")
 
 # Load categories and reference elements
 categoriser = Categoriser()
@@ -163,9 +255,76 @@ orange_check_small = orange_check.replace(icon_style, icon_style_small)
 red_check_small = red_check.replace(icon_style, icon_style_small)
 blue_minus_small = blue_minus.replace(icon_style, icon_style_small)
 
-# Generate element pages
-all_examples = []
-for e in categoriser.elements:
+
+def element_examples(e: Element) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Get the examples of an element that are built using Symfem.
+
+    Args:
+        e: The element
+
+    Returns:
+        Information about each example
+    """
+    def_hash = hash_files([os.path.join(settings.element_path, f"{e.filename}.def")])
+    examples: typing.List[typing.Dict[str, typing.Any]] = []
+    if e.has_examples and (test_elements is None or e.filename in test_elements):
+        assert e.implemented("symfem")
+
+        for eg in e.examples:
+            cell, degree, variant, kwargs = parse_example(eg)
+            symfem_name, _, params = e.get_implementation_string("symfem", cell, None, variant)
+
+            fname = f"{cell}-{e.filename}"
+            if variant is not None:
+                fname += f"-{variant}"
+            fname += f"-{degree}.html"
+            for s in " ()":
+                fname = fname.replace(s, "-")
+
+            name = f"{cell}<br />degree {degree}"
+            if variant is not None:
+                name += f"<br />{e.variant_name(variant)} variant"
+            for key, value in kwargs.items():
+                name += f"<br />{key}={str(value).replace(' ', '&nbsp;')}"
+
+            eginfo: typing.Dict[str, typing.Any] = {
+                "name": name, "args": [cell, symfem_name, degree], "kwargs": kwargs,
+                "html_name": e.html_name, "element_filename": e.html_filename,
+                "filename": fname, "url": f"/elements/examples/{fname}", "example": eg}
+            if "variant" in params:
+                eginfo["kwargs"]["variant"] = params["variant"]
+            eginfo["hash"] = hash_data(html_hash(), def_hash, eginfo)
+            examples.append(eginfo)
+    return examples
+
+
+def build_element_page(index: int) -> typing.Dict[str, typing.Any]:
+    """Build the page for an element.
+
+    This function may be run on a worker process, so it returns everything that the main
+    process needs to know about the page rather than adding it to the sitemap.
+
+    Args:
+        index: The index of the element in the categoriser
+
+    Returns:
+        The index of the element, the sitemap entries of the pages that were written, and the
+        changes made to the manifest
+    """
+    e = categoriser.elements[index]
+    pages: typing.Dict[str, str] = {}
+    examples = element_examples(e)
+
+    def_hash = hash_files([os.path.join(settings.element_path, f"{e.filename}.def")])
+    page_path = os.path.join(settings.htmlelement_path, e.html_filename)
+    page_hash = hash_data(
+        html_hash(), def_hash, verification.get(e.filename), e.created, e.modified,
+        [eg["url"] for eg in examples], e.sub_elements(False) if e.is_mixed else None,
+        e.polynomial_set_names())
+    if html_page_up_to_date(page_path, page_hash, pages):
+        print(f"{e.name} (up to date)")
+        return {"index": index, "sitemap": pages, "manifest": manifest.pop_updates()}
+
     print(e.name)
     content = heading_with_self_ref("h1", cap_first(e.html_name))
     element_data = []
@@ -480,41 +639,10 @@ for e in categoriser.elements:
 
     # Write examples using symfem
     if e.has_examples:
-        element_examples = []
-
-        if test_elements is None or e.filename in test_elements:
-            assert e.implemented("symfem")
-
-            for eg in e.examples:
-                cell, degree, variant, kwargs = parse_example(eg)
-                symfem_name, _, params = e.get_implementation_string("symfem", cell, None, variant)
-
-                fname = f"{cell}-{e.filename}"
-                if variant is not None:
-                    fname += f"-{variant}"
-                fname += f"-{degree}.html"
-                for s in " ()":
-                    fname = fname.replace(s, "-")
-
-                name = f"{cell}<br />degree {degree}"
-                if variant is not None:
-                    name += f"<br />{e.variant_name(variant)} variant"
-                for key, value in kwargs.items():
-                    name += f"<br />{key}={str(value).replace(' ', '&nbsp;')}"
-
-                eginfo = {
-                    "name": name, "args": [cell, symfem_name, degree], "kwargs": kwargs,
-                    "html_name": e.html_name, "element_filename": e.html_filename,
-                    "filename": fname, "url": f"/elements/examples/{fname}"}
-                if "variant" in params:
-                    eginfo["kwargs"]["variant"] = params["variant"]
-                all_examples.append(eginfo)
-                element_examples.append(eginfo)
-
-        if len(element_examples) > 0:
+        if len(examples) > 0:
             content += heading_with_self_ref("h2", "Examples")
             content += "<table class='element-info'>"
-            for eg in element_examples:
+            for eg in examples:
                 element = create_element(*eg['args'], **eg['kwargs'])
                 content += (
                     f"<tr><td>{eg['name']}</td><td><center><a href='{eg['url']}'>"
@@ -524,6 +652,7 @@ for e in categoriser.elements:
 
     # Write references section
     refs = e.references()
+    bibtex_files = []
     if len(refs) > 0:
         content += heading_with_self_ref("h2", "References")
         content += "<ul class='citations'>\n"
@@ -533,6 +662,7 @@ for e in categoriser.elements:
             with open(os.path.join(settings.htmlelement_path,
                                    f"bibtex/{e.filename}-{rindex}.bib"), "w") as f:
                 f.write(make_bibtex(f"{e.filename}-{rindex}", r))
+            bibtex_files.append(f"/elements/bibtex/{e.filename}-{rindex}.bib")
         content += "</ul>"
 
     # Write created and updated dates
@@ -545,559 +675,612 @@ for e in categoriser.elements:
         content += "</table>"
 
     # Write file
-    write_html_page(os.path.join(settings.htmlelement_path, e.html_filename),
-                    e.html_name, content)
-
-# Verification badges
-img = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAIIAAACCCAYAAACKAxD9AAAABHNCSVQICAgIfAhkiAAACiVJREFUeJztnXmwHFUVxn8nDyEkLCoSkzLsFiIGAhHKINkw7siiCSpRiFUohKJUpBSkCgkkiohSllBKAC0FZJUXWaXQgpQBEoISAqUECYssYScYJXkhy/v8o3se8+YtM3P7znS/mfOrelU9031PfzPzvdv39j19LziO4zhOL2ywndJmoONAYDzwjqYoGhhL/54FXgM2AquA9WaDfgynBgb8BiVNB34O7Nc8OUFsIDHEk8DjwEPAcjN7PFdVrYCkb0jq1tDmVUkLJX1H0l6dnZ15f62Fpk+NIGkSsLi/fUOclcCNwPVm9s+8xRSNXj+2JIDlwIG5qGkeDwILgGvMbH3eYopApRH2Bdrpv+V14CLgF2a2Nm8xeTKs4vUhuajIj52Ac4HVkuZK2i5vQXlRaYTK1+3CSOAcYJWkWeklsq1o1x9+IEYDVwN3S9orbzHNxI3QP4cBD0ua0y61gxthYEYClwB/lLR93mIajRuhOkcDj0gq+h3WTLgRamN34H5Jn8lbSKPYKlKc80gGgxqFgB2BXYDtgX2APYFRDTxnJSOA2ySdYmYLmnjephDLCJ1mtjxSrJpJ+/0TgIOBScBkknsDjWIYcImk7czsZw08T74oGWwKYULe2gEkmaSDJP1Q0hOBn6VWvpv3520YGuJGKGfWrFlI+oikBZLWRfv5e/OtvD9nQ1ALGaEcSTtKOkPJ0HRsTsj788WgLXoNZrbWzH5C0vo/H3grYviLJU2OGC8X2sIIJcxsnZmdCXwQuCVS2G2BGyXtEileLsTqNRQabdkCw4ZNAx41s1fM7GlJRwFfAX5J0jXNwijgWklTzWyLpOHADcDOGePG4g2SxJyFc+fOvW/evHmDH60WbCNI2kXSolTnGkmnSeoo2z9W0v3hTYRezC+LOyNSzNjcImlw46vFjCBpjKR/96P3AUn7lB23taTLAj97OZsljS+L+4cIMRvBCkkjyr+rlm0jKBk1vArYrZ/dBwPLJZ2ycuVKzGyjmZ0InJ7xtB3AVZJKqf+nAkVMhRsPXDjgXrVQjSBpao3afydpm7JyJwV+B+WcVhZvXoR4jaBL0rtLOlu2RgCOqvG42cBfJI0EMLNLgTkZz32OpFJD8QJgTcZ4jWA4MKX0opWNsH8dx04GFpd+vNQMF2Q49/bA/DTWm0BRxyV6Bu1a2QjD6zx+ArBQbzeizgBuynD+EyTtmm5fTJIxXTR60q9a2QghTAJukmTp85RfJXmULoStgDOhp1a4PIrCuCwtbbgR+vIJ4MeQ3IkEvkjywG0IX5NUqn4vpFg9iIeAf5ReuBH65wxJnwZI8yzOC4wzHPhmGuc14Po48jKzCTi5/ClyN8LAXFnR8l8VGOdEJbecAS7LLisz/wVmmNmy8jfdCAOzM2lr38y6gO8FxhkFHJlu3w/8K7u0IJ4jebxvXzO7tXJnWww61cEG4F397TCzmyXdQ9LVrJfjgRvMDCXZ0B3VCkTmrREjRqirq2vAA9wIFZjZhkF2zwXuDgh7uKTRZvaSmW0iuUYXCr801Mci4IHAsjNiComNG6EO0lb2rwKL13rLOxfcCPVzPUnLu14+LumdscXEwo1QJ2kb4rqQosC0uGri4UYII3RmrsImuboRwlhE2O3i6bGFxMKNEEDaBVwcUHSc3s5eKhRuhHBCjNABHBBbSAzcCOEsrX5Iv4yLqiISboRwVgSWqydzqmm4EQIxs/8ALwYU7S+rOnfcCNl4IqDMHtFVRMCNkI0QIxTyGUk3QjbeCCizkwo4ZZ8bIRvPBZbbNqqKCLgRshGajDomqooIuBGyEbqmReFGId0IDuBGcFLcCA7gRshKd2C5Z6KqiIAbIRujA8sVbtkgN0I2xgaW2xxVRQTcCNkImY3tsSKuXOtGyMY+1Q/pQxFnT3EjhJKOF+wdULSQSxW7EcLZm7AxAzdCixG6Wm5eT0MPihshnEMDy4WmuDUUN0I4HwsoswZ4KraQGLgRApA0GvhQQNGlRew6ghuhkuGDzFT6SNlxxwbGv6e0IemxhsynKr0s6TZJn6tHmBuhdsqnx5sZGOPPAOlMax/IrKh/RgGHA7dKulFSTT0bnzGlNv4HXAkgaQ/gowExXiKZ0g6a9zDsDKBD0uerXZK8RqiNq82sNFB0SmCM28t+jC9ll1QzRwNfrnaQG6E6m4CfQs86k6GLeS1MY3SQLELeTKpqdiNU53IzK3X5TiIs3/Bl4M50+5PAe2IIq4Op1VLo3QiDs4Z0PuW0Nvh+YJxrzWxLuj0rhrA6qfoovhthcE41s9J8SecS/p98GYCkHchnUq2qafduhIH507Jly64CkLQv6ZzKAfzVzFam218gWcuh2SzxXkMYzwOzJ06ciCQDrqCG6nUALi3bzmsJ4aoLh7gR+tIFHJvOpg7wA+CgwFhPkM7AJmkS4SOWWfh1d3f3ndUOciP05WQzuxdA0iHA2RlinW9mpeb6WZmV1YdI1p04qaOj+tTPfmexNxvN7AoASbuT9P1DJ9B+muSSgpLlgncGlkfQWI31wBLgN2ZWcxKMG6E33QCHvg9IptYPTVcHONvMNgOY2XPAh7OKayR+aahg8li47rjMYf4Om38fQU7T8BqhgmuOg7FZlwyHOWaFnE5xQLxGqCCCCS4yswcjSGkqboS4PEV6S3qo4UaIy/FmVqQl/WrGjRCPs8zsvrxFhOJGiMNC4Ed5i8iCGyE7K4DjipqdXCtuhGw8AxwxVNsF5bgRwnkBmG5mz+ctJAYtYYRp06Yh6b2S9nv427BuXsNPuRqYYmahK8kXjiF1ZzHNu9sReD/J5NZ7A+OBCel7V+4/htkNlvEscFhZHmNLEMsIV0tq1HVS6d+uJA9v5MkK4Mh0EKmliGWEkJlDhhp3AMeY2bq8hTSClmgjNBgB84HPtqoJYIi1EXJgNTDbzO7KW0ijcSMMzFJgvJm9nreQZuCXhgrWbYQFS8DM/tYuJgCvEfrwqUvhvtV5q2g+lTVCyzaGaqUdTQB9jbAoFxVO7vQygpm9CAyppEsnDv01Fk8nuY3qtBF9jJDWClOAVc2Xk531m+DJtmnrx2PAbApJw4GvA8cAE4GtmyVqENaSrLX4OvAmSbLoWuBR4EmSmc9fAJB0L/VPirnBzAq3FJ+TAUn3BkxN15W37rzwG0oO4EZwUtwIDuBGcFLcCA7gg06VmKSReYtoAJtIJgEZ8AA3Qm+2Ibk/0Yq8KOlmYH7pXks5fmloH8YAc4CVkqZU7nQjtB87AHdIOqD8TTdCezICuGTcuHE9bwztJzcHIXCsod3Y08yeBq8R2p2e5QJa2Qhv5S1gCNDTa2xlIzxS/ZC2pydzo5WNcFveAoYAi0sbrWyEu0geUnH657dm9mrpRcv2GgAk7Uri+t3y1lIwVgEHlS1K0tI1Amb2LEn+pafpv82twCHlJoAWrxFKqLsbzKYCR5BMtNGOvALcPnPmzCWdnZ15a3Ecp9D8H6iRYL8kgknaAAAAAElFTkSuQmCC"  # noqa: E501
-badges = os.path.join(settings.html_path, "badges")
-for i in verifications:
-    if i != "symfem":
-        good = 0
-        total = 0
-        for ver in verification.values():
-            if i in ver:
-                good += len(ver[i]["pass"])
-                total += len(ver[i]["pass"]) + len(ver[i]["fail"])
-        proportion = f"{good} / {total}"
-        if good == total:
-            col = symfem.plotting.Colors.GREEN
-        elif good < total / 2:
-            col = "#FF0000"
-        else:
-            col = symfem.plotting.Colors.ORANGE
-        twidth = 50 + 70 * (len(proportion) - 2)
-        width = 840 + 90 + twidth
-        svgwidth = width // 10 if width % 10 == 0 else width / 10
-        with open(os.path.join(badges, f"{i}.svg"), "w") as f:
-            f.write(
-                f"<svg width=\"{svgwidth}\" height=\"20\" viewBox=\"0 0 {width} 200\" "
-                "xmlns=\"http://www.w3.org/2000/svg\" "
-                "xmlns:xlink=\"http://www.w3.org/1999/xlink\" role=\"img\" "
-                f"aria-label=\"DefElement verification: {proportion}\">\n"
-                f"<title>DefElement verification: {proportion}</title>\n"
-                "<linearGradient id=\"NcgeH\" x2=\"0\" y2=\"100%\">\n"
-                "<stop offset=\"0\" stop-opacity=\".1\" stop-color=\"#EEE\"/>\n"
-                "<stop offset=\"1\" stop-opacity=\".1\"/>\n</linearGradient>\n"
-                f"<mask id=\"SeeOV\"><rect width=\"{width}\" height=\"200\" rx=\"30\" "
-                "fill=\"#FFF\"/></mask>\n<g mask=\"url(#SeeOV)\">\n"
-                "<rect width=\"840\" height=\"200\" fill=\"#555\"/>\n"
-                f"<rect width=\"{twidth + 90}\" height=\"200\" fill=\"{col}\" x=\"840\"/>\n"
-                f"<rect width=\"{width}\" height=\"200\" fill=\"url(#NcgeH)\"/>\n</g>\n"
-                "<g aria-hidden=\"true\" fill=\"#fff\" text-anchor=\"start\" "
-                "font-family=\"Verdana,DejaVu Sans,sans-serif\" font-size=\"110\">\n"
-                "<text x=\"190\" y=\"148\" textLength=\"610\" fill=\"#000\" opacity=\"0.25\">"
-                "verification</text>\n"
-                "<text x=\"180\" y=\"138\" textLength=\"610\">verification</text>\n"
-                f"<text x=\"895\" y=\"148\" textLength=\"{twidth}\" fill=\"#000\" opacity=\"0.25\">"
-                f"{proportion}</text>\n"
-                f"<text x=\"885\" y=\"138\" textLength=\"{twidth}\">{proportion}</text>\n</g>\n"
-                f"<image x=\"40\" y=\"35\" width=\"100\" height=\"130\" xlink:href=\"{img}\"/>\n"
-                "</svg>")
-with open(os.path.join(badges, "symfem.svg"), "w") as f:
-    f.write(
-        f"<svg width=\"186.6\" height=\"20\" viewBox=\"0 0 1866 200\" "
-        "xmlns=\"http://www.w3.org/2000/svg\" "
-        "xmlns:xlink=\"http://www.w3.org/1999/xlink\" role=\"img\" "
-        "aria-label=\"DefElement: used as verification baseline\">\n"
-        "<title>DefElement: used as verification baseline</title>\n"
-        "<linearGradient id=\"NcgeH\" x2=\"0\" y2=\"100%\">\n"
-        "<stop offset=\"0\" stop-opacity=\".1\" stop-color=\"#EEE\"/>\n"
-        "<stop offset=\"1\" stop-opacity=\".1\"/>\n</linearGradient>\n"
-        f"<mask id=\"SeeOV\"><rect width=\"1866\" height=\"200\" rx=\"30\" fill=\"#FFF\"/></mask>\n"
-        "<g mask=\"url(#SeeOV)\">\n<rect width=\"200\" height=\"200\" fill=\"#555\"/>\n"
-        f"<rect width=\"1666\" height=\"200\" fill=\"{symfem.plotting.Colors.GREEN}\" x=\"200\"/>\n"
-        f"<rect width=\"1866\" height=\"200\" fill=\"url(#NcgeH)\"/>\n</g>\n"
-        "<g aria-hidden=\"true\" fill=\"#fff\" text-anchor=\"start\" "
-        "font-family=\"Verdana,DejaVu Sans,sans-serif\" font-size=\"110\">\n"
-        f"<text x=\"255\" y=\"148\" textLength=\"1566\" fill=\"#000\" opacity=\"0.25\">"
-        f"used as verification baseline</text>\n"
-        f"<text x=\"245\" y=\"138\" textLength=\"1566\">used as verification baseline</text>\n</g>"
-        f"\n<image x=\"40\" y=\"35\" width=\"100\" height=\"130\" xlink:href=\"{img}\"/>\n"
-        "</svg>")
-
-# Make verification pages
-content = heading_with_self_ref("h1", "Verification")
-long_content = heading_with_self_ref("h1", "Verification: full detail")
-if v_date is not None:
-    year, month, day = [int(i) for i in v_date.split("-")]
-    monthname = ["Zeromber", "January", "February", "March", "April", "May", "June",
-                 "July", "August", "September", "October", "November", "December"][month]
-    content += f"<small>Last updated: {day} {monthname} {year}</small><br /><br />"
-content += "<table style='margin:auto' class='bordered align-left'>"
-content += "<thead>"
-content += "<tr><td>Element</td>"
-long_content += "<table style='margin:auto' class='bordered align-left'>"
-long_content += "<thead>"
-long_content += "<tr><td>Element</td><td>Example</td>"
-vs = []
-for i in verifications:
-    if i != "symfem":
-        vs.append(i)
-        content += f"<td>{implementations[i].name}</td>"
-        long_content += f"<td>{implementations[i].name}</td>"
-content += "</tr></thead>"
-long_content += "</tr></thead>"
-rows = []
-for e in categoriser.elements:
-    n = 0
-    row = "<tr>"
-    row += f"<td><a href='/elements/{e.filename}.html'>{e.html_name}</a></td>"
-    for i in vs:
-        row += "<td>"
-        if e.filename in verification and i in verification[e.filename]:
-            result = verification[e.filename][i]
-            if len(result["pass"]) > 0 or len(result["fail"]) > 0:
-                n += 1
-                if len(result["fail"]) == 0:
-                    row += green_check
-                elif len(result["pass"]) > 0:
-                    row += orange_check
-                else:
-                    row += red_check
-        row += "</td>"
-    row += "</tr>"
-
-    examples = []
-    if e.filename in verification:
-        for vv in verification[e.filename].values():
-            for egs in vv.values():
-                for eg in egs:
-                    if eg not in examples:
-                        examples.append(eg)
-    sorted_examples = []
-    for cell in [
-        "interval", "triangle", "quadrilateral", "tetrahedron", "hexahedron",
-        "prism", "pyramid", "dual"
-    ]:
-        sorted_examples += sorted([i for i in examples if i.startswith(cell)],
-                                  key=lambda i: ",".join(i.split(",")[:0:-1]))
-    assert len(examples) == len(sorted_examples)
-    long_row = ""
-    for eg in sorted_examples:
-        long_row += "<tr>"
-        if long_row == "<tr>":
-            long_row += (f"<td rowspan='{len(sorted_examples)}'>"
-                         f"<a href='/elements/{e.filename}.html'>{e.html_name}</a></td>")
-        long_row += f"<td style='font-size:80%'>{eg}</td>"
+    write_html_page(page_path, e.html_name, content, page_hash, bibtex_files, pages)
+
+    return {"index": index, "sitemap": pages, "manifest": manifest.pop_updates()}
+
+
+def build_elements():
+    """Build the element pages."""
+    print("Making element pages")
+    # Named polynomial sets are numbered in the order they are first used, so they are numbered here
+    # so that the numbering does not depend on which process builds each page
+    for e in categoriser.elements:
+        e.make_polynomial_set_html()
+    for result in sorted(run_tasks(
+        build_element_page, list(range(len(categoriser.elements))), settings.processes,
+        "element pages", build_timings, lambda i: (categoriser.elements[i].filename, "", "page")
+    ), key=lambda r: r["index"]):
+        for path, title in result["sitemap"].items():
+            assert path not in sitemap
+            sitemap[path] = title
+        manifest.merge(result["manifest"])
+
+
+def build_badges():
+    """Build the verification badges."""
+    img = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAIIAAACCCAYAAACKAxD9AAAABHNCSVQICAgIfAhkiAAACiVJREFUeJztnXmwHFUVxn8nDyEkLCoSkzLsFiIGAhHKINkw7siiCSpRiFUohKJUpBSkCgkkiohSllBKAC0FZJUXWaXQgpQBEoISAqUECYssYScYJXkhy/v8o3se8+YtM3P7znS/mfOrelU9031PfzPzvdv39j19LziO4zhOL2ywndJmoONAYDzwjqYoGhhL/54FXgM2AquA9WaDfgynBgb8BiVNB34O7Nc8OUFsIDHEk8DjwEPAcjN7PFdVrYCkb0jq1tDmVUkLJX1H0l6dnZ15f62Fpk+NIGkSsLi/fUOclcCNwPVm9s+8xRSNXj+2JIDlwIG5qGkeDwILgGvMbH3eYopApRH2Bdrpv+V14CLgF2a2Nm8xeTKs4vUhuajIj52Ac4HVkuZK2i5vQXlRaYTK1+3CSOAcYJWkWeklsq1o1x9+IEYDVwN3S9orbzHNxI3QP4cBD0ua0y61gxthYEYClwB/lLR93mIajRuhOkcDj0gq+h3WTLgRamN34H5Jn8lbSKPYKlKc80gGgxqFgB2BXYDtgX2APYFRDTxnJSOA2ySdYmYLmnjephDLCJ1mtjxSrJpJ+/0TgIOBScBkknsDjWIYcImk7czsZw08T74oGWwKYULe2gEkmaSDJP1Q0hOBn6VWvpv3520YGuJGKGfWrFlI+oikBZLWRfv5e/OtvD9nQ1ALGaEcSTtKOkPJ0HRsTsj788WgLXoNZrbWzH5C0vo/H3grYviLJU2OGC8X2sIIJcxsnZmdCXwQuCVS2G2BGyXtEileLsTqNRQabdkCw4ZNAx41s1fM7GlJRwFfAX5J0jXNwijgWklTzWyLpOHADcDOGePG4g2SxJyFc+fOvW/evHmDH60WbCNI2kXSolTnGkmnSeoo2z9W0v3hTYRezC+LOyNSzNjcImlw46vFjCBpjKR/96P3AUn7lB23taTLAj97OZsljS+L+4cIMRvBCkkjyr+rlm0jKBk1vArYrZ/dBwPLJZ2ycuVKzGyjmZ0InJ7xtB3AVZJKqf+nAkVMhRsPXDjgXrVQjSBpao3afydpm7JyJwV+B+WcVhZvXoR4jaBL0rtLOlu2RgCOqvG42cBfJI0EMLNLgTkZz32OpFJD8QJgTcZ4jWA4MKX0opWNsH8dx04GFpd+vNQMF2Q49/bA/DTWm0BRxyV6Bu1a2QjD6zx+ArBQbzeizgBuynD+EyTtmm5fTJIxXTR60q9a2QghTAJukmTp85RfJXmULoStgDOhp1a4PIrCuCwtbbgR+vIJ4MeQ3IkEvkjywG0IX5NUqn4vpFg9iIeAf5ReuBH65wxJnwZI8yzOC4wzHPhmGuc14Po48jKzCTi5/ClyN8LAXFnR8l8VGOdEJbecAS7LLisz/wVmmNmy8jfdCAOzM2lr38y6gO8FxhkFHJlu3w/8K7u0IJ4jebxvXzO7tXJnWww61cEG4F397TCzmyXdQ9LVrJfjgRvMDCXZ0B3VCkTmrREjRqirq2vAA9wIFZjZhkF2zwXuDgh7uKTRZvaSmW0iuUYXCr801Mci4IHAsjNiComNG6EO0lb2rwKL13rLOxfcCPVzPUnLu14+LumdscXEwo1QJ2kb4rqQosC0uGri4UYII3RmrsImuboRwlhE2O3i6bGFxMKNEEDaBVwcUHSc3s5eKhRuhHBCjNABHBBbSAzcCOEsrX5Iv4yLqiISboRwVgSWqydzqmm4EQIxs/8ALwYU7S+rOnfcCNl4IqDMHtFVRMCNkI0QIxTyGUk3QjbeCCizkwo4ZZ8bIRvPBZbbNqqKCLgRshGajDomqooIuBGyEbqmReFGId0IDuBGcFLcCA7gRshKd2C5Z6KqiIAbIRujA8sVbtkgN0I2xgaW2xxVRQTcCNkImY3tsSKuXOtGyMY+1Q/pQxFnT3EjhJKOF+wdULSQSxW7EcLZm7AxAzdCixG6Wm5eT0MPihshnEMDy4WmuDUUN0I4HwsoswZ4KraQGLgRApA0GvhQQNGlRew6ghuhkuGDzFT6SNlxxwbGv6e0IemxhsynKr0s6TZJn6tHmBuhdsqnx5sZGOPPAOlMax/IrKh/RgGHA7dKulFSTT0bnzGlNv4HXAkgaQ/gowExXiKZ0g6a9zDsDKBD0uerXZK8RqiNq82sNFB0SmCM28t+jC9ll1QzRwNfrnaQG6E6m4CfQs86k6GLeS1MY3SQLELeTKpqdiNU53IzK3X5TiIs3/Bl4M50+5PAe2IIq4Op1VLo3QiDs4Z0PuW0Nvh+YJxrzWxLuj0rhrA6qfoovhthcE41s9J8SecS/p98GYCkHchnUq2qafduhIH507Jly64CkLQv6ZzKAfzVzFam218gWcuh2SzxXkMYzwOzJ06ciCQDrqCG6nUALi3bzmsJ4aoLh7gR+tIFHJvOpg7wA+CgwFhPkM7AJmkS4SOWWfh1d3f3ndUOciP05WQzuxdA0iHA2RlinW9mpeb6WZmV1YdI1p04qaOj+tTPfmexNxvN7AoASbuT9P1DJ9B+muSSgpLlgncGlkfQWI31wBLgN2ZWcxKMG6E33QCHvg9IptYPTVcHONvMNgOY2XPAh7OKayR+aahg8li47rjMYf4Om38fQU7T8BqhgmuOg7FZlwyHOWaFnE5xQLxGqCCCCS4yswcjSGkqboS4PEV6S3qo4UaIy/FmVqQl/WrGjRCPs8zsvrxFhOJGiMNC4Ed5i8iCGyE7K4DjipqdXCtuhGw8AxwxVNsF5bgRwnkBmG5mz+ctJAYtYYRp06Yh6b2S9nv427BuXsNPuRqYYmahK8kXjiF1ZzHNu9sReD/J5NZ7A+OBCel7V+4/htkNlvEscFhZHmNLEMsIV0tq1HVS6d+uJA9v5MkK4Mh0EKmliGWEkJlDhhp3AMeY2bq8hTSClmgjNBgB84HPtqoJYIi1EXJgNTDbzO7KW0ijcSMMzFJgvJm9nreQZuCXhgrWbYQFS8DM/tYuJgCvEfrwqUvhvtV5q2g+lTVCyzaGaqUdTQB9jbAoFxVO7vQygpm9CAyppEsnDv01Fk8nuY3qtBF9jJDWClOAVc2Xk531m+DJtmnrx2PAbApJw4GvA8cAE4GtmyVqENaSrLX4OvAmSbLoWuBR4EmSmc9fAJB0L/VPirnBzAq3FJ+TAUn3BkxN15W37rzwG0oO4EZwUtwIDuBGcFLcCA7gg06VmKSReYtoAJtIJgEZ8AA3Qm+2Ibk/0Yq8KOlmYH7pXks5fmloH8YAc4CVkqZU7nQjtB87AHdIOqD8TTdCezICuGTcuHE9bwztJzcHIXCsod3Y08yeBq8R2p2e5QJa2Qhv5S1gCNDTa2xlIzxS/ZC2pydzo5WNcFveAoYAi0sbrWyEu0geUnH657dm9mrpRcv2GgAk7Uri+t3y1lIwVgEHlS1K0tI1Amb2LEn+pafpv82twCHlJoAWrxFKqLsbzKYCR5BMtNGOvALcPnPmzCWdnZ15a3Ecp9D8H6iRYL8kgknaAAAAAElFTkSuQmCC"  # noqa: E501
+    badges = os.path.join(settings.html_path, "badges")
+    for i in verifications:
+        if i != "symfem":
+            good = 0
+            total = 0
+            for ver in verification.values():
+                if i in ver:
+                    good += len(ver[i]["pass"])
+                    total += len(ver[i]["pass"]) + len(ver[i]["fail"])
+            proportion = f"{good} / {total}"
+            if good == total:
+                col = symfem.plotting.Colors.GREEN
+            elif good < total / 2:
+                col = "#FF0000"
+            else:
+                col = symfem.plotting.Colors.ORANGE
+            twidth = 50 + 70 * (len(proportion) - 2)
+            width = 840 + 90 + twidth
+            svgwidth = width // 10 if width % 10 == 0 else width / 10
+            with open(os.path.join(badges, f"{i}.svg"), "w") as f:
+                f.write(
+                    f"<svg width=\"{svgwidth}\" height=\"20\" viewBox=\"0 0 {width} 200\" "
+                    "xmlns=\"http://www.w3.org/2000/svg\" "
+                    "xmlns:xlink=\"http://www.w3.org/1999/xlink\" role=\"img\" "
+                    f"aria-label=\"DefElement verification: {proportion}\">\n"
+                    f"<title>DefElement verification: {proportion}</title>\n"
+                    "<linearGradient id=\"NcgeH\" x2=\"0\" y2=\"100%\">\n"
+                    "<stop offset=\"0\" stop-opacity=\".1\" stop-color=\"#EEE\"/>\n"
+                    "<stop offset=\"1\" stop-opacity=\".1\"/>\n</linearGradient>\n"
+                    f"<mask id=\"SeeOV\"><rect width=\"{width}\" height=\"200\" rx=\"30\" "
+                    "fill=\"#FFF\"/></mask>\n<g mask=\"url(#SeeOV)\">\n"
+                    "<rect width=\"840\" height=\"200\" fill=\"#555\"/>\n"
+                    f"<rect width=\"{twidth + 90}\" height=\"200\" fill=\"{col}\" x=\"840\"/>\n"
+                    f"<rect width=\"{width}\" height=\"200\" fill=\"url(#NcgeH)\"/>\n</g>\n"
+                    "<g aria-hidden=\"true\" fill=\"#fff\" text-anchor=\"start\" "
+                    "font-family=\"Verdana,DejaVu Sans,sans-serif\" font-size=\"110\">\n"
+                    "<text x=\"190\" y=\"148\" textLength=\"610\" fill=\"#000\" opacity=\"0.25\">"
+                    "verification</text>\n"
+                    "<text x=\"180\" y=\"138\" textLength=\"610\">verification</text>\n"
+                    f"<text x=\"895\" y=\"148\" textLength=\"{twidth}\" fill=\"#000\" "
+                    "opacity=\"0.25\">"
+                    f"{proportion}</text>\n"
+                    f"<text x=\"885\" y=\"138\" textLength=\"{twidth}\">{proportion}</text>\n</g>\n"
+                    "<image x=\"40\" y=\"35\" width=\"100\" height=\"130\" "
+                    f"xlink:href=\"{img}\"/>\n"
+                    "</svg>")
+            manifest.record(f"/badges/{i}.svg", None)
+    with open(os.path.join(badges, "symfem.svg"), "w") as f:
+        f.write(
+            f"<svg width=\"186.6\" height=\"20\" viewBox=\"0 0 1866 200\" "
+            "xmlns=\"http://www.w3.org/2000/svg\" "
+            "xmlns:xlink=\"http://www.w3.org/1999/xlink\" role=\"img\" "
+            "aria-label=\"DefElement: used as verification baseline\">\n"
+            "<title>DefElement: used as verification baseline</title>\n"
+            "<linearGradient id=\"NcgeH\" x2=\"0\" y2=\"100%\">\n"
+            "<stop offset=\"0\" stop-opacity=\".1\" stop-color=\"#EEE\"/>\n"
+            "<stop offset=\"1\" stop-opacity=\".1\"/>\n</linearGradient>\n"
+            "<mask id=\"SeeOV\"><rect width=\"1866\" height=\"200\" rx=\"30\" "
+            "fill=\"#FFF\"/></mask>\n"
+            "<g mask=\"url(#SeeOV)\">\n<rect width=\"200\" height=\"200\" fill=\"#555\"/>\n"
+            "<rect width=\"1666\" height=\"200\" "
+            f"fill=\"{symfem.plotting.Colors.GREEN}\" x=\"200\"/>\n"
+            f"<rect width=\"1866\" height=\"200\" fill=\"url(#NcgeH)\"/>\n</g>\n"
+            "<g aria-hidden=\"true\" fill=\"#fff\" text-anchor=\"start\" "
+            "font-family=\"Verdana,DejaVu Sans,sans-serif\" font-size=\"110\">\n"
+            f"<text x=\"255\" y=\"148\" textLength=\"1566\" fill=\"#000\" opacity=\"0.25\">"
+            f"used as verification baseline</text>\n"
+            "<text x=\"245\" y=\"138\" textLength=\"1566\">"
+            "used as verification baseline</text>\n</g>"
+            f"\n<image x=\"40\" y=\"35\" width=\"100\" height=\"130\" xlink:href=\"{img}\"/>\n"
+            "</svg>")
+    manifest.record("/badges/symfem.svg", None)
+
+
+def build_verification():
+    """Build the verification pages."""
+    content = heading_with_self_ref("h1", "Verification")
+    long_content = heading_with_self_ref("h1", "Verification: full detail")
+    if v_date is not None:
+        year, month, day = [int(i) for i in v_date.split("-")]
+        monthname = ["Zeromber", "January", "February", "March", "April", "May", "June",
+                     "July", "August", "September", "October", "November", "December"][month]
+        content += f"<small>Last updated: {day} {monthname} {year}</small><br /><br />"
+    content += "<table style='margin:auto' class='bordered align-left'>"
+    content += "<thead>"
+    content += "<tr><td>Element</td>"
+    long_content += "<table style='margin:auto' class='bordered align-left'>"
+    long_content += "<thead>"
+    long_content += "<tr><td>Element</td><td>Example</td>"
+    vs = []
+    for i in verifications:
+        if i != "symfem":
+            vs.append(i)
+            content += f"<td>{implementations[i].name}</td>"
+            long_content += f"<td>{implementations[i].name}</td>"
+    content += "</tr></thead>"
+    long_content += "</tr></thead>"
+    rows = []
+    for e in categoriser.elements:
+        n = 0
+        row = "<tr>"
+        row += f"<td><a href='/elements/{e.filename}.html'>{e.html_name}</a></td>"
         for i in vs:
-            long_row += "<td>"
+            row += "<td>"
             if e.filename in verification and i in verification[e.filename]:
                 result = verification[e.filename][i]
-                if eg in result["pass"]:
-                    long_row += green_check
-                elif eg in result["fail"]:
-                    long_row += red_check
+                if len(result["pass"]) > 0 or len(result["fail"]) > 0:
+                    n += 1
+                    if len(result["fail"]) == 0:
+                        row += green_check
+                    elif len(result["pass"]) > 0:
+                        row += orange_check
+                    else:
+                        row += red_check
+            row += "</td>"
+        row += "</tr>"
+
+        examples = []
+        if e.filename in verification:
+            for vv in verification[e.filename].values():
+                for egs in vv.values():
+                    for eg in egs:
+                        if eg not in examples:
+                            examples.append(eg)
+        sorted_examples = []
+        for cell in [
+            "interval", "triangle", "quadrilateral", "tetrahedron", "hexahedron",
+            "prism", "pyramid", "dual"
+        ]:
+            sorted_examples += sorted([i for i in examples if i.startswith(cell)],
+                                      key=lambda i: ",".join(i.split(",")[:0:-1]))
+        assert len(examples) == len(sorted_examples)
+        long_row = ""
+        for eg in sorted_examples:
+            long_row += "<tr>"
+            if long_row == "<tr>":
+                long_row += (f"<td rowspan='{len(sorted_examples)}'>"
+                             f"<a href='/elements/{e.filename}.html'>{e.html_name}</a></td>")
+            long_row += f"<td style='font-size:80%'>{eg}</td>"
+            for i in vs:
+                long_row += "<td>"
+                if e.filename in verification and i in verification[e.filename]:
+                    result = verification[e.filename][i]
+                    if eg in result["pass"]:
+                        long_row += green_check
+                    elif eg in result["fail"]:
+                        long_row += red_check
+                    else:
+                        long_row += blue_minus
                 else:
                     long_row += blue_minus
-            else:
-                long_row += blue_minus
-            long_row += "</td>"
-        long_row += "</tr>"
-
-    rows.append((row, long_row, n))
-rows.sort(key=lambda i: -i[2])
-for r in rows:
-    if r[2] > 0:
-        content += r[0]
-        long_content += r[1]
-c = (
-    "</table>"
-    "<br /><br />"
-    "For each element in the table above, the verification test passes for an example if:"
-    "<ul>"
-    "<li>The element's basis functions span the same space as Symfem.</li>"
-    "<li>The number of DOFs associated with each sub-entity of the cell is the same as Symfem.</li>"
-    "<li>The element has the same continuity between cells as Symfem.</li>"
-    "</ul>"
-    "The symbols in the table have the following meaning:")
-content += c
-long_content += c
-content += (
-    "<table style='margin:auto' class='bordered align-left'>"
-    f"<tr><td>{green_check}</td><td>Verification passes from all the examples on the element's page"
-    "</td></tr>"
-    f"<tr><td>{orange_check}</td><td>Verification passes for some examples, but not all</td></tr>"
-    f"<tr><td>{red_check}</td><td>Verification fails for all examples</td></tr>"
-    "</table>")
-long_content += (
-    "<table style='margin:auto' class='bordered align-left'>"
-    f"<tr><td>{green_check}</td><td>Verification passes</td></tr>"
-    f"<tr><td>{red_check}</td><td>Verification fails</td></tr>"
-    f"<tr><td>{blue_minus}</td><td>Example not implemented</td></tr>"
-    "</table>")
-content += ("<br /><br />You can view more details of which examples pass and fail on the "
-            "<a href='/detailed-verification.html'>verification with full detail page</a>.")
-long_content += ("<br /><br />You can view a summarised version of this information on the "
-                 "<a href='/verification.html'>verification page</a>.")
-if os.path.isfile(settings.verification_json):
-    os.system(f"cp {settings.verification_json} {settings.html_path}/verification.json")
-    c = ("<br /><br />The verification data is also available "
-         "<a href='/verification.json' target='new'>in JSON format</a>.")
+                long_row += "</td>"
+            long_row += "</tr>"
+
+        rows.append((row, long_row, n))
+    rows.sort(key=lambda i: -i[2])
+    for r in rows:
+        if r[2] > 0:
+            content += r[0]
+            long_content += r[1]
+    c = (
+        "</table>"
+        "<br /><br />"
+        "For each element in the table above, the verification test passes for an example if:"
+        "<ul>"
+        "<li>The element's basis functions span the same space as Symfem.</li>"
+        "<li>The number of DOFs associated with each sub-entity of the cell is the same as "
+        "Symfem.</li>"
+        "<li>The element has the same continuity between cells as Symfem.</li>"
+        "</ul>"
+        "The symbols in the table have the following meaning:")
+    content += c
+    long_content += c
+    content += (
+        "<table style='margin:auto' class='bordered align-left'>"
+        f"<tr><td>{green_check}</td><td>"
+        "Verification passes from all the examples on the element's page"
+        "</td></tr>"
+        f"<tr><td>{orange_check}</td><td>"
+        "Verification passes for some examples, but not all</td></tr>"
+        f"<tr><td>{red_check}</td><td>Verification fails for all examples</td></tr>"
+        "</table>")
+    long_content += (
+        "<table style='margin:auto' class='bordered align-left'>"
+        f"<tr><td>{green_check}</td><td>Verification passes</td></tr>"
+        f"<tr><td>{red_check}</td><td>Verification fails</td></tr>"
+        f"<tr><td>{blue_minus}</td><td>Example not implemented</td></tr>"
+        "</table>")
+    content += ("<br /><br />You can view more details of which examples pass and fail on the "
+                "<a href='/detailed-verification.html'>verification with full detail page</a>.")
+    long_content += ("<br /><br />You can view a summarised version of this information on the "
+                     "<a href='/verification.html'>verification page</a>.")
+    if os.path.isfile(settings.verification_json):
+        os.system(f"cp {settings.verification_json} {settings.html_path}/verification.json")
+        manifest.record("/verification.json", None)
+        c = ("<br /><br />The verification data is also available "
+             "<a href='/verification.json' target='new'>in JSON format</a>.")
+        content += c
+        long_content += c
+
+    c = heading_with_self_ref("h2", "Verification GitHub badges")
+    c += "<table class='bordered align-left'>"
+    c += "<thead><tr><td>Implementation</td><td>Badge</td><td>Markdown</td></tr></thead>"
+    for i in verifications:
+        c += (
+            "<tr>"
+            f"<td>{implementations[i].name}</td>"
+            f"<td><img src='/badges/{i}.svg'></td>"
+            "<td style='font-size:80%;font-family:monospace'>"
+            f"[![DefElement verification](https://defelement.org/badges/{i}.svg)]"
+            "(https://defelement.org/verification.html)</td>"
+            "</tr>")
+    c += "</table>"
     content += c
     long_content += c
+    write_html_page(os.path.join(settings.html_path, "verification.html"),
+                    "Verification", content)
+    write_html_page(os.path.join(settings.html_path, "detailed-verification.html"),
+                    "Verification: full detail", long_content)
 
-c = heading_with_self_ref("h2", "Verification GitHub badges")
-c += "<table class='bordered align-left'>"
-c += "<thead><tr><td>Implementation</td><td>Badge</td><td>Markdown</td></tr></thead>"
-for i in verifications:
-    c += (
-        "<tr>"
-        f"<td>{implementations[i].name}</td>"
-        f"<td><img src='/badges/{i}.svg'></td>"
-        "<td style='font-size:80%;font-family:monospace'>"
-        f"[![DefElement verification](https://defelement.org/badges/{i}.svg)]"
-        "(https://defelement.org/verification.html)</td>"
-        "</tr>")
-c += "</table>"
-content += c
-long_content += c
-write_html_page(os.path.join(settings.html_path, "verification.html"),
-                "Verification", content)
-write_html_page(os.path.join(settings.html_path, "detailed-verification.html"),
-                "Verification: full detail", long_content)
-
-
-def build_examples(egs: typing.List[typing.Dict[str, str]], process: str = ""):
-    """Build examples.
+
+def build_example(eg: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Build an example.
 
     Args:
-        egs: Examples
-        process: String to print on this process
+        eg: The example
+
+    Returns:
+        Changes made to the manifest
     """
-    for eg in egs:
-        start = datetime.now()
+    import multiprocessing
+
+    start = datetime.now()
 
-        element = create_element(*eg['args'], **eg['kwargs'])
+    element = create_element(*eg['args'], **eg['kwargs'])
 
+    with unsharded():
         markup_example(
             element, eg['html_name'], f"/elements/{eg['element_filename']}",
             eg['filename'])
+    manifest.record(eg['url'], eg['hash'], uses=manifest.pop_used())
 
-        end = datetime.now()
-        print(f"  {process}{eg['args'][0]} {eg['args'][1]} {eg['args'][2]}"
-              f" (completed in {(end - start).total_seconds():.2f}s)", flush=True)
+    end = datetime.now()
+    process = ""
+    if settings.processes != 1:
+        process = f"[{multiprocessing.current_process().name}] "
+    print(f"  {process}{eg['args'][0]} {eg['args'][1]} {eg['args'][2]}"
+          f" (completed in {(end - start).total_seconds():.2f}s)", flush=True)
 
+    return manifest.pop_updates()
 
-# Make example pages
-print("Making examples")
-if settings.processes == 1:
-    build_examples(all_examples)
-else:
-    import multiprocessing
 
-    p = settings.processes
-    n_egs = len(all_examples)
-
-    jobs = []
-    for pindex in range(p):
-        process = multiprocessing.Process(
-            target=build_examples,
-            args=(all_examples[n_egs * pindex // p: n_egs * (pindex + 1) // p], f"[{pindex}] ")
-        )
-        jobs.append(process)
-
-    for job in jobs:
-        job.start()
-
-    for job in jobs:
-        job.join()
-
-    for job in jobs:
-        assert job.exitcode == 0
-
-# Index page
-content = heading_with_self_ref("h1", "Index of elements")
-# Generate filtering Javascript
-content += "<script type='text/javascript'>\n"
-content += "function do_filter_refall(){\n"
-content += "    if(document.getElementById('check-ref-all').checked){\n"
-for r in categoriser.references:
-    content += f"        document.getElementById('check-ref-{r}').checked = false\n"
-content += "    }\n"
-content += "    do_filter()\n"
-content += "}\n"
-content += "function do_filter_catall(){\n"
-content += "    if(document.getElementById('check-cat-all').checked){\n"
-for c in categoriser.categories:
-    content += f"        document.getElementById('check-cat-{c}').checked = false\n"
-content += "    }\n"
-content += "    do_filter()\n"
-content += "}\n"
-content += "function do_filter_cat(){\n"
-content += "    if(document.getElementById('check-cat-all').checked){\n"
-content += "        if("
-content += " || ".join([f"document.getElementById('check-cat-{c}').checked"
-                        for c in categoriser.categories])
-content += "){\n"
-content += "            document.getElementById('check-cat-all').checked = false\n"
-content += "        }\n"
-content += "    }\n"
-content += "    do_filter()\n"
-content += "}\n"
-content += "function do_filter_ref(){\n"
-content += "    if(document.getElementById('check-ref-all').checked){\n"
-content += "        if("
-content += " || ".join([f"document.getElementById('check-ref-{r}').checked"
-                        for r in categoriser.references])
-content += "){\n"
-content += "            document.getElementById('check-ref-all').checked = false\n"
-content += "        }\n"
-content += "    }\n"
-content += "    do_filter()\n"
-content += "}\n"
-content += "function do_filter(){\n"
-content += "    var els = document.getElementsByClassName('element-on-list')\n"
-content += "    for(var i=0; i < els.length; i++){\n"
-content += "        var ref_show = false\n"
-content += "        if(document.getElementById('check-ref-all').checked){\n"
-content += "            ref_show = true\n"
-content += "        } else {\n"
-for r in categoriser.references:
-
-    content += f"            if(document.getElementById('check-ref-{r}').checked"
-    content += f" && els[i].id.indexOf('ref-{r}') != -1){{ref_show = true}}\n"
-content += "        }\n"
-content += "        var cat_show = false\n"
-content += "        if(document.getElementById('check-cat-all').checked){\n"
-content += "            cat_show = true\n"
-content += "        } else {\n"
-for c in categoriser.categories:
-
-    content += f"            if(document.getElementById('check-cat-{c}').checked"
-    content += f" && els[i].id.indexOf('cat-{c}') != -1){{cat_show = true}}\n"
-content += "        }\n"
-content += "        var name_show = true\n"
-content += "        if(!document.getElementById('show-main-names').checked"
-content += " && els[i].id.indexOf('name-main') != -1){\n"
-content += "            name_show = false\n"
-content += "        }\n"
-content += "        if(!document.getElementById('show-alt-names').checked"
-content += " && els[i].id.indexOf('name-alt') != -1){\n"
-content += "            name_show = false\n"
-content += "        }\n"
-content += "        if(!document.getElementById('show-abrv-names').checked"
-content += " && els[i].id.indexOf('name-abrv') != -1){\n"
-content += "            name_show = false\n"
-content += "        }\n"
-content += "        if(cat_show && ref_show && name_show){\n"
-content += "            els[i].style.display='block'\n"
-content += "        } else {\n"
-content += "            els[i].style.display='none'\n"
-content += "        }\n"
-content += "    }\n"
-content += "}\n"
-content += "function show_filtering(){\n"
-content += "    document.getElementById('show-flink').style.display='none'\n"
-content += "    document.getElementById('hide-flink').style.display='block'\n"
-content += "    document.getElementById('the-filters').style.display='block'\n"
-content += "}\n"
-content += "function hide_filtering(){\n"
-content += "    document.getElementById('show-flink').style.display='block'\n"
-content += "    document.getElementById('hide-flink').style.display='none'\n"
-content += "    document.getElementById('the-filters').style.display='none'\n"
-content += "}\n"
-content += "</script>"
-content += "<a href='javascript:show_filtering()' id='show-flink' style='display:block'"
-content += ">&darr; Show filters &darr;</a>\n"
-content += "<a href='javascript:hide_filtering()' id='hide-flink' style='display:none'"
-content += ">&uarr; Hide filters &uarr;</a>\n"
-content += "<table id='the-filters' class='filters' style='display:none'>"
-content += (
-    "<tr><td>Alternative&nbsp;names</td><td>"
-    "<label><input type='checkbox' id='show-main-names' checked onchange='do_filter()'>"
-    "&nbsp;Show main names</label> "
-    "<label><input type='checkbox' id='show-alt-names' onchange='do_filter()'>"
-    "&nbsp;Show alternative names</label> "
-    "<label><input type='checkbox' id='show-abrv-names' onchange='do_filter()'>"
-    "&nbsp;Show abbreviated names</label> "
-    "</td></tr>")
-content += "<tr><td>Reference&nbsp;elements</td><td>"
-content += "<label><input type='checkbox' checked id='check-ref-all' onchange='do_filter_refall()'"
-content += ">&nbsp;show all</label> "
-for r in categoriser.references:
-    content += f"<label><input type='checkbox' id='check-ref-{r}' onchange='do_filter_ref()'"
-    content += f">&nbsp;{r}</label> "
-content += "</td></tr>"
-content += "<tr><td>Categories</td><td>"
-content += "<label><input type='checkbox' checked id='check-cat-all'onchange='do_filter_catall()'"
-content += ">&nbsp;show all</label> "
-for c in categoriser.categories:
-    content += f"<label><input type='checkbox' id='check-cat-{c}'onchange='do_filter_cat()'"
-    content += f">&nbsp;{categoriser.get_category_name(c)}</label> "
-content += "</td></tr>"
-content += "</table>\n"
-# Write element list
-elementlist = []
-for e in categoriser.elements:
-    id = " ".join([f"ref-{r}" for r in e.reference_elements(False)]
-                  + [f"cat-{c}" for c in e.categories(False, False)])
-    elementlist.append((e.html_name.lower(),
-                        f"<li class='element-on-list' id='{id} name-main'>"
-                        f"<a href='/elements/{e.html_filename}'>{e.html_name}</a></li>"))
-    for name in e.alternative_names(False, False, False, True):
-        elementlist.append((name.lower(),
-                            f"<li class='element-on-list' id='{id} name-alt'>"
-                            f"<a href='/elements/{e.html_filename}'>{name}</a></li>"))
-    for name in e.short_names(False):
-        elementlist.append((name.lower(),
-                            f"<li class='element-on-list' id='{id} name-abrv'>"
-                            f"<a href='/elements/{e.html_filename}'>{name}</a></li>"))
-elementlist.sort(key=lambda x: x[0])
-content += "<ul>" + "\n".join([i[1] for i in elementlist]) + "</ul>"
-content += "<script type='text/javascript'>do_filter()</script>"
-
-write_html_page(os.path.join(settings.htmlelement_path, "index.html"),
-                "Index of elements", content)
-
-# Recently updated elements
-rss_icon = ("<span style='color:#FF8800;padding-left:10px'>"
-            "<i class='fa fa-rss' aria-hidden='true'></i></span>")
-content = heading_with_self_ref("h1", "Recent elements")
-content += f"<h2>Recently added elements <a href='/new-elements.xml'>{rss_icon}</a></h2>\n"
-content += "<ul>\n"
-for e in categoriser.recently_added(10):
-    content += f"<li><a href='/elements/{e.html_filename}'>{e.html_name}</a>"
-    if e.created is not None:
-        content += f" ({e.created.strftime('%d %B %Y')})"
-    content += "</li>\n"
-content += "</ul>\n"
-
-content += f"<h2>Recently updated elements <a href='/updated-elements.xml'>{rss_icon}</a></h2>\n"
-content += "<ul>\n"
-for e in categoriser.recently_updated(10):
-    content += f"<li><a href='/elements/{e.html_filename}'>{e.html_name}</a>"
-    if e.modified is not None:
-        content += f" ({e.modified.strftime('%d %B %Y')})"
-    content += "</li>\n"
-content += "</ul>\n"
-
-write_html_page(os.path.join(settings.htmlindices_path, "recent.html"),
-                "Recent elements", content)
-
-with open(os.path.join(settings.html_path, "new-elements.xml"), "w") as f:
-    f.write(make_rss(categoriser.recently_added(10), "recently added elements",
-                     "Finite elements that have recently been added to DefElement", "created"))
-
-with open(os.path.join(settings.html_path, "updated-elements.xml"), "w") as f:
-    f.write(make_rss(categoriser.recently_updated(10), "recently updated elements",
-                     "Finite element whose pages on DefElement have recently been updated",
-                     "modified"))
-
-# Category index
-os.mkdir(os.path.join(settings.htmlindices_path, "categories"))
-content = heading_with_self_ref("h1", "Categories")
-for c in categoriser.categories:
-    category_pages = []
-    for e in categoriser.elements_in_category(c):
-        for name in [e.html_name]:
-            category_pages.append((name.lower(),
-                                   f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
-
-    category_pages.sort(key=lambda x: x[0])
-
-    content += (f"<h2><a href='/lists/categories/{c}.html'>{categoriser.get_category_name(c)}"
-                "</a></h2>\n<ul>")
-    content += "".join([i[1] for i in category_pages])
-    content += "</ul>"
+def build_examples():
+    """Build the example pages."""
+    examples = []
+    for e in categoriser.elements:
+        for eg in element_examples(e):
+            if not in_shard(eg["url"]):
+                continue
+            if manifest.up_to_date(eg["url"], eg["hash"]):
+                print(f"  {eg['filename']} (up to date)")
+            else:
+                examples.append(eg)
+
+    print("Making examples")
+    for updates in run_tasks(
+        build_example, examples, settings.processes, "examples", build_timings,
+        lambda eg: (eg["element_filename"], eg["example"], "symfem")
+    ):
+        manifest.merge(updates)
+
+
+def build_index():
+    """Build the index of elements."""
+    content = heading_with_self_ref("h1", "Index of elements")
+    # Generate filtering Javascript
+    content += "<script type='text/javascript'>\n"
+    content += "function do_filter_refall(){\n"
+    content += "    if(document.getElementById('check-ref-all').checked){\n"
+    for r in categoriser.references:
+        content += f"        document.getElementById('check-ref-{r}').checked = false\n"
+    content += "    }\n"
+    content += "    do_filter()\n"
+    content += "}\n"
+    content += "function do_filter_catall(){\n"
+    content += "    if(document.getElementById('check-cat-all').checked){\n"
+    for c in categoriser.categories:
+        content += f"        document.getElementById('check-cat-{c}').checked = false\n"
+    content += "    }\n"
+    content += "    do_filter()\n"
+    content += "}\n"
+    content += "function do_filter_cat(){\n"
+    content += "    if(document.getElementById('check-cat-all').checked){\n"
+    content += "        if("
+    content += " || ".join([f"document.getElementById('check-cat-{c}').checked"
+                            for c in categoriser.categories])
+    content += "){\n"
+    content += "            document.getElementById('check-cat-all').checked = false\n"
+    content += "        }\n"
+    content += "    }\n"
+    content += "    do_filter()\n"
+    content += "}\n"
+    content += "function do_filter_ref(){\n"
+    content += "    if(document.getElementById('check-ref-all').checked){\n"
+    content += "        if("
+    content += " || ".join([f"document.getElementById('check-ref-{r}').checked"
+                            for r in categoriser.references])
+    content += "){\n"
+    content += "            document.getElementById('check-ref-all').checked = false\n"
+    content += "        }\n"
+    content += "    }\n"
+    content += "    do_filter()\n"
+    content += "}\n"
+    content += "function do_filter(){\n"
+    content += "    var els = document.getElementsByClassName('element-on-list')\n"
+    content += "    for(var i=0; i < els.length; i++){\n"
+    content += "        var ref_show = false\n"
+    content += "        if(document.getElementById('check-ref-all').checked){\n"
+    content += "            ref_show = true\n"
+    content += "        } else {\n"
+    for r in categoriser.references:
+
+        content += f"            if(document.getElementById('check-ref-{r}').checked"
+        content += f" && els[i].id.indexOf('ref-{r}') != -1){{ref_show = true}}\n"
+    content += "        }\n"
+    content += "        var cat_show = false\n"
+    content += "        if(document.getElementById('check-cat-all').checked){\n"
+    content += "            cat_show = true\n"
+    content += "        } else {\n"
+    for c in categoriser.categories:
+
+        content += f"            if(document.getElementById('check-cat-{c}').checked"
+        content += f" && els[i].id.indexOf('cat-{c}') != -1){{cat_show = true}}\n"
+    content += "        }\n"
+    content += "        var name_show = true\n"
+    content += "        if(!document.getElementById('show-main-names').checked"
+    content += " && els[i].id.indexOf('name-main') != -1){\n"
+    content += "            name_show = false\n"
+    content += "        }\n"
+    content += "        if(!document.getElementById('show-alt-names').checked"
+    content += " && els[i].id.indexOf('name-alt') != -1){\n"
+    content += "            name_show = false\n"
+    content += "        }\n"
+    content += "        if(!document.getElementById('show-abrv-names').checked"
+    content += " && els[i].id.indexOf('name-abrv') != -1){\n"
+    content += "            name_show = false\n"
+    content += "        }\n"
+    content += "        if(cat_show && ref_show && name_show){\n"
+    content += "            els[i].style.display='block'\n"
+    content += "        } else {\n"
+    content += "            els[i].style.display='none'\n"
+    content += "        }\n"
+    content += "    }\n"
+    content += "}\n"
+    content += "function show_filtering(){\n"
+    content += "    document.getElementById('show-flink').style.display='none'\n"
+    content += "    document.getElementById('hide-flink').style.display='block'\n"
+    content += "    document.getElementById('the-filters').style.display='block'\n"
+    content += "}\n"
+    content += "function hide_filtering(){\n"
+    content += "    document.getElementById('show-flink').style.display='block'\n"
+    content += "    document.getElementById('hide-flink').style.display='none'\n"
+    content += "    document.getElementById('the-filters').style.display='none'\n"
+    content += "}\n"
+    content += "</script>"
+    content += "<a href='javascript:show_filtering()' id='show-flink' style='display:block'"
+    content += ">&darr; Show filters &darr;</a>\n"
+    content += "<a href='javascript:hide_filtering()' id='hide-flink' style='display:none'"
+    content += ">&uarr; Hide filters &uarr;</a>\n"
+    content += "<table id='the-filters' class='filters' style='display:none'>"
+    content += (
+        "<tr><td>Alternative&nbsp;names</td><td>"
+        "<label><input type='checkbox' id='show-main-names' checked onchange='do_filter()'>"
+        "&nbsp;Show main names</label> "
+        "<label><input type='checkbox' id='show-alt-names' onchange='do_filter()'>"
+        "&nbsp;Show alternative names</label> "
+        "<label><input type='checkbox' id='show-abrv-names' onchange='do_filter()'>"
+        "&nbsp;Show abbreviated names</label> "
+        "</td></tr>")
+    content += "<tr><td>Reference&nbsp;elements</td><td>"
+    content += ("<label><input type='checkbox' checked id='check-ref-all' "
+                "onchange='do_filter_refall()'")
+    content += ">&nbsp;show all</label> "
+    for r in categoriser.references:
+        content += f"<label><input type='checkbox' id='check-ref-{r}' onchange='do_filter_ref()'"
+        content += f">&nbsp;{r}</label> "
+    content += "</td></tr>"
+    content += "<tr><td>Categories</td><td>"
+    content += ("<label><input type='checkbox' checked id='check-cat-all'"
+                "onchange='do_filter_catall()'")
+    content += ">&nbsp;show all</label> "
+    for c in categoriser.categories:
+        content += f"<label><input type='checkbox' id='check-cat-{c}'onchange='do_filter_cat()'"
+        content += f">&nbsp;{categoriser.get_category_name(c)}</label> "
+    content += "</td></tr>"
+    content += "</table>\n"
+    # Write element list
+    elementlist = []
+    for e in categoriser.elements:
+        id = " ".join([f"ref-{r}" for r in e.reference_elements(False)]
+                      + [f"cat-{c}" for c in e.categories(False, False)])
+        elementlist.append((e.html_name.lower(),
+                            f"<li class='element-on-list' id='{id} name-main'>"
+                            f"<a href='/elements/{e.html_filename}'>{e.html_name}</a></li>"))
+        for name in e.alternative_names(False, False, False, True):
+            elementlist.append((name.lower(),
+                                f"<li class='element-on-list' id='{id} name-alt'>"
+                                f"<a href='/elements/{e.html_filename}'>{name}</a></li>"))
+        for name in e.short_names(False):
+            elementlist.append((name.lower(),
+                                f"<li class='element-on-list' id='{id} name-abrv'>"
+                                f"<a href='/elements/{e.html_filename}'>{name}</a></li>"))
+    elementlist.sort(key=lambda x: x[0])
+    content += "<ul>" + "\n".join([i[1] for i in elementlist]) + "</ul>"
+    content += "<script type='text/javascript'>do_filter()</script>"
+
+    write_html_page(os.path.join(settings.htmlelement_path, "index.html"),
+                    "Index of elements", content)
+
+
+def build_recent():
+    """Build the list of recent elements and the RSS feeds."""
+    rss_icon = ("<span style='color:#FF8800;padding-left:10px'>"
+                "<i class='fa fa-rss' aria-hidden='true'></i></span>")
+    content = heading_with_self_ref("h1", "Recent elements")
+    content += f"<h2>Recently added elements <a href='/new-elements.xml'>{rss_icon}</a></h2>\n"
+    content += "<ul>\n"
+    for e in categoriser.recently_added(10):
+        content += f"<li><a href='/elements/{e.html_filename}'>{e.html_name}</a>"
+        if e.created is not None:
+            content += f" ({e.created.strftime('%d %B %Y')})"
+        content += "</li>\n"
+    content += "</ul>\n"
+
+    content += ("<h2>Recently updated elements "
+                f"<a href='/updated-elements.xml'>{rss_icon}</a></h2>\n")
+    content += "<ul>\n"
+    for e in categoriser.recently_updated(10):
+        content += f"<li><a href='/elements/{e.html_filename}'>{e.html_name}</a>"
+        if e.modified is not None:
+            content += f" ({e.modified.strftime('%d %B %Y')})"
+        content += "</li>\n"
+    content += "</ul>\n"
+
+    write_html_page(os.path.join(settings.htmlindices_path, "recent.html"),
+                    "Recent elements", content)
+
+    with open(os.path.join(settings.html_path, "new-elements.xml"), "w") as f:
+        f.write(make_rss(categoriser.recently_added(10), "recently added elements",
+                         "Finite elements that have recently been added to DefElement", "created"))
+    manifest.record("/new-elements.xml", None)
+
+    with open(os.path.join(settings.html_path, "updated-elements.xml"), "w") as f:
+        f.write(make_rss(categoriser.recently_updated(10), "recently updated elements",
+                         "Finite element whose pages on DefElement have recently been updated",
+                         "modified"))
+    manifest.record("/updated-elements.xml", None)
+
+
+def build_categories():
+    """Build the category index."""
+    os.makedirs(os.path.join(settings.htmlindices_path, "categories"), exist_ok=True)
+    content = heading_with_self_ref("h1", "Categories")
+    for c in categoriser.categories:
+        category_pages = []
+        for e in categoriser.elements_in_category(c):
+            for name in [e.html_name]:
+                category_pages.append((
+                    name.lower(), f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
+
+        category_pages.sort(key=lambda x: x[0])
+
+        content += (f"<h2><a href='/lists/categories/{c}.html'>{categoriser.get_category_name(c)}"
+                    "</a></h2>\n<ul>")
+        content += "".join([i[1] for i in category_pages])
+        content += "</ul>"
 
-    sub_content = heading_with_self_ref("h1", categoriser.get_category_name(c))
-    sub_content += "<ul>"
-    sub_content += "".join([i[1] for i in category_pages])
-    sub_content += "</ul>"
-
-    write_html_page(os.path.join(settings.htmlindices_path, f"categories/{c}.html"),
-                    categoriser.get_category_name(c), sub_content)
-
-write_html_page(os.path.join(settings.htmlindices_path, "categories/index.html"),
-                "Categories", content)
-
-# Implementations index
-os.mkdir(os.path.join(settings.htmlindices_path, "implementations"))
-content = heading_with_self_ref("h1", "Implemented elements")
-for c, info in implementations.items():
-    category_pages = []
-    for e in categoriser.elements_in_implementation(c):
-        names = {e.html_name}
-        refs = set()
-        for cname in categoriser.references:
-            for i_str in e.list_of_implementation_strings(c, None):
-                if "(" not in i_str or f"({cname})" in i_str:
-                    refs.add(cname)
-                    break
-        for name in names:
-            category_pages.append((name.lower(),
-                                   f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
-
-    category_pages.sort(key=lambda x: x[0])
-
-    content += (f"<h2><a href='/lists/implementations/{c}.html'>Implemented in {info.name}"
-                "</a></h2>\n<ul>")
-    content += "".join([i[1] for i in category_pages])
-    content += "</ul>"
+        sub_content = heading_with_self_ref("h1", categoriser.get_category_name(c))
+        sub_content += "<ul>"
+        sub_content += "".join([i[1] for i in category_pages])
+        sub_content += "</ul>"
 
-    sub_content = f"<h1>Implemented in <a href='{info.url}'>{info.name}</a></h1>\n<ul>"
-    sub_content += "".join([i[1] for i in category_pages])
-    sub_content += "</ul>"
-
-    write_html_page(os.path.join(settings.htmlindices_path, f"implementations/{c}.html"),
-                    f"Implemented in {info.name}", sub_content)
-
-write_html_page(os.path.join(settings.htmlindices_path, "implementations/index.html"),
-                "Implemented elements", content)
-
-# Reference elements index
-os.mkdir(os.path.join(settings.htmlindices_path, "references"))
-content = heading_with_self_ref("h1", "Reference elements")
-for c in categoriser.references:
-    refels = []
-    for e in categoriser.elements_by_reference(c):
-        for name in [e.html_name]:
-            refels.append((name.lower(),
-                           f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
-
-    refels.sort(key=lambda x: x[0])
-
-    content += f"<h2>{cap_first(c)}</h2>\n"
-    content += "<ul>" + "".join([i[1] for i in refels]) + "</ul>"
-
-    heading = "Finite elements on a"
-    if c[0] in "aeiou":
-        heading += "n"
-    heading += f" {c}"
-    sub_content = heading_with_self_ref("h1", heading)
-    sub_content += "<ul>" + "".join([i[1] for i in refels]) + "</ul>"
-
-    write_html_page(os.path.join(settings.htmlindices_path, f"references/{c}.html"),
-                    heading, sub_content)
-
-write_html_page(os.path.join(settings.htmlindices_path, "references/index.html"),
-                "Reference elements", content)
-
-# Page showing numbering of references
-content = heading_with_self_ref("h1", "Reference cell numbering")
-content += "<p>This page illustrates the entity numbering used for each reference cell.</p>"
-for cell in categoriser.references.keys():
-    if cell == "dual polygon":
-        for nsides in [4, 5, 6]:
-            content += heading_with_self_ref("h2", f"Dual polygon ({nsides})")
-            content += plotting.plot_reference(symfem.create_reference(f"dual polygon({nsides})"))
-    else:
-        content += heading_with_self_ref("h2", cap_first(cell))
-        content += plotting.plot_reference(symfem.create_reference(cell))
+        write_html_page(os.path.join(settings.htmlindices_path, f"categories/{c}.html"),
+                        categoriser.get_category_name(c), sub_content)
+
+    write_html_page(os.path.join(settings.htmlindices_path, "categories/index.html"),
+                    "Categories", content)
+
+
+def build_implementations():
+    """Build the implementations index."""
+    os.makedirs(os.path.join(settings.htmlindices_path, "implementations"), exist_ok=True)
+    content = heading_with_self_ref("h1", "Implemented elements")
+    for c, info in implementations.items():
+        category_pages = []
+        for e in categoriser.elements_in_implementation(c):
+            names = {e.html_name}
+            refs = set()
+            for cname in categoriser.references:
+                for i_str in e.list_of_implementation_strings(c, None):
+                    if "(" not in i_str or f"({cname})" in i_str:
+                        refs.add(cname)
+                        break
+            for name in names:
+                category_pages.append((
+                    name.lower(), f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
+
+        category_pages.sort(key=lambda x: x[0])
+
+        content += (f"<h2><a href='/lists/implementations/{c}.html'>Implemented in {info.name}"
+                    "</a></h2>\n<ul>")
+        content += "".join([i[1] for i in category_pages])
+        content += "</ul>"
 
-write_html_page(os.path.join(settings.html_path, "reference_numbering.html"),
-                "Reference cell numbering", content)
+        sub_content = f"<h1>Implemented in <a href='{info.url}'>{info.name}</a></h1>\n<ul>"
+        sub_content += "".join([i[1] for i in category_pages])
+        sub_content += "</ul>"
+
+        write_html_page(os.path.join(settings.htmlindices_path, f"implementations/{c}.html"),
+                        f"Implemented in {info.name}", sub_content)
+
+    write_html_page(os.path.join(settings.htmlindices_path, "implementations/index.html"),
+                    "Implemented elements", content)
+
+
+def build_references():
+    """Build the reference elements index."""
+    os.makedirs(os.path.join(settings.htmlindices_path, "references"), exist_ok=True)
+    content = heading_with_self_ref("h1", "Reference elements")
+    for c in categoriser.references:
+        refels = []
+        for e in categoriser.elements_by_reference(c):
+            for name in [e.html_name]:
+                refels.append((name.lower(),
+                               f"<li><a href='/elements/{e.html_filename}'>{name}</a></li>"))
+
+        refels.sort(key=lambda x: x[0])
+
+        content += f"<h2>{cap_first(c)}</h2>\n"
+        content += "<ul>" + "".join([i[1] for i in refels]) + "</ul>"
+
+        heading = "Finite elements on a"
+        if c[0] in "aeiou":
+            heading += "n"
+        heading += f" {c}"
+        sub_content = heading_with_self_ref("h1", heading)
+        sub_content += "<ul>" + "".join([i[1] for i in refels]) + "</ul>"
+
+        write_html_page(os.path.join(settings.htmlindices_path, f"references/{c}.html"),
+                        heading, sub_content)
+
+    write_html_page(os.path.join(settings.htmlindices_path, "references/index.html"),
+                    "Reference elements", content)
+
+
+def build_reference_numbering():
+    """Build the page showing the numbering of reference cells."""
+    content = heading_with_self_ref("h1", "Reference cell numbering")
+    content += "<p>This page illustrates the entity numbering used for each reference cell.</p>"
+    for cell in categoriser.references.keys():
+        if cell == "dual polygon":
+            for nsides in [4, 5, 6]:
+                content += heading_with_self_ref("h2", f"Dual polygon ({nsides})")
+                content += plotting.plot_reference(
+                    symfem.create_reference(f"dual polygon({nsides})"))
+        else:
+            content += heading_with_self_ref("h2", cap_first(cell))
+            content += plotting.plot_reference(symfem.create_reference(cell))
 
+    write_html_page(os.path.join(settings.html_path, "reference_numbering.html"),
+                    "Reference cell numbering", content)
 
-# Families
-def linked_names(dim: str, fname: str, cell: str) -> str:
+
+def linked_names(dim: str, fname: str, cell: str, data: typing.Dict[str, typing.Any]) -> str:
     """Create list of linked names.
 
     Args:
         dim: Dimension
         fname: Filename
         cell: Reference cell
+        data: Family data
 
     Returns:
         List of linked names
@@ -1112,105 +1295,108 @@ def linked_names(dim: str, fname: str, cell: str) -> str:
     return ", ".join(out)
 
 
-de_rham_3d = []
-de_rham_2d = []
+def build_families():
+    """Build the pages for complex families."""
+    de_rham_3d = []
+    de_rham_2d = []
+
+    for fname, data in categoriser.families["de-rham"].items():
+        family = data["elements"]
+        cnames = []
+        for key, cname in keys_and_names:
+            if key in data:
+                cnames.append("\\(" + cname(data[key], dim=3) + "\\)")
+        if len(cnames) == 0:
+            raise ValueError(f"No name found for family: {fname}")
+        sub_content = heading_with_self_ref("h1", "The " + " or ".join(cnames) + " family")
+
+        assert len([i for i in ["simplex", "tp"] if i in family]) == 1
+
+        sub_content += "<ul>"
+        for cell in ["simplex", "tp"]:
+            if cell in family:
 
-for fname, data in categoriser.families["de-rham"].items():
-    family = data["elements"]
-    cnames = []
-    for key, cname in keys_and_names:
-        if key in data:
-            cnames.append("\\(" + cname(data[key], dim=3) + "\\)")
-    if len(cnames) == 0:
-        raise ValueError(f"No name found for family: {fname}")
-    sub_content = heading_with_self_ref("h1", "The " + " or ".join(cnames) + " family")
-
-    assert len([i for i in ["simplex", "tp"] if i in family]) == 1
-
-    sub_content += "<ul>"
-    for cell in ["simplex", "tp"]:
-        if cell in family:
-
-            for o in ["0", "1", "d-1", "d"]:
-                if o in family[cell]:
-                    sub_content += f"<li><a href='/elements/{family[cell][o][1]}'"
-                    sub_content += " style='text-decoration:none'>"
-                    sub_names = []
-                    for key, cname in keys_and_names:
-                        if key in data:
-                            sub_names.append("\\(" + cname(data[key], o, cell) + "\\)")
-                    sub_content += " or ".join(sub_names)
-                    sub_content += f" ({family[cell][o][0]})</a></li>"
-
-            if all(o in family[cell] for o in ["0", "1", "d-1", "d"]):
-                row3d = "<tr>"
-                row3d += f"<td>{linked_names('3', fname, cell)}</td>"
                 for o in ["0", "1", "d-1", "d"]:
-                    row3d += f"<td><a href='/elements/{family[cell][o][1]}'"
-                    row3d += " style='text-decoration:none'>"
-                    row3d += f"{family[cell][o][0]}</a></td>"
-                    if o != "d":
-                        row3d += "<td>&nbsp;</td>"
-                row3d += "</tr>"
-                de_rham_3d.append(row3d)
-            if all(i in family[cell] for i in ["0", "d-1", "d"]):
-                row2d = "<tr>"
-                row2d += f"<td>{linked_names('2', fname, cell)}</td>"
-                for o in ["0", "d-1", "d"]:
-                    row2d += f"<td><a href='/elements/{family[cell][o][1]}'"
-                    row2d += " style='text-decoration:none'>"
-                    row2d += f"{family[cell][o][0]}</a></td>"
-                    if o != "d":
-                        row2d += "<td>&nbsp;</td>"
-                row2d += "</tr>"
-                de_rham_2d.append(row2d)
-        sub_content += "</ul>"
+                    if o in family[cell]:
+                        sub_content += f"<li><a href='/elements/{family[cell][o][1]}'"
+                        sub_content += " style='text-decoration:none'>"
+                        sub_names = []
+                        for key, cname in keys_and_names:
+                            if key in data:
+                                sub_names.append("\\(" + cname(data[key], o, cell) + "\\)")
+                        sub_content += " or ".join(sub_names)
+                        sub_content += f" ({family[cell][o][0]})</a></li>"
+
+                if all(o in family[cell] for o in ["0", "1", "d-1", "d"]):
+                    row3d = "<tr>"
+                    row3d += f"<td>{linked_names('3', fname, cell, data)}</td>"
+                    for o in ["0", "1", "d-1", "d"]:
+                        row3d += f"<td><a href='/elements/{family[cell][o][1]}'"
+                        row3d += " style='text-decoration:none'>"
+                        row3d += f"{family[cell][o][0]}</a></td>"
+                        if o != "d":
+                            row3d += "<td>&nbsp;</td>"
+                    row3d += "</tr>"
+                    de_rham_3d.append(row3d)
+                if all(i in family[cell] for i in ["0", "d-1", "d"]):
+                    row2d = "<tr>"
+                    row2d += f"<td>{linked_names('2', fname, cell, data)}</td>"
+                    for o in ["0", "d-1", "d"]:
+                        row2d += f"<td><a href='/elements/{family[cell][o][1]}'"
+                        row2d += " style='text-decoration:none'>"
+                        row2d += f"{family[cell][o][0]}</a></td>"
+                        if o != "d":
+                            row2d += "<td>&nbsp;</td>"
+                    row2d += "</tr>"
+                    de_rham_2d.append(row2d)
+            sub_content += "</ul>"
+
+        write_html_page(os.path.join(settings.htmlfamilies_path, f"{fname}.html"),
+                        "The " + " or ".join(cnames) + " family", sub_content)
+
+    content = heading_with_self_ref("h1", "Complex families")
+    content += "<p>You can find some information about how these familes are defined "
+    content += "<a href='/de-rham.html'>here</a></p>"
+    content += heading_with_self_ref("h2", "De Rham complex in 3D")
+    content += "<table class='families'>\n"
+    content += "<tr>"
+    content += "<td><small>Name(s)</small></td>"
+    content += "<td>\\(H^1\\)</td>"
+    content += "<td>\\(\\xrightarrow{\\nabla}\\)</td>"
+    content += "<td>\\(H(\\textbf{curl})\\)</td>"
+    content += "<td>\\(\\xrightarrow{\\nabla\\times}\\)</td>"
+    content += "<td>\\(H(\\text{div})\\)</td>"
+    content += "<td>\\(\\xrightarrow{\\nabla\\cdot}\\)</td>"
+    content += "<td>\\(L^2\\)</td>"
+    content += "</tr>\n"
+    content += "\n".join(de_rham_3d)
+    content += "</table>"
+    content += heading_with_self_ref("h2", "De Rham complex in 2D")
+    content += "<table class='families'>\n"
+    content += "<tr>"
+    content += "<td><small>Name(s)</small></td>"
+    content += "<td>\\(H^1\\)</td>"
+    content += "<td>\\(\\xrightarrow{\\textbf{curl}}\\)</td>"
+    content += "<td>\\(H(\\text{div})\\)</td>"
+    content += "<td>\\(\\xrightarrow{\\nabla\\cdot}\\)</td>"
+    content += "<td>\\(L_2\\)</td>"
+    content += "</tr>\n"
+    content += "\n".join(de_rham_2d)
+    content += "</table>"
+    write_html_page(os.path.join(settings.htmlfamilies_path, "index.html"),
+                    "Complex families", content)
 
-    write_html_page(os.path.join(settings.htmlfamilies_path, f"{fname}.html"),
-                    "The " + " or ".join(cnames) + " family", sub_content)
-
-content = heading_with_self_ref("h1", "Complex families")
-content += "<p>You can find some information about how these familes are defined "
-content += "<a href='/de-rham.html'>here</a></p>"
-content += heading_with_self_ref("h2", "De Rham complex in 3D")
-content += "<table class='families'>\n"
-content += "<tr>"
-content += "<td><small>Name(s)</small></td>"
-content += "<td>\\(H^1\\)</td>"
-content += "<td>\\(\\xrightarrow{\\nabla}\\)</td>"
-content += "<td>\\(H(\\textbf{curl})\\)</td>"
-content += "<td>\\(\\xrightarrow{\\nabla\\times}\\)</td>"
-content += "<td>\\(H(\\text{div})\\)</td>"
-content += "<td>\\(\\xrightarrow{\\nabla\\cdot}\\)</td>"
-content += "<td>\\(L^2\\)</td>"
-content += "</tr>\n"
-content += "\n".join(de_rham_3d)
-content += "</table>"
-content += heading_with_self_ref("h2", "De Rham complex in 2D")
-content += "<table class='families'>\n"
-content += "<tr>"
-content += "<td><small>Name(s)</small></td>"
-content += "<td>\\(H^1\\)</td>"
-content += "<td>\\(\\xrightarrow{\\textbf{curl}}\\)</td>"
-content += "<td>\\(H(\\text{div})\\)</td>"
-content += "<td>\\(\\xrightarrow{\\nabla\\cdot}\\)</td>"
-content += "<td>\\(L_2\\)</td>"
-content += "</tr>\n"
-content += "\n".join(de_rham_2d)
-content += "</table>"
-write_html_page(os.path.join(settings.htmlfamilies_path, "index.html"), "Complex families", content)
-
-# List of lists
-content = heading_with_self_ref("h1", "Lists of elements")
-content += "<ul>\n"
-content += "<li><a href='/lists/categories'>Finite elements by category</a></li>\n"
-content += "<li><a href='/lists/references'>Finite elements by reference element</a></li>\n"
-content += "<li><a href='/lists/recent.html'>Recently added/updated finite elements</a></li>\n"
-content += "</ul>"
-write_html_page(os.path.join(settings.htmlindices_path, "index.html"), "Lists of elements", content)
-
-# Site map
-sitemap[html_local(os.path.join(settings.html_path, "sitemap.html"))] = "List of all pages"
+
+def build_lists():
+    """Build the list of lists."""
+    content = heading_with_self_ref("h1", "Lists of elements")
+    content += "<ul>\n"
+    content += "<li><a href='/lists/categories'>Finite elements by category</a></li>\n"
+    content += "<li><a href='/lists/references'>Finite elements by reference element</a></li>\n"
+    content += "<li><a href='/lists/recent.html'>Recently added/updated finite elements</a></li>\n"
+    content += "</ul>"
+    write_html_page(os.path.join(settings.htmlindices_path, "index.html"),
+                    "Lists of elements", content)
 
 
 def list_pages(folder: str) -> str:
@@ -1234,7 +1420,7 @@ def list_pages(folder: str) -> str:
                     items.append((j.lower(), list_pages(f"{folder}/{subfolder}")))
             elif file != "index.html":
                 items.append((j.lower(), f"<li><a href='{i}'>{j}</a></li>"))
-    items.sort(key=lambda a: a[0])
+    items.sort()
     out = ""
     if folder != "":
         title = sitemap[f"{folder}/index.html"]
@@ -1245,9 +1431,112 @@ def list_pages(folder: str) -> str:
     return out
 
 
-content = heading_with_self_ref("h1", "List of all pages") + list_pages("")
-with open(os.path.join(settings.html_path, "sitemap.html"), "w") as f:
-    f.write(make_html_page(content))
+def build_sitemap():
+    """Build the sitemap."""
+    sitemap[html_local(os.path.join(settings.html_path, "sitemap.html"))] = "List of all pages"
+    content = heading_with_self_ref("h1", "List of all pages") + list_pages("")
+    with open(os.path.join(settings.html_path, "sitemap.html"), "w") as f:
+        f.write(make_html_page(content))
+    manifest.record("/sitemap.html", None, "List of all pages")
+
+
+# Build targets, and the targets that they depend on
+targets: typing.Dict[str, typing.Tuple[typing.Callable[[], None], typing.List[str]]] = {
+    "pages": (build_pages, []),
+    "elements": (build_elements, []),
+    "badges": (build_badges, []),
+    "verification": (build_verification, []),
+    "examples": (build_examples, ["elements"]),
+    "index": (build_index, []),
+    "recent": (build_recent, []),
+    "categories": (build_categories, []),
+    "implementations": (build_implementations, []),
+    "references": (build_references, []),
+    "reference-numbering": (build_reference_numbering, []),
+    "families": (build_families, []),
+    "lists": (build_lists, []),
+}
+targets["sitemap"] = (build_sitemap, list(targets))
+
+selected_targets = list(targets)
+if args.only is not None:
+    selected_targets = args.only.split(",")
+if args.skip is not None:
+    selected_targets = [t for t in selected_targets if t not in args.skip.split(",")]
+for t in selected_targets + ([] if args.skip is None else args.skip.split(",")):
+    if t not in targets:
+        parser.error(f"Unknown target: {t}. Available targets are: {', '.join(targets)}")
+
+build_timings = TimingDatabase(os.path.join(settings.cache_path, "build-timings.json"))
+target_pages: typing.Dict[str, str] = {}
+
+
+def build_target(name: str) -> typing.Dict[str, typing.Any]:
+    """Build a target.
+
+    This function may be run on a child process, so it returns everything that the main
+    process needs to know about the target.
+
+    Args:
+        name: The name of the target
+
+    Returns:
+        The sitemap entries of the pages that were written and the changes made to the manifest
+    """
+    manifest.pop_updates()
+    manifest.target = name
+    before = set(sitemap)
+    targets[name][0]()
+    manifest.target = None
+    return {"sitemap": {i: j for i, j in sitemap.items() if i not in before},
+            "manifest": manifest.pop_updates()}
+
+
+def target_complete(name: str, result: typing.Dict[str, typing.Any]):
+    """Merge the result of a target into the sitemap and manifest.
+
+    Args:
+        name: The name of the target
+        result: The result of the target
+    """
+    for path, title in result["sitemap"].items():
+        assert target_pages.get(path, name) == name
+        target_pages[path] = name
+        sitemap[path] = title
+    manifest.merge(result["manifest"])
+
+
+# Outputs of targets that are not being built are kept from the previous build
+skipped_targets = [t for t in targets if t not in selected_targets]
+for t in skipped_targets + ([None] if len(skipped_targets) > 0 else []):
+    for output in manifest.keep_target(t):
+        title = manifest.title(output)
+        if title is not None:
+            sitemap[output] = title
+
+# The elements and examples targets run their own pools of settings.processes processes, so no
+# other targets are run at the same time as them
+run_targets(
+    {t: (functools.partial(build_target, t), targets[t][1]) for t in selected_targets},
+    settings.processes, target_complete,
+    {"elements": settings.processes, "examples": settings.processes})
+
+# Remove outputs of previous builds that are no longer built, and save the manifest
+for output in manifest.remove_stale():
+    print(f"Removed {output}")
+manifest.save()
+
+# Replace the output folder with the staging folder
+changed, unchanged = staging.link_unchanged(settings.html_path, output_path)
+staging.swap(settings.html_path, output_path)
+set_html_path(output_path)
+print(f"{changed} files changed, {unchanged} files unchanged")
+
+skipped_pages = [i for i in manifest.skipped if not i.startswith("/img/")]
+print(f"Skipped {len(skipped_pages)} up-to-date pages and "
+      f"{len(manifest.skipped) - len(skipped_pages)} up-to-date images")
+for output in skipped_pages:
+    print(f"  {output}")
 
 end_all = datetime.now()
 print(f"Total time: {(end_all - start_all).total_seconds():.2f}s")
@@ -0,0 +1,106 @@
+"""Persistent cache of Symfem elements."""
+
+import os
+import pickle
+import tempfile
+import typing
+
+import symfem
+from symfem.finite_element import FiniteElement
+
+from defelement import settings
+from defelement.tools import hash_data, hash_folder
+
+_elements: typing.Dict[str, FiniteElement] = {}
+_symfem_hash: typing.Optional[str] = None
+
+
+def symfem_hash() -> str:
+    """Get a hash of the source code of the installed version of Symfem.
+
+    Symfem is often installed from its main branch, where the version number does not
+    change when the code does, so the source code is hashed instead.
+
+    Returns:
+        Hex digest of the hash
+    """
+    global _symfem_hash
+    if _symfem_hash is None:
+        _symfem_hash = hash_folder(os.path.dirname(symfem.__file__), ".py")
+    return _symfem_hash
+
+
+def write_atomic(filename: str, data: bytes):
+    """Write a file so that other processes never see a partially written file.
+
+    Args:
+        filename: The filename
+        data: The data to write
+    """
+    folder = os.path.dirname(filename)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+
+def element_key(cell: str, name: str, degree: typing.Optional[int], **kwargs: typing.Any) -> str:
+    """Get the key used to cache a Symfem element.
+
+    Args:
+        cell: The reference cell
+        name: The Symfem name of the element
+        degree: The degree
+        kwargs: Keyword arguments passed to Symfem (including the variant)
+
+    Returns:
+        The key
+    """
+    return hash_data(cell, name, degree, kwargs, symfem_hash())
+
+
+def create_element(
+    cell: str, name: str, degree: typing.Optional[int], **kwargs: typing.Any
+) -> FiniteElement:
+    """Create a Symfem element, using a cached element if one is available.
+
+    The element and its basis functions are stored on disk, so that the basis functions
+    only need to be computed once for each combination of inputs and version of Symfem.
+
+    Args:
+        cell: The reference cell
+        name: The Symfem name of the element
+        degree: The degree
+        kwargs: Keyword arguments passed to Symfem (including the variant)
+
+    Returns:
+        The element
+    """
+    key = element_key(cell, name, degree, **kwargs)
+    if key in _elements:
+        return _elements[key]
+
+    filename = os.path.join(settings.cache_path, "elements", f"{key}.pickle")
+    if os.path.isfile(filename):
+        try:
+            with open(filename, "rb") as f:
+                element = pickle.load(f)
+            _elements[key] = element
+            return element
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+
+    element = symfem.create_element(cell, name, degree, **kwargs)
+    element.get_basis_functions()
+    try:
+        write_atomic(filename, pickle.dumps(element))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        pass
+    _elements[key] = element
+    return element
@@ -3,9 +3,7 @@
 import os
 import typing
 import warnings
-from datetime import datetime
 
-import pytz
 import sympy
 import yaml
 from github import Github
@@ -13,9 +11,11 @@ from github import Github
 from defelement import settings
 from defelement.families import arnold_logg_reference, cockburn_fu_reference, keys_and_names
 from defelement.implementations import (DegreeNotImplemented, NotImplementedOnReference,
-                                        VariantNotImplemented, examples, implementations)
+                                        VariantNotImplemented, example_with_degree, examples,
+                                        implementations, parse_example)
 from defelement.markup import insert_links
-from defelement.polyset import make_extra_info, make_poly_set
+from defelement.polyset import make_extra_info, make_poly_set, named_set_names
+from defelement.tools import build_date
 
 
 def make_dof_data(
@@ -264,7 +264,7 @@ class Element:
         """
         if "alt-names" not in self.data:
             return []
-        out = self.data["alt-names"]
+        out = list(self.data["alt-names"])
         if include_complexes:
             out += self.complexes(link=link)
         if include_variants and "variants" in self.data:
@@ -514,6 +514,20 @@ class Element:
 
         return make_dof_d(self.data["dofs"])
 
+    def polynomial_set_names(self) -> typing.List[str]:
+        """Get the names of the named polynomial sets used by the element.
+
+        Returns:
+            The names of the named sets
+        """
+        if "polynomial-set" not in self.data:
+            return []
+        if isinstance(self.data["polynomial-set"], dict):
+            psets = list(self.data["polynomial-set"].values())
+        else:
+            psets = [self.data["polynomial-set"]]
+        return [n for p in psets for n in named_set_names(p)]
+
     def make_polynomial_set_html(self) -> str:
         """Format polynomial set as HTML.
 
@@ -909,6 +923,68 @@ class Element:
             return []
         return self.data["examples"]
 
+    def degree_sweep(self, start: int, end: int) -> typing.List[str]:
+        """Get examples of the element at a range of degrees.
+
+        An example is made at each degree in the range for each of the element's examples,
+        respecting the element's minimum and maximum degrees. Examples that are already
+        included in the element's examples are not included.
+
+        Args:
+            start: The first degree
+            end: The degree after the last degree
+
+        Returns:
+            List of examples, ordered by degree
+        """
+        import symfem
+
+        def evaluate(degree: typing.Union[int, str], ref: str) -> int:
+            """Evaluate a degree that may depend on the dimension of the cell.
+
+            Args:
+                degree: The degree, or a formula for it in terms of the dimension d
+                ref: The reference cell
+
+            Returns:
+                The degree
+            """
+            if isinstance(degree, int):
+                return degree
+            tdim = symfem.create_reference(ref).tdim
+            return int(sympy.S(degree).subs(sympy.Symbol("d"), tdim))
+
+        sweep: typing.List[typing.Tuple[int, str]] = []
+        for eg in self.examples:
+            ref = parse_example(eg)[0]
+            min_degree = evaluate(self.min_degree(ref), ref)
+            max_o = self.max_degree(ref)
+            max_degree = None if max_o is None else evaluate(max_o, ref)
+            for degree in range(max(start, min_degree), end):
+                if max_degree is not None and degree > max_degree:
+                    break
+                new_eg = example_with_degree(eg, degree)
+                if new_eg not in self.examples and (degree, new_eg) not in sweep:
+                    sweep.append((degree, new_eg))
+        return [eg for _, eg in sorted(sweep, key=lambda s: s[0])]
+
+
+def load_element(filename: str) -> Element:
+    """Load an element from its .def file.
+
+    Args:
+        filename: The filename of the .def file (without the extension)
+
+    Returns:
+        The element
+    """
+    path = os.path.join(settings.element_path, f"{filename}.def")
+    if not os.path.isfile(path):
+        raise ValueError(f"Unknown element: {filename}")
+    with open(path) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    return Element(data, filename)
+
 
 class Categoriser:
     """Categoriser."""
@@ -987,7 +1063,7 @@ class Categoriser:
         Args:
             folder: Folder name
         """
-        for file in os.listdir(folder):
+        for file in sorted(os.listdir(folder)):
             if file.endswith(".def") and not file.startswith("."):
                 with open(os.path.join(folder, file)) as f:
                     data = yaml.load(f, Loader=yaml.FullLoader)
@@ -1007,8 +1083,8 @@ class Categoriser:
                     e.created = commits.get_page(-1)[-1].commit.committer.date
                     e.modified = commits.get_page(0)[0].commit.committer.date
                 except IndexError:
-                    e.created = datetime.utcnow().replace(tzinfo=pytz.utc)
-                    e.modified = datetime.utcnow().replace(tzinfo=pytz.utc)
+                    e.created = build_date()
+                    e.modified = build_date()
 
         self.elements.sort(key=lambda x: x.name.lower())
 
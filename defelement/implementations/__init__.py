@@ -6,11 +6,11 @@ from inspect import isclass
 
 from defelement.implementations.core import (DegreeNotImplemented, Implementation,
                                              NotImplementedOnReference, VariantNotImplemented,
-                                             parse_example)
+                                             example_with_degree, parse_example)
 
 implementations = {}
 this_dir = os.path.dirname(os.path.realpath(__file__))
-for file in os.listdir(this_dir):
+for file in sorted(os.listdir(this_dir)):
     if file.endswith(".py") and not file.startswith("_") and file != "core.py":
         mod = importlib.import_module(f"defelement.implementations.{file[:-3]}")
         for name in dir(mod):
@@ -23,3 +23,4 @@ for file in os.listdir(this_dir):
 formats = {id: i.format for id, i in implementations.items()}
 examples = {id: i.example for id, i in implementations.items()}
 verifications = {id: i.verify for id, i in implementations.items() if i.verification}
+versions = {id: i.version for id, i in implementations.items() if i.verification}
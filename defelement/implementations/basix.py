@@ -2,7 +2,8 @@
 
 import typing
 
-from defelement.implementations.core import Array, Element, Implementation, parse_example
+from defelement.implementations.core import (Array, Element, Implementation, installed_version,
+                                             parse_example)
 
 
 class BasixImplementation(Implementation):
@@ -65,6 +66,15 @@ class BasixImplementation(Implementation):
             out += ")"
         return out
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed
+        """
+        return installed_version("fenics-basix")
+
     @staticmethod
     def verify(
         element: Element, example: str
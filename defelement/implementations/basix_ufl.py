@@ -3,7 +3,8 @@
 import typing
 
 from defelement.implementations.basix import BasixImplementation
-from defelement.implementations.core import Array, Element, Implementation, parse_example
+from defelement.implementations.core import (Array, Element, Implementation, installed_version,
+                                             parse_example)
 
 
 class BasixUFLImplementation(Implementation):
@@ -68,6 +69,15 @@ class BasixUFLImplementation(Implementation):
             out += ")"
         return out
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed
+        """
+        return installed_version("fenics-basix", "fenics-ufl")
+
     @staticmethod
     def verify(
         element: Element, example: str
@@ -58,6 +58,15 @@ class Implementation(ABC):
         """
         raise NotImplementedError()
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed or its version is unknown
+        """
+        return None
+
     @staticmethod
     def notes(
         element: Element
@@ -110,6 +119,23 @@ class NotImplementedOnReference(NotImplementedError):
     """Error for element not implemented on a reference cell."""
 
 
+def installed_version(*packages: str) -> typing.Optional[str]:
+    """Get the installed version of some Python packages.
+
+    Args:
+        packages: The names of the packages
+
+    Returns:
+        The versions of the packages, or None if any of the packages are not installed
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return ",".join(version(p) for p in packages)
+    except PackageNotFoundError:
+        return None
+
+
 ValueType = typing.Union[int, str, typing.List["ValueType"]]
 
 
@@ -162,3 +188,19 @@ def parse_example(
         ref, degree = e.split(",")
         variant = None
     return ref, int(degree), variant, kwargs
+
+
+def example_with_degree(e: str, degree: int) -> str:
+    """Change the degree of an example.
+
+    Args:
+        e: The example
+        degree: The new degree
+
+    Returns:
+        The example with the new degree
+    """
+    e, sep, rest = e.partition(" {")
+    s = e.split(",")
+    s[1] = f"{degree}"
+    return ",".join(s) + sep + rest
@@ -4,7 +4,8 @@ import typing
 
 import sympy
 
-from defelement.implementations.core import Array, Element, Implementation, parse_example
+from defelement.implementations.core import (Array, Element, Implementation, installed_version,
+                                             parse_example)
 
 # TODO make this a FIAT attribute
 true_space_dimension = {
@@ -91,6 +92,15 @@ class FIATImplementation(Implementation):
             out += ")"
         return out
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed
+        """
+        return installed_version("firedrake-fiat") or installed_version("fenics-fiat")
+
     @staticmethod
     def verify(
         element: Element, example: str
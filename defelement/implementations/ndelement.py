@@ -2,7 +2,8 @@
 
 import typing
 
-from defelement.implementations.core import Array, Element, Implementation, parse_example
+from defelement.implementations.core import (Array, Element, Implementation, installed_version,
+                                             parse_example)
 
 
 class NDElementImplementation(Implementation):
@@ -64,6 +65,15 @@ class NDElementImplementation(Implementation):
             out = "from ndelement.ciarlet import Family, create_family" + out
         return out
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed
+        """
+        return installed_version("ndelement")
+
     @staticmethod
     def verify(
         element: Element, example: str
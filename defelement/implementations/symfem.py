@@ -4,7 +4,9 @@ import typing
 
 from symfem.finite_element import FiniteElement
 
-from defelement.implementations.core import Array, Element, Implementation, parse_example
+from defelement import settings
+from defelement.implementations.core import (Array, Element, Implementation, installed_version,
+                                             parse_example)
 from defelement.tools import to_array
 
 
@@ -18,26 +20,96 @@ def symfem_create_element(element: Element, example: str) -> FiniteElement:
     Returns:
         Symfem element
     """
-    import symfem
+    from defelement.cache import create_element
 
     ref, deg, variant, kwargs = parse_example(example)
     symfem_name, input_deg, params = element.get_implementation_string("symfem", ref, deg, variant)
     assert symfem_name is not None
     if ref == "dual polygon":
         ref += "(4)"
-    return symfem.create_element(ref, symfem_name, input_deg, **params)
+    return create_element(ref, symfem_name, input_deg, **params)
+
+
+def symfem_lagrange_superdegree(element: Element, example: str) -> typing.Optional[int]:
+    """Get the Lagrange superdegree of a Symfem element.
+
+    Args:
+        element: Element info
+        example: The example
+
+    Returns:
+        The Lagrange superdegree, or None if this is not known or the element's basis functions
+        are piecewise
+    """
+    from symfem.piecewise_functions import PiecewiseFunction
+
+    e = symfem_create_element(element, example)
+    if any(isinstance(f, PiecewiseFunction) for f in e.get_basis_functions()):
+        return None
+    try:
+        return e.lagrange_superdegree
+    except NotImplementedError:
+        return None
+
+
+def compile_basis(element: FiniteElement) -> typing.Optional[typing.Callable[[Array], Array]]:
+    """Compile the basis functions of a Symfem element into a function that uses numpy.
+
+    Args:
+        element: Symfem element
+
+    Returns:
+        A function that tabulates the basis functions at a set of points, or None if the basis
+        functions cannot be compiled
+    """
+    import numpy as np
+    import sympy
+    from symfem.piecewise_functions import PiecewiseFunction
+    from symfem.symbols import x
+
+    basis = element.get_basis_functions()
+    if any(isinstance(f, PiecewiseFunction) for f in basis):
+        return None
+
+    values = []
+    for f in basis:
+        value = f.as_sympy()
+        values.append(list(value) if isinstance(value, (tuple, sympy.MatrixBase)) else [value])
+    expressions = [v[c] for c in range(element.range_dim) for v in values]
+    evaluate = sympy.lambdify(x, expressions, "numpy", cse=True)
+
+    def tabulate(points: Array) -> Array:
+        """Tabulate the basis functions.
+
+        Args:
+            points: Points to tabulate at
+
+        Returns:
+            Values of basis functions
+        """
+        npts = points.shape[0]
+        coordinates = [points[:, i] if i < points.shape[1] else np.zeros(npts) for i in range(3)]
+        table = np.array([np.broadcast_to(np.asarray(v, dtype=float), (npts, ))
+                          for v in evaluate(*coordinates)])
+        return table.reshape(element.range_dim, element.space_dim, npts).transpose((2, 0, 1))
+
+    return tabulate
 
 
 class CachedSymfemTabulator:
     """Symfem tabulator with caching."""
 
-    def __init__(self, element: FiniteElement):
+    def __init__(self, element: FiniteElement, exact: bool = False):
         """Initialise.
 
         Args:
             element: Symfem element
+            exact: If True, the basis functions are evaluated exactly at each point. If False,
+                the basis functions are compiled into a function that uses numpy (if possible)
         """
         self.element = element
+        self.exact = exact
+        self.compiled: typing.Optional[typing.Callable[[Array], Array]] = None
         self.tables: typing.List[typing.Tuple[Array, Array]] = []
 
     def tabulate(self, points: Array) -> Array:
@@ -54,10 +126,17 @@ class CachedSymfemTabulator:
         for i, j in self.tables:
             if i.shape == points.shape and np.allclose(i, points):
                 return j
-        shape = (points.shape[0], self.element.range_dim, self.element.space_dim)
-        table = to_array(self.element.tabulate_basis(points, "xx,yy,zz"))
-        assert not isinstance(table, float)
-        table = table.reshape(shape)
+        if not self.exact and self.compiled is None:
+            self.compiled = compile_basis(self.element)
+            if self.compiled is None:
+                self.exact = True
+        if self.compiled is not None:
+            table = self.compiled(points)
+        else:
+            shape = (points.shape[0], self.element.range_dim, self.element.space_dim)
+            exact_table = to_array(self.element.tabulate_basis(points, "xx,yy,zz"))
+            assert not isinstance(exact_table, float)
+            table = exact_table.reshape(shape)
         self.tables.append((points, table))
         return table
 
@@ -116,6 +195,15 @@ class SymfemImplementation(Implementation):
             out += ")"
         return out
 
+    @staticmethod
+    def version() -> typing.Optional[str]:
+        """Get the version of the implementation that is installed.
+
+        Returns:
+            The version, or None if the implementation is not installed
+        """
+        return installed_version("symfem")
+
     @staticmethod
     def verify(
         element: Element, example: str
@@ -129,17 +217,10 @@ class SymfemImplementation(Implementation):
         Returns:
             List of entity dofs, and tabulation function
         """
-        import symfem
-
-        ref, deg, variant, kwargs = parse_example(example)
-        symfem_name, input_deg, params = element.get_implementation_string(
-            "symfem", ref, deg, variant)
-        if ref == "dual polygon":
-            ref += "(4)"
-        e = symfem.create_element(ref, symfem_name, input_deg, **params)
+        e = symfem_create_element(element, example)
         edofs = [[e.entity_dofs(i, j) for j in range(e.reference.sub_entity_count(i))]
                  for i in range(e.reference.tdim + 1)]
-        t = CachedSymfemTabulator(e)
+        t = CachedSymfemTabulator(e, settings.exact_symfem_tabulation)
         return edofs, lambda points: t.tabulate(points)
 
     id = "symfem"
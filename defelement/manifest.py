@@ -0,0 +1,286 @@
+"""Build manifest."""
+
+import json
+import os
+import typing
+
+from defelement import settings
+from defelement.cache import symfem_hash
+from defelement.tools import hash_data, hash_folder, link_or_copy
+
+_hashes: typing.Dict[str, str] = {}
+
+
+def code_hash() -> str:
+    """Get a hash of the code and data that every output depends on.
+
+    Returns:
+        Hex digest of the hash
+    """
+    if "code" not in _hashes:
+        _hashes["code"] = hash_data(
+            hash_folder(os.path.join(settings.dir_path, "defelement"), ".py"),
+            hash_folder(settings.data_path),
+            symfem_hash())
+    return _hashes["code"]
+
+
+def html_hash() -> str:
+    """Get a hash of the code, data and templates that every HTML page depends on.
+
+    Returns:
+        Hex digest of the hash
+    """
+    if "html" not in _hashes:
+        _hashes["html"] = hash_data(code_hash(), hash_folder(settings.template_path))
+    return _hashes["html"]
+
+
+class Manifest:
+    """Record of the inputs that each output file was built from.
+
+    Each output is identified by its path relative to the HTML folder. An entry stores a hash of
+    the output's inputs, the page title (if the output is a HTML page), any additional files
+    that are written alongside the output, the other outputs that it uses, and the build target
+    that wrote it.
+    """
+
+    def __init__(self):
+        """Initialise."""
+        self.filename: typing.Optional[str] = None
+        self.previous_path: typing.Optional[str] = None
+        self.target: typing.Optional[str] = None
+        self.entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self.touched: typing.Set[str] = set()
+        self.skipped: typing.List[str] = []
+        self.used: typing.List[str] = []
+        self._updates: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._skipped_updates: typing.List[str] = []
+
+    def load(self, filename: str, previous_path: typing.Optional[str] = None) -> bool:
+        """Load a manifest from a file.
+
+        Args:
+            filename: The filename the manifest is saved to
+            previous_path: The folder containing the output of the previous build. If this is
+                not None, the manifest is loaded from the file with the same name in this
+                folder. If this is None, the previous build is assumed to be in the HTML folder
+
+        Returns:
+            True if a previous manifest was found, otherwise False
+        """
+        self.filename = filename
+        self.previous_path = previous_path
+        self.entries = {}
+        self.touched = set()
+        self.skipped = []
+        previous_filename = filename if previous_path is None else os.path.join(
+            previous_path, os.path.basename(filename))
+        if not os.path.isfile(previous_filename):
+            return False
+        with open(previous_filename) as f:
+            self.entries = json.load(f)
+        return True
+
+    def save(self):
+        """Save the manifest."""
+        assert self.filename is not None
+        with open(self.filename, "w") as f:
+            json.dump({i: self.entries[i] for i in sorted(self.touched)}, f, indent=1,
+                      sort_keys=True)
+
+    def _exists(self, output: str) -> bool:
+        """Check that an output and all its additional files exist.
+
+        Args:
+            output: The output
+
+        Returns:
+            True if all the files exist, otherwise False
+        """
+        entry = self.entries[output]
+        path = settings.html_path if self.previous_path is None else self.previous_path
+        return all(os.path.isfile(os.path.join(path, i.lstrip("/")))
+                   for i in [output] + entry["files"])
+
+    def keep(self, output: str):
+        """Mark an existing output (and everything it uses) as part of this build.
+
+        If the previous build is in a different folder, the output's files are linked into
+        the HTML folder.
+
+        Args:
+            output: The output
+        """
+        if output in self.touched:
+            return
+        self.touched.add(output)
+        self._updates[output] = self.entries[output]
+        if self.previous_path is not None:
+            for i in [output] + self.entries[output]["files"]:
+                old = os.path.join(self.previous_path, i.lstrip("/"))
+                new = os.path.join(settings.html_path, i.lstrip("/"))
+                if os.path.isfile(old) and not os.path.exists(new):
+                    link_or_copy(old, new)
+        for i in self.entries[output]["uses"]:
+            if i in self.entries:
+                self.keep(i)
+
+    def keep_target(self, target: typing.Optional[str]) -> typing.List[str]:
+        """Keep all the outputs from a previous build that were written by a target.
+
+        This is used when a target is not rebuilt.
+
+        Args:
+            target: The name of the target, or None to keep outputs that were not written by a
+                target
+
+        Returns:
+            List of kept outputs
+        """
+        kept = [i for i, j in self.entries.items() if j.get("target") == target]
+        for output in kept:
+            self.keep(output)
+        return kept
+
+    def up_to_date(self, output: str, input_hash: str) -> bool:
+        """Check if an output is up to date.
+
+        If the output is up to date, it is kept as part of this build.
+
+        Args:
+            output: The output
+            input_hash: Hash of the inputs the output is built from
+
+        Returns:
+            True if the output is up to date, otherwise False
+        """
+        if output in self.entries and self.entries[output]["hash"] == input_hash:
+            if output in self.touched:
+                # The output has already been built by another target in this build
+                return True
+            if self._exists(output) and all(i in self.entries for i in
+                                            self.entries[output]["uses"]):
+                self.keep(output)
+                self.skipped.append(output)
+                self._skipped_updates.append(output)
+                return True
+        self._unlink_previous(output)
+        return False
+
+    def _unlink_previous(self, output: str):
+        """Remove links to the previous build's files of an output that is going to be rebuilt.
+
+        An output can already have been linked into the HTML folder if another output that uses
+        it was kept. Rebuilding it would then write to the files of the previous build, which may
+        be the output folder.
+
+        Args:
+            output: The output
+        """
+        if self.previous_path is None or output not in self.entries:
+            return
+        for i in [output] + self.entries[output]["files"]:
+            old = os.path.join(self.previous_path, i.lstrip("/"))
+            new = os.path.join(settings.html_path, i.lstrip("/"))
+            if os.path.isfile(old) and os.path.isfile(new) and os.path.samefile(old, new):
+                os.unlink(new)
+
+    def record(
+        self, output: str, input_hash: typing.Optional[str], title: typing.Optional[str] = None,
+        files: typing.List[str] = [], uses: typing.List[str] = []
+    ):
+        """Record that an output has been built.
+
+        Args:
+            output: The output
+            input_hash: Hash of the inputs the output is built from, or None if the output
+                should always be rebuilt
+            title: The page title
+            files: Additional files written alongside the output
+            uses: Other outputs that this output uses
+        """
+        self.entries[output] = {
+            "hash": input_hash, "title": title, "files": list(files), "uses": sorted(uses),
+            "target": self.target}
+        self.touched.add(output)
+        self._updates[output] = self.entries[output]
+
+    def use(self, output: str):
+        """Note that the page currently being built uses an output.
+
+        Args:
+            output: The output
+        """
+        if output not in self.used:
+            self.used.append(output)
+
+    def pop_used(self) -> typing.List[str]:
+        """Get the outputs used by the page currently being built and reset the list.
+
+        Returns:
+            List of outputs
+        """
+        used = self.used
+        self.used = []
+        return used
+
+    def title(self, output: str) -> typing.Optional[str]:
+        """Get the title of a page.
+
+        Args:
+            output: The output
+
+        Returns:
+            The title
+        """
+        return self.entries[output]["title"]
+
+    def pop_updates(self) -> typing.Dict[str, typing.Any]:
+        """Get the changes made to the manifest in this process and reset them.
+
+        This is used to pass the changes made in a worker process back to the main process.
+
+        Returns:
+            Changes to the manifest
+        """
+        updates = {"entries": self._updates, "skipped": self._skipped_updates}
+        self._updates = {}
+        self._skipped_updates = []
+        return updates
+
+    def merge(self, updates: typing.Dict[str, typing.Any]):
+        """Merge changes made in another process into this manifest.
+
+        Args:
+            updates: Changes to the manifest
+        """
+        for output, entry in updates["entries"].items():
+            self.entries[output] = entry
+            self.touched.add(output)
+            self._updates[output] = entry
+        skipped = set(self.skipped)
+        new_skipped = [i for i in updates["skipped"] if i not in skipped]
+        self.skipped += new_skipped
+        self._skipped_updates += new_skipped
+
+    def remove_stale(self) -> typing.List[str]:
+        """Delete outputs from previous builds that were not part of this build.
+
+        Returns:
+            List of deleted outputs
+        """
+        removed = []
+        for output in sorted(self.entries):
+            if output not in self.touched:
+                for i in [output] + self.entries[output]["files"]:
+                    path = os.path.join(settings.html_path, i.lstrip("/"))
+                    if os.path.isfile(path):
+                        os.remove(path)
+                removed.append(output)
+        for output in removed:
+            del self.entries[output]
+        return removed
+
+
+manifest = Manifest()
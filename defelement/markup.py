@@ -5,7 +5,6 @@ import re
 import shlex
 import typing
 import warnings
-from datetime import datetime
 from urllib.parse import quote_plus
 
 import symfem
@@ -13,7 +12,8 @@ import yaml
 from github import Github
 
 from defelement import plotting, settings, symbols
-from defelement.tools import comma_and_join
+from defelement.cache import create_element
+from defelement.tools import build_date, comma_and_join
 
 page_references: typing.List[str] = []
 
@@ -243,7 +243,7 @@ def preprocess(content: str) -> str:
     Returns:
         Preprocessed content
     """
-    for file in os.listdir(settings.dir_path):
+    for file in sorted(os.listdir(settings.dir_path)):
         if file.endswith(".md"):
             if f"{{{{{file}}}}}" in content:
                 with open(os.path.join(settings.dir_path, file)) as f:
@@ -471,9 +471,9 @@ def plot_element(matches: typing.Match[str]) -> str:
     """
     if "variant=" in matches[1]:
         a, b = matches[1].split(" variant=")
-        e = symfem.create_element(a, matches[2], int(matches[3]), b)
+        e = create_element(a, matches[2], int(matches[3]), variant=b)
     else:
-        e = symfem.create_element(matches[1], matches[2], int(matches[3]))
+        e = create_element(matches[1], matches[2], int(matches[3]))
     return ("<center>"
             f"{''.join([plotting.plot_function(e, i) for i in range(e.space_dim)])}"
             "</center>")
@@ -490,9 +490,9 @@ def plot_single_element(matches: typing.Match[str]) -> str:
     """
     if "variant=" in matches[1]:
         a, b = matches[1].split(" variant=")
-        e = symfem.create_element(a, matches[2], int(matches[3]), b)
+        e = create_element(a, matches[2], int(matches[3]), variant=b)
     else:
-        e = symfem.create_element(matches[1], matches[2], int(matches[3]))
+        e = create_element(matches[1], matches[2], int(matches[3]))
     return f"<center>{plotting.plot_function(e, int(matches[4]))}</center>"
 
 
@@ -551,9 +551,9 @@ def insert_dates(txt: str) -> str:
     Returns:
         Text with dates inserted
     """
-    now = datetime.now()
-    txt = txt.replace("{{date:Y}}", now.strftime("%Y"))
-    txt = txt.replace("{{date:D-M-Y}}", now.strftime("%d-%B-%Y"))
+    date = build_date()
+    txt = txt.replace("{{date:Y}}", date.strftime("%Y"))
+    txt = txt.replace("{{date:D-M-Y}}", date.strftime("%d-%B-%Y"))
     txt = re.sub("{{symbols\\.([^}\\(]+)\\(([0-9]+)\\)}}",
                  lambda m: getattr(symbols, m[1])(int(m[2])), txt)
     txt = re.sub("{{symbols\\.([^}]+)}}", lambda m: getattr(symbols, m[1]), txt)
@@ -2,15 +2,16 @@
 
 import os
 import typing
-from datetime import datetime
 
 import sympy
 from symfem.finite_element import FiniteElement
 from symfem.plotting import Picture, colors
 
 from defelement import settings
+from defelement.manifest import code_hash, html_hash, manifest
+from defelement.shards import in_shard
+from defelement.tools import build_date, hash_data, hash_files
 
-now = datetime.now()
 svg_desc = (
    "This plot is from DefElement (https://defelement.org) "
    "and is available under a Creative Commons Attribution "
@@ -23,7 +24,7 @@ svg_metadata = (
     "xmlns:cc='http://web.resource.org/cc/'>\n"
     "   <cc:Work rdf:about=''>\n"
     "     <dc:title>{title}</dc:title>\n"
-    f"     <dc:date>{now.strftime('%Y-%m-%d')}</dc:date>\n"
+    "     <dc:date>{date}</dc:date>\n"
     "     <dc:creator>\n"
     "       <cc:Agent><dc:title>DefElement</dc:title></cc:Agent>\n"
     "       <cc:Agent><dc:title>Matthew Scroggs</dc:title></cc:Agent>\n"
@@ -56,7 +57,7 @@ all_plots = []
 def do_the_plot(
     filename: str, desc: str, plot: typing.Callable,
     args: typing.List[typing.Any] = [], png_width: int = 180,
-    scale: int = 250, link: bool = True
+    scale: int = 250, link: bool = True, input_files: typing.List[str] = []
 ) -> str:
     """Create a plot.
 
@@ -68,6 +69,7 @@ def do_the_plot(
         png_width: PNG width
         scale: Scale
         link: Should a link be included?
+        input_files: Files that the plot is made from
 
     Returns:
         HTML for plot
@@ -80,38 +82,58 @@ def do_the_plot(
 
     kwargs = {
         "title": desc, "desc": svg_desc,
-        "svg_metadata": svg_metadata.replace("{title}", desc), "tex_comment": tex_comment}
+        "svg_metadata": svg_metadata.replace("{title}", desc).replace(
+            "{date}", build_date().strftime("%Y-%m-%d")),
+        "tex_comment": tex_comment}
     svg_kw = {"scale": scale, "dof_arrow_size": sympy.Rational(3, 2)}
 
-    if filename not in all_plots:
-        plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.tex"), **kwargs)
-        plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.svg"), **svg_kw, **kwargs)
-        plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.png"),
-             plot_options={"png_width": png_width}, **svg_kw, **kwargs)
-        plot(*args, os.path.join(settings.htmlimg_path, f"{filename}-large.png"),
-             plot_options={"png_width": png_width * 9 // 2}, **svg_kw, **kwargs)
-
-        img_page = heading_with_self_ref("h1", cap_first(desc))
-        img_page += f"<center><a href='/img/{filename}-large.png'>"
-        img_page += f"<img src='/img/{filename}.png'></a></center>\n"
-
-        img_page += ("<p>"
-                     "This image can be used under a "
-                     "<a href='https://creativecommons.org/licenses/by/4.0/'>"
-                     "Creative Commons Attribution 4.0 International (CC BY 4.0) license"
-                     "</a>: if you use it anywhere, you must attribute DefElement. "
-                     "If you use this image anywhere online, please include a link to "
-                     "DefElement; if you use this image in a paper, please <a href='"
-                     "/citing.html'>cite DefElement</a>."
-                     "</p>")
-        img_page += "<ul>"
-        img_page += f"<li><a href='/img/{filename}-large.png'>Download PNG</a></li>"
-        img_page += f"<li><a href='/img/{filename}.svg'>Download SVG</a></li>"
-        img_page += f"<li><a href='/img/{filename}.tex'>Download TikZ</a></li>"
-        img_page += "</ul>"
-
-        with open(os.path.join(settings.htmlimg_path, f"{filename}.html"), "w") as f:
-            f.write(make_html_page(img_page))
+    page = f"/img/{filename}.html"
+    image = f"/img/{filename}.png"
+    # Images that belong to other shards are linked to but not built
+    if in_shard(filename):
+        manifest.use(page)
+    if filename not in all_plots and in_shard(filename):
+        image_hash = hash_data(
+            code_hash(), filename, desc, png_width, scale, hash_files(input_files))
+        if not manifest.up_to_date(image, image_hash):
+            # Symfem numbers the custom colours used in TikZ in the order they are first used by
+            # the process, so the numbering is reset so that each plot does not depend on the
+            # plots that were made before it
+            colors._tikz.clear()
+            plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.tex"), **kwargs)
+            plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.svg"), **svg_kw,
+                 **kwargs)
+            plot(*args, os.path.join(settings.htmlimg_path, f"{filename}.png"),
+                 plot_options={"png_width": png_width}, **svg_kw, **kwargs)
+            plot(*args, os.path.join(settings.htmlimg_path, f"{filename}-large.png"),
+                 plot_options={"png_width": png_width * 9 // 2}, **svg_kw, **kwargs)
+            manifest.record(image, image_hash, files=[
+                f"/img/{filename}.tex", f"/img/{filename}.svg", f"/img/{filename}-large.png"])
+
+        page_hash = hash_data(html_hash(), image_hash)
+        if not manifest.up_to_date(page, page_hash):
+            img_page = heading_with_self_ref("h1", cap_first(desc))
+            img_page += f"<center><a href='/img/{filename}-large.png'>"
+            img_page += f"<img src='/img/{filename}.png'></a></center>\n"
+
+            img_page += ("<p>"
+                         "This image can be used under a "
+                         "<a href='https://creativecommons.org/licenses/by/4.0/'>"
+                         "Creative Commons Attribution 4.0 International (CC BY 4.0) license"
+                         "</a>: if you use it anywhere, you must attribute DefElement. "
+                         "If you use this image anywhere online, please include a link to "
+                         "DefElement; if you use this image in a paper, please <a href='"
+                         "/citing.html'>cite DefElement</a>."
+                         "</p>")
+            img_page += "<ul>"
+            img_page += f"<li><a href='/img/{filename}-large.png'>Download PNG</a></li>"
+            img_page += f"<li><a href='/img/{filename}.svg'>Download SVG</a></li>"
+            img_page += f"<li><a href='/img/{filename}.tex'>Download TikZ</a></li>"
+            img_page += "</ul>"
+
+            with open(os.path.join(settings.htmlimg_path, f"{filename}.html"), "w") as f:
+                f.write(make_html_page(img_page))
+            manifest.record(page, page_hash, uses=[image])
         all_plots.append(filename)
 
     if link:
@@ -249,7 +271,8 @@ def plot_img(img_filename: str, link: bool = True) -> str:
                         img.add_line(p1, p2, color=color, width=2)
         img.save(filename, plot_options)
 
-    return do_the_plot(filename, desc, actual_plot, link=link)
+    return do_the_plot(filename, desc, actual_plot, link=link, input_files=[
+        os.path.join(settings.img_path, f"{img_filename}.img")])
 
 
 def plot_dof_diagram(element: FiniteElement, link: bool = True) -> str:
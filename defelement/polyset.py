@@ -119,6 +119,26 @@ def make_poly_set(p: str) -> str:
     raise ValueError(f"Unknown polynomial set: {p}")
 
 
+def named_set_names(p: str) -> typing.List[str]:
+    """Get the names of the named polynomial sets used in a polynomial set.
+
+    Named sets are numbered in the order that they are first used, so their names depend on the
+    other elements as well as this polynomial set.
+
+    Args:
+        p: Polyset data
+
+    Returns:
+        The names of the named sets
+    """
+    names = []
+    for a in p.split("&&"):
+        m = re.match(r"^\<([^\]]+)\>\[(.+)\](?:\^d)?$", a.strip())
+        if m is not None and m[2] in named:
+            names.append(named[m[2]][0])
+    return names
+
+
 def make_extra_info(p: str) -> str:
     """Make extra info.
 
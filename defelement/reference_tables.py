@@ -0,0 +1,249 @@
+"""Persistent store of the tabulated elements used in verification."""
+
+import io
+import json
+import os
+import typing
+
+from defelement import settings
+from defelement.cache import symfem_hash, write_atomic
+from defelement.element import Element
+from defelement.implementations import verifications, versions
+from defelement.implementations.symfem import symfem_lagrange_superdegree
+from defelement.tools import hash_data, hash_files
+from defelement.verification import Array, lattice_size, reference_geometry
+from defelement.verification_cache import code_hash
+
+EntityDofs = typing.List[typing.List[typing.List[int]]]
+
+
+def reference_key(element: Element, example: str) -> str:
+    """Get the key used to store the Symfem data for an example.
+
+    Args:
+        element: The element
+        example: The example
+
+    Returns:
+        The key
+    """
+    return hash_data(
+        hash_files([os.path.join(settings.element_path, f"{element.filename}.def")]), example,
+        symfem_hash(), code_hash("symfem"), settings.exact_symfem_tabulation)
+
+
+def implementation_key(
+    element: Element, example: str, implementation: str, degree: typing.Optional[int]
+) -> typing.Optional[str]:
+    """Get the key used to store the tabulation of an example by an implementation.
+
+    Args:
+        element: The element
+        example: The example
+        implementation: The implementation
+        degree: The Lagrange superdegree used to choose the points
+
+    Returns:
+        The key, or None if the table cannot be stored because the version of the implementation
+        is not known
+    """
+    version = versions[implementation]()
+    if version is None:
+        return None
+    return hash_data(
+        hash_files([os.path.join(settings.element_path, f"{element.filename}.def")]), example,
+        implementation, version, code_hash(implementation), degree)
+
+
+def tables_folder() -> str:
+    """Get the folder that the tables are stored in.
+
+    Returns:
+        The folder
+    """
+    if settings.reference_tables_path is not None:
+        return settings.reference_tables_path
+    return os.path.join(settings.cache_path, "reference-tables")
+
+
+def _load(key: str) -> typing.Optional[typing.Tuple[typing.Dict[str, typing.Any], Array]]:
+    """Load an entry from the store.
+
+    Args:
+        key: The key
+
+    Returns:
+        The information about the entry and the memory mapped table, or None if the entry is not
+        in the store
+    """
+    import numpy as np
+
+    folder = tables_folder()
+    info_file = os.path.join(folder, f"{key}.json")
+    table_file = os.path.join(folder, f"{key}.npy")
+    if not os.path.isfile(info_file) or not os.path.isfile(table_file):
+        return None
+    try:
+        with open(info_file) as f:
+            info = json.load(f)
+        return info, np.load(table_file, mmap_mode="r")
+    except (ValueError, OSError):
+        return None
+
+
+def _save(key: str, info: typing.Dict[str, typing.Any], table: Array):
+    """Save an entry to the store.
+
+    Args:
+        key: The key
+        info: Information about the entry
+        table: The table
+    """
+    import numpy as np
+
+    folder = tables_folder()
+    data = io.BytesIO()
+    np.save(data, table)
+    # The table is written first, as the info file marks the entry as complete
+    write_atomic(os.path.join(folder, f"{key}.npy"), data.getvalue())
+    write_atomic(os.path.join(folder, f"{key}.json"), json.dumps(info).encode())
+
+
+def _stored_tabulator(
+    table: Array, points: Array,
+    compute: typing.Callable[[], typing.Tuple[EntityDofs, typing.Callable[[Array], Array]]],
+    computed: typing.List[typing.Tuple[EntityDofs, typing.Callable[[Array], Array]]]
+) -> typing.Callable[[Array], Array]:
+    """Make a tabulation function that uses a stored table.
+
+    Args:
+        table: The stored table
+        points: The points that the table was tabulated at
+        compute: Function that computes the verification data if the element needs to be
+            tabulated at other points
+        computed: List containing the verification data if it has already been computed
+
+    Returns:
+        Tabulation function
+    """
+    import numpy as np
+
+    def tabulate(pts: Array) -> Array:
+        """Tabulate the element.
+
+        Args:
+            pts: Points to tabulate at
+
+        Returns:
+            Values of basis functions
+        """
+        if pts.shape == points.shape and np.allclose(pts, points):
+            return table
+        if len(computed) == 0:
+            computed.append(compute())
+        return computed[0][1](pts)
+
+    return tabulate
+
+
+def stored_degree(element: Element, example: str) -> typing.Optional[int]:
+    """Get the Lagrange superdegree of an example if it is in the store.
+
+    This does not create a Symfem element.
+
+    Args:
+        element: The element
+        example: The example
+
+    Returns:
+        The Lagrange superdegree, or None if the Symfem data for the example is not in the store
+        or its degree is not known
+    """
+    entry = _load(reference_key(element, example))
+    if entry is None:
+        return None
+    return entry[0].get("degree")
+
+
+def symfem_reference(
+    element: Element, example: str
+) -> typing.Tuple[EntityDofs, typing.Callable[[Array], Array], typing.Optional[int]]:
+    """Get the Symfem verification data for an example.
+
+    The entity DOFs, the Lagrange superdegree and the table of basis functions at the points used
+    by verification are stored on disk, so that they only need to be computed once for each
+    example and each version of Symfem. Stored tables are memory mapped.
+
+    Args:
+        element: The element
+        example: The example
+
+    Returns:
+        List of entity dofs, tabulation function, and the Lagrange superdegree (or None if this
+        is not known)
+    """
+    cell = example.split(",")[0]
+    try:
+        lattice_size(cell)
+    except ValueError:
+        return verifications["symfem"](element, example) + (None, )
+
+    key = reference_key(element, example)
+    computed: typing.List[typing.Tuple[EntityDofs, typing.Callable[[Array], Array]]] = []
+    entry = _load(key)
+    if entry is not None and "degree" in entry[0] and entry[1].shape[0] == reference_geometry(
+        cell, entry[0]["degree"]
+    ).all_points.shape[0]:
+        info, table = entry
+    else:
+        computed.append(verifications["symfem"](element, example))
+        info = {"entity_dofs": [[[int(k) for k in j] for j in i] for i in computed[0][0]],
+                "degree": symfem_lagrange_superdegree(element, example)}
+        table = computed[0][1](reference_geometry(cell, info["degree"]).all_points.copy())
+        _save(key, info, table)
+
+    return info["entity_dofs"], _stored_tabulator(
+        table, reference_geometry(cell, info["degree"]).all_points,
+        lambda: verifications["symfem"](element, example), computed), info["degree"]
+
+
+def implementation_reference(
+    element: Element, example: str, implementation: str, degree: typing.Optional[int] = None
+) -> typing.Tuple[EntityDofs, typing.Callable[[Array], Array]]:
+    """Get the verification data for an example from an implementation.
+
+    The entity DOFs and the table of basis functions at the points used by verification are
+    stored on disk, so that they only need to be computed once for each example and each version
+    of the implementation. Stored tables are memory mapped.
+
+    Args:
+        element: The element
+        example: The example
+        implementation: The implementation
+        degree: The Lagrange superdegree used to choose the points
+
+    Returns:
+        List of entity dofs, and tabulation function
+    """
+    cell = example.split(",")[0]
+    key = implementation_key(element, example, implementation, degree)
+    try:
+        lattice_size(cell)
+    except ValueError:
+        key = None
+    if key is None:
+        return verifications[implementation](element, example)
+
+    computed: typing.List[typing.Tuple[EntityDofs, typing.Callable[[Array], Array]]] = []
+    points = reference_geometry(cell, degree).all_points
+    entry = _load(key)
+    if entry is not None and entry[1].shape[0] == points.shape[0]:
+        info, table = entry
+    else:
+        computed.append(verifications[implementation](element, example))
+        info = {"entity_dofs": [[[int(k) for k in j] for j in i] for i in computed[0][0]]}
+        table = computed[0][1](points.copy())
+        _save(key, info, table)
+
+    return info["entity_dofs"], _stored_tabulator(
+        table, points, lambda: verifications[implementation](element, example), computed)
@@ -0,0 +1,518 @@
+"""Scheduling of tasks on multiple processes."""
+
+import functools
+import json
+import os
+import time
+import traceback
+import typing
+from datetime import datetime
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+TimingKey = typing.Tuple[str, str, str]
+
+
+class TimingDatabase:
+    """Wall times of previous runs of tasks.
+
+    Times are stored for each element, example string and implementation.
+    """
+
+    def __init__(self, filename: str):
+        """Initialise.
+
+        Args:
+            filename: The file the times are stored in
+        """
+        self.filename = filename
+        self.times: typing.Dict[str, float] = {}
+        self.new_times: typing.Dict[str, float] = {}
+        if os.path.isfile(filename):
+            with open(filename) as f:
+                self.times = json.load(f)
+
+    def _key(self, key: TimingKey) -> str:
+        """Convert a key to a string.
+
+        Args:
+            key: The element, example string and implementation
+
+        Returns:
+            The key as a string
+        """
+        return "|".join(key)
+
+    def get(self, key: TimingKey) -> typing.Optional[float]:
+        """Get the time a task took when it was last run.
+
+        Args:
+            key: The element, example string and implementation
+
+        Returns:
+            The time in seconds, or None if the task has not been run before
+        """
+        return self.times.get(self._key(key))
+
+    def estimate(self, key: TimingKey) -> float:
+        """Estimate the time a task will take.
+
+        Tasks that have not been run before are assumed to be as slow as the slowest known
+        task, so that they are started early.
+
+        Args:
+            key: The element, example string and implementation
+
+        Returns:
+            The estimated time in seconds
+        """
+        time = self.get(key)
+        if time is not None:
+            return time
+        if len(self.times) == 0:
+            return 1.0
+        return max(self.times.values())
+
+    def set(self, key: TimingKey, time: float):
+        """Record the time a task took.
+
+        Args:
+            key: The element, example string and implementation
+            time: The time in seconds
+        """
+        self.times[self._key(key)] = time
+        self.new_times[self._key(key)] = time
+
+    def save(self):
+        """Save the times.
+
+        Times saved by other processes since this database was loaded are kept.
+        """
+        times = {}
+        if os.path.isfile(self.filename):
+            with open(self.filename) as f:
+                times = json.load(f)
+        times.update(self.new_times)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        with open(self.filename, "w") as f:
+            json.dump(times, f, indent=1, sort_keys=True)
+
+
+def extrapolate_time(
+    times: typing.Dict[int, float], degree: int, power: float = 3.0
+) -> typing.Optional[float]:
+    """Estimate the time a task will take at one degree from the times it took at other degrees.
+
+    The time is assumed to grow like (degree + 1) to some power. If the times at two or more
+    degrees are known, the power is fitted to the times at the two highest of these degrees.
+
+    Args:
+        times: The times in seconds that the task took at other degrees
+        degree: The degree
+        power: The power to use if the time at only one degree is known
+
+    Returns:
+        The estimated time in seconds, or None if no times are known
+    """
+    import math
+
+    if len(times) == 0:
+        return None
+    known = sorted(times)
+    d0 = known[-1]
+    if len(known) > 1:
+        d1 = known[-2]
+        if times[d0] > 0 and times[d1] > 0:
+            power = max(1.0, math.log(times[d0] / times[d1]) / math.log((d0 + 1) / (d1 + 1)))
+    return times[d0] * ((degree + 1) / (d0 + 1)) ** power
+
+
+def longest_first(tasks: typing.List[T], estimates: typing.List[float]) -> typing.List[T]:
+    """Sort tasks so that the tasks expected to take longest are first.
+
+    Args:
+        tasks: The tasks
+        estimates: The estimated time each task will take
+
+    Returns:
+        The sorted tasks
+    """
+    order = sorted(range(len(tasks)), key=lambda i: -estimates[i])
+    return [tasks[i] for i in order]
+
+
+def _run_task(
+    args: typing.Tuple[typing.Callable[[T], R], int, T]
+) -> typing.Tuple[str, int, float, R]:
+    """Run a task and time it.
+
+    Args:
+        args: The function to run, the index of the task, and the task to pass to the function
+
+    Returns:
+        The name of the worker, the index of the task, the time taken in seconds, and the result
+    """
+    import multiprocessing
+
+    function, index, task = args
+    start = datetime.now()
+    result = function(task)
+    end = datetime.now()
+    return multiprocessing.current_process().name, index, (end - start).total_seconds(), result
+
+
+def run_tasks(
+    function: typing.Callable[[T], R], tasks: typing.List[T], processes: int = 1,
+    name: str = "tasks", timings: typing.Optional[TimingDatabase] = None,
+    timing_key: typing.Optional[typing.Callable[[T], TimingKey]] = None
+) -> typing.List[R]:
+    """Run tasks on a pool of processes.
+
+    Each worker takes the next task from a shared queue as soon as it has finished its
+    current task, so that expensive tasks that are next to each other in the list do not all end
+    up on the same worker. If a timing database is given, the tasks that took longest on
+    previous runs are started first and the time taken by each task is recorded. A summary of how
+    busy each worker was is printed at the end.
+
+    Args:
+        function: The function to run on each task
+        tasks: The tasks
+        processes: The number of processes to use
+        name: Name of the tasks to use in the summary
+        timings: Database of times taken by previous runs of the tasks
+        timing_key: Function that gets the key of a task in the timing database
+
+    Returns:
+        The results, in the order that the tasks were completed
+    """
+    start = datetime.now()
+    busy: typing.Dict[str, float] = {}
+    counts: typing.Dict[str, int] = {}
+    results = []
+
+    if timings is not None:
+        assert timing_key is not None
+        tasks = longest_first(tasks, [timings.estimate(timing_key(t)) for t in tasks])
+
+    def record(worker: str, index: int, time: float, result: R):
+        """Record a completed task.
+
+        Args:
+            worker: The name of the worker
+            index: The index of the task
+            time: The time taken in seconds
+            result: The result
+        """
+        busy[worker] = busy.get(worker, 0.0) + time
+        counts[worker] = counts.get(worker, 0) + 1
+        results.append(result)
+        if timings is not None:
+            assert timing_key is not None
+            timings.set(timing_key(tasks[index]), time)
+
+    if processes == 1:
+        for i, t in enumerate(tasks):
+            record(*_run_task((function, i, t)))
+    else:
+        import multiprocessing
+
+        with multiprocessing.Pool(processes) as pool:
+            for r in pool.imap_unordered(
+                _run_task, [(function, i, t) for i, t in enumerate(tasks)], chunksize=1
+            ):
+                record(*r)
+
+    if timings is not None:
+        timings.save()
+
+    total = (datetime.now() - start).total_seconds()
+    print(f"Completed {len(tasks)} {name} in {total:.2f}s")
+    if total > 0:
+        for worker in sorted(busy):
+            print(f"  {worker}: {counts[worker]} {name}, busy for {busy[worker]:.2f}s "
+                  f"({100 * busy[worker] / total:.1f}% utilisation)")
+    return results
+
+
+def _queue_worker(
+    function: typing.Callable[[T, typing.Callable[[typing.Any], None]], None],
+    tasks: typing.List[T], connection: typing.Any
+):
+    """Run tasks sent by the main process until there are no more tasks.
+
+    Args:
+        function: The function to run on each task
+        tasks: The tasks
+        connection: Connection to the main process
+    """
+    while True:
+        index = connection.recv()
+        if index is None:
+            return
+        try:
+            function(tasks[index], lambda report: connection.send(("report", report)))
+            connection.send(("done", None))
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+
+
+def run_queue(
+    function: typing.Callable[[T, typing.Callable[[typing.Any], None]], None],
+    tasks: typing.List[T], on_report: typing.Callable[[int, typing.Any], None],
+    on_failure: typing.Callable[[int, str], None], processes: int = 1,
+    timeout: typing.Optional[float] = None, name: str = "tasks",
+    groups: typing.Optional[typing.List[str]] = None
+):
+    """Run tasks from a queue on worker processes.
+
+    Each worker is given the next task in the queue as soon as it has finished its current task.
+    If groups are given, each worker is only given tasks from one group, so that (for example) the
+    modules imported by tasks in one group are never imported by the workers running other groups.
+    The processes are shared between the groups in proportion to their number of tasks, but each
+    group gets at least one worker.
+    The function passes reports (for example partial results) to a callback as soon as they are
+    known, and each report is passed to on_report in the main process. If a task raises an
+    exception, takes longer than the timeout, or its worker process exits, on_failure is called
+    and the worker is replaced if necessary, so that one failing task does not affect any other
+    tasks.
+
+    If processes is 1, there is no timeout and there are no groups, the tasks are run in the main
+    process.
+
+    Args:
+        function: The function to run on each task. This is passed the task and a callback to
+            send reports to
+        tasks: The tasks
+        on_report: Function to run in the main process for each report. This is passed the
+            index of the task and the report
+        on_failure: Function to run in the main process for each task that fails. This is
+            passed the index of the task and the reason it failed
+        processes: The number of worker processes to use
+        timeout: The maximum time in seconds that each task may take
+        name: Name of the tasks to use in the summary
+        groups: The group of each task, or None to allow any worker to run any task
+    """
+    start_all = time.monotonic()
+    failures = 0
+
+    if processes == 1 and timeout is None and groups is None:
+        for i, t in enumerate(tasks):
+            try:
+                function(t, functools.partial(on_report, i))
+            except Exception:
+                on_failure(i, traceback.format_exc())
+                failures += 1
+    else:
+        import multiprocessing
+        import multiprocessing.connection
+
+        queues: typing.Dict[typing.Optional[str], typing.List[int]] = {}
+        for i in range(len(tasks)):
+            queues.setdefault(None if groups is None else groups[i], []).append(i)
+        finished = 0
+        workers: typing.List[typing.Dict[str, typing.Any]] = []
+
+        def start_worker(group: typing.Optional[str]) -> typing.Dict[str, typing.Any]:
+            """Start a worker process.
+
+            Args:
+                group: The group of tasks that the worker runs
+
+            Returns:
+                The worker
+            """
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_queue_worker, args=(function, tasks, child_connection), daemon=True)
+            process.start()
+            child_connection.close()
+            return {"process": process, "connection": connection, "task": None, "start": 0.0,
+                    "group": group}
+
+        def assign(worker: typing.Dict[str, typing.Any]):
+            """Give the next task in the worker's queue to a worker.
+
+            Args:
+                worker: The worker
+            """
+            queue = queues[worker["group"]]
+            if len(queue) > 0:
+                worker["task"] = queue.pop(0)
+                worker["start"] = time.monotonic()
+                worker["connection"].send(worker["task"])
+            else:
+                worker["task"] = None
+
+        for group, queue in queues.items():
+            for _ in range(min(max(1, round(processes * len(queue) / len(tasks))), len(queue))):
+                workers.append(start_worker(group))
+                assign(workers[-1])
+
+        while finished < len(tasks):
+            busy = [w for w in workers if w["task"] is not None]
+            wait = None
+            if timeout is not None:
+                wait = max(0.0, min(w["start"] + timeout for w in busy) - time.monotonic())
+            multiprocessing.connection.wait(
+                [w["connection"] for w in busy] + [w["process"].sentinel for w in busy], wait)
+
+            for n, w in enumerate(workers):
+                failure = None
+                replace = True
+                try:
+                    while w["task"] is not None and w["connection"].poll():
+                        kind, value = w["connection"].recv()
+                        if kind == "report":
+                            on_report(w["task"], value)
+                        elif kind == "done":
+                            finished += 1
+                            assign(w)
+                        else:
+                            failure = value
+                            replace = False
+                            break
+                except (EOFError, OSError):
+                    failure = "The worker process exited"
+                if w["task"] is None:
+                    continue
+                if failure is None and not w["process"].is_alive():
+                    failure = f"The worker process exited with code {w['process'].exitcode}"
+                if failure is None and timeout is not None and (
+                    time.monotonic() - w["start"] > timeout
+                ):
+                    failure = f"Timed out after {timeout}s"
+                if failure is not None:
+                    on_failure(w["task"], failure)
+                    failures += 1
+                    finished += 1
+                    if replace:
+                        w["process"].terminate()
+                        w["process"].join()
+                        workers[n] = w = start_worker(w["group"])
+                    assign(w)
+
+        for w in workers:
+            w["connection"].send(None)
+            w["process"].join()
+
+    total = time.monotonic() - start_all
+    print(f"Completed {len(tasks)} {name} in {total:.2f}s ({failures} failed)")
+
+
+def _run_target(
+    name: str, function: typing.Callable[[], R], results: typing.Dict[str, R]
+):
+    """Run a target on a child process.
+
+    Args:
+        name: The name of the target
+        function: The function that builds the target
+        results: Dictionary to write the result into
+    """
+    results[name] = function()
+
+
+def run_targets(
+    targets: typing.Dict[str, typing.Tuple[typing.Callable[[], R], typing.List[str]]],
+    processes: int = 1,
+    on_complete: typing.Optional[typing.Callable[[str, R], None]] = None,
+    weights: typing.Optional[typing.Dict[str, int]] = None
+):
+    """Run targets in an order that respects their dependencies.
+
+    Targets whose dependencies have all been built are run at the same time on child processes.
+    Dependencies that are not included in the targets are assumed to already be built. The
+    result of each target is passed to on_complete in the main process before any target
+    that depends on it is started.
+
+    A target that runs its own pool of processes should be given a weight equal to the size of
+    this pool, so that the total number of processes in use does not exceed processes. A target
+    is only started if the total weight of the running targets including it is at most
+    processes, or if no other target is running.
+
+    Args:
+        targets: The function that builds each target and the names of the targets it depends on
+        processes: The maximum number of processes to use to run targets at the same time
+        on_complete: Function to run in the main process when a target is complete
+        weights: The number of processes used by each target. Targets that are not included
+            use one process
+    """
+    done: typing.Set[str] = set()
+    remaining = list(targets)
+
+    def ready(name: str) -> bool:
+        """Check if a target's dependencies have all been built.
+
+        Args:
+            name: The name of the target
+
+        Returns:
+            True if the target can be built, otherwise False
+        """
+        return all(d in done or d not in targets for d in targets[name][1])
+
+    def weight(name: str) -> int:
+        """Get the number of processes used by a target.
+
+        Args:
+            name: The name of the target
+
+        Returns:
+            The number of processes
+        """
+        return 1 if weights is None else weights.get(name, 1)
+
+    def complete(name: str, result: R):
+        """Record that a target has been built.
+
+        Args:
+            name: The name of the target
+            result: The result of the target
+        """
+        done.add(name)
+        if on_complete is not None:
+            on_complete(name, result)
+
+    if processes == 1:
+        while len(remaining) > 0:
+            to_run = [t for t in remaining if ready(t)]
+            if len(to_run) == 0:
+                raise ValueError(f"Targets have circular dependencies: {', '.join(remaining)}")
+            remaining.remove(to_run[0])
+            start = datetime.now()
+            print(f"Building target: {to_run[0]}")
+            complete(to_run[0], targets[to_run[0]][0]())
+            print(f"Built target {to_run[0]} in {(datetime.now() - start).total_seconds():.2f}s")
+        return
+
+    import multiprocessing
+    import multiprocessing.connection
+
+    manager = multiprocessing.Manager()
+    results = manager.dict()
+    running: typing.Dict[str, typing.Tuple[multiprocessing.Process, datetime]] = {}
+    while len(remaining) > 0 or len(running) > 0:
+        for t in [t for t in remaining if ready(t)]:
+            if len(running) > 0 and sum(weight(r) for r in running) + weight(t) > processes:
+                break
+            remaining.remove(t)
+            print(f"Building target: {t}")
+            process = multiprocessing.Process(
+                target=_run_target, args=(t, targets[t][0], results))
+            process.start()
+            running[t] = (process, datetime.now())
+        if len(running) == 0:
+            raise ValueError(f"Targets have circular dependencies: {', '.join(remaining)}")
+
+        multiprocessing.connection.wait([p.sentinel for p, _ in running.values()])
+        for t, (process, start) in list(running.items()):
+            if not process.is_alive():
+                process.join()
+                del running[t]
+                if process.exitcode != 0:
+                    for p, _ in running.values():
+                        p.terminate()
+                    raise RuntimeError(f"Building target {t} failed")
+                print(f"Built target {t} in {(datetime.now() - start).total_seconds():.2f}s")
+                complete(t, results[t])
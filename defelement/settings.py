@@ -1,6 +1,7 @@
 """DefElement settings."""
 
 import os as _os
+import typing as _typing
 
 dir_path = _os.path.join(_os.path.dirname(_os.path.realpath(__file__)), "..")
 element_path = _os.path.join(dir_path, "elements")
@@ -18,6 +19,22 @@ htmlfamilies_path = _os.path.join(html_path, "families")
 
 verification_json = _os.path.join(dir_path, "verification.json")
 
+cache_path = _os.path.join(_os.path.expanduser("~"), ".cache", "defelement")
+
+# The folder that the Symfem tables used in verification are stored in (if None, the folder
+# reference-tables in cache_path is used)
+reference_tables_path: _typing.Optional[str] = None
+
 github_token = None
 
 processes = 1
+
+# If True, dates in the output are taken from the source files rather than the current date
+reproducible = False
+
+# The shard being built and the number of shards (None if the build is not sharded)
+shard: _typing.Optional[_typing.Tuple[int, int]] = None
+
+# If True, Symfem elements are tabulated exactly during verification rather than by compiling
+# their basis functions
+exact_symfem_tabulation = False
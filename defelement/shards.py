@@ -0,0 +1,204 @@
+"""Sharded builds and verification.
+
+The examples and images can be split between several shards that are built on different
+machines. Every shard builds all the other pages, so the outputs of the shards can be combined
+into a single website by merging their output folders.
+
+Verification can also be split into shards: each shard verifies some of the examples with some of
+the implementations, and the verification json files of the shards are merged.
+"""
+
+import contextlib
+import filecmp
+import json
+import os
+import shutil
+import typing
+
+from defelement import settings, staging
+from defelement.tools import hash_data, link_or_copy
+
+
+def parse_shard(shard: str) -> typing.Tuple[int, int]:
+    """Parse a shard given as i/N.
+
+    Args:
+        shard: The shard
+
+    Returns:
+        The index of the shard (starting at 1) and the number of shards
+    """
+    try:
+        index, count = [int(i) for i in shard.split("/")]
+    except ValueError:
+        raise ValueError(f"Invalid shard: {shard}. Shards must be given as i/N")
+    if count < 1 or index < 1 or index > count:
+        raise ValueError(f"Invalid shard: {shard}. Shards must be given as i/N with 1 <= i <= N")
+    return index, count
+
+
+def in_shard(key: str) -> bool:
+    """Check if an output belongs to the shard that is being built.
+
+    Args:
+        key: A name that identifies the output
+
+    Returns:
+        True if the output should be built, otherwise False
+    """
+    if settings.shard is None:
+        return True
+    index, count = settings.shard
+    return int(hash_data(key), 16) % count == index - 1
+
+
+@contextlib.contextmanager
+def unsharded() -> typing.Iterator[None]:
+    """Build every output, whatever shard is being built.
+
+    This is used while building an output that belongs to the shard, so that the images it uses
+    are built by the same shard.
+    """
+    shard = settings.shard
+    settings.shard = None
+    try:
+        yield
+    finally:
+        settings.shard = shard
+
+
+def merge_manifests(
+    manifests: typing.List[typing.Dict[str, typing.Dict[str, typing.Any]]]
+) -> typing.Tuple[typing.Dict[str, typing.Dict[str, typing.Any]], typing.List[str]]:
+    """Merge the manifests of several shards.
+
+    Args:
+        manifests: The manifests
+
+    Returns:
+        The merged manifest, and the outputs that were built from different inputs by different
+        shards
+    """
+    merged: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    conflicts = []
+    for m in manifests:
+        for output, entry in m.items():
+            if output not in merged:
+                merged[output] = {i: list(j) if isinstance(j, list) else j
+                                  for i, j in entry.items()}
+            elif merged[output]["hash"] != entry["hash"]:
+                if output not in conflicts:
+                    conflicts.append(output)
+            else:
+                merged[output]["files"] += [
+                    i for i in entry["files"] if i not in merged[output]["files"]]
+                merged[output]["uses"] = sorted(set(merged[output]["uses"] + entry["uses"]))
+    return merged, conflicts
+
+
+def merge(shard_paths: typing.List[str], output_path: str) -> typing.List[str]:
+    """Merge the output folders of several shards into a single website.
+
+    Files that are in more than one shard must be identical. The merged website replaces the
+    output folder once every shard has been merged.
+
+    Args:
+        shard_paths: The output folders of the shards
+        output_path: The folder to write the website to
+
+    Returns:
+        Files and manifest entries that are different in different shards. If this is not empty,
+        the output folder is not changed
+    """
+    merged_path = staging.prepare(output_path)
+    conflicts = []
+    manifests = []
+    for shard_path in shard_paths:
+        manifest_file = os.path.join(shard_path, ".manifest.json")
+        if os.path.isfile(manifest_file):
+            with open(manifest_file) as f:
+                manifests.append(json.load(f))
+        for root, dirs, files in os.walk(shard_path):
+            for file in files:
+                source = os.path.join(root, file)
+                relpath = os.path.relpath(source, shard_path)
+                if relpath == ".manifest.json":
+                    continue
+                destination = os.path.join(merged_path, relpath)
+                if not os.path.isfile(destination):
+                    link_or_copy(source, destination)
+                elif not filecmp.cmp(source, destination, shallow=False):
+                    conflicts.append(relpath)
+
+    manifest, manifest_conflicts = merge_manifests(manifests)
+    conflicts += [f"{i} (manifest)" for i in manifest_conflicts]
+    if len(conflicts) > 0:
+        shutil.rmtree(merged_path)
+        return conflicts
+
+    with open(os.path.join(merged_path, ".manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    staging.link_unchanged(merged_path, output_path)
+    staging.swap(merged_path, output_path)
+    return []
+
+
+def merge_verification(
+    results: typing.List[typing.Dict[str, typing.Any]]
+) -> typing.Tuple[typing.Dict[str, typing.Any], typing.List[str]]:
+    """Merge the verification json files of several shards.
+
+    Args:
+        results: The contents of the verification json file of each shard
+
+    Returns:
+        The merged verification results, and a list of problems: shards that are missing or
+        included more than once, examples that have different results in different shards, and
+        examples that were assigned to a shard but do not have a result
+    """
+    problems = []
+    counts = set()
+    indices = []
+    for r in results:
+        shard = r["metadata"].get("shard")
+        if shard is None:
+            problems.append("A file that is not the output of a shard was included")
+        else:
+            indices.append(shard[0])
+            counts.add(shard[1])
+    if len(counts) > 1:
+        problems.append(f"The files are from different numbers of shards ({sorted(counts)})")
+    elif len(counts) == 1:
+        count = counts.pop()
+        for i in range(1, count + 1):
+            if indices.count(i) == 0:
+                problems.append(f"Shard {i}/{count} is missing")
+            elif indices.count(i) > 1:
+                problems.append(f"Shard {i}/{count} is included more than once")
+
+    found: typing.Dict[typing.Tuple[str, str, str], str] = {}
+    data: typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.List[str]]]] = {}
+    for r in results:
+        for element, element_results in r["verification"].items():
+            for implementation, impl_results in element_results.items():
+                merged = data.setdefault(element, {}).setdefault(
+                    implementation, {"pass": [], "fail": [], "not implemented": []})
+                for result, examples in impl_results.items():
+                    for eg in examples:
+                        key = (element, eg, implementation)
+                        if key not in found:
+                            found[key] = result
+                            merged[result].append(eg)
+                        elif found[key] != result:
+                            problems.append(
+                                f"{element} {implementation} {eg} has different results in "
+                                f"different shards ({found[key]} vs {result})")
+    for r in results:
+        for element, eg, implementation in r["metadata"].get("tasks", []):
+            if (element, eg, implementation) not in found:
+                problems.append(f"{element} {implementation} {eg} does not have a result")
+
+    return {
+        "metadata": {"date": max(r["metadata"]["date"] for r in results)},
+        "verification": data,
+    }, problems
@@ -0,0 +1,111 @@
+"""Staged output.
+
+The website is built into a staging folder next to the output folder. Outputs that are up to
+date are linked into the staging folder from the previous build, and the staging folder replaces
+the output folder once the build has finished, so a failed build never changes the output
+folder. The folders are swapped using two renames, so the swap itself is not atomic. Files
+whose contents have not changed keep their modification times.
+"""
+
+import filecmp
+import os
+import shutil
+import typing
+
+from defelement.tools import link_or_copy
+
+
+def staging_path(output_path: str) -> str:
+    """Get the staging folder for an output folder.
+
+    Args:
+        output_path: The output folder
+
+    Returns:
+        The staging folder
+    """
+    return os.path.normpath(output_path) + ".staging"
+
+
+def old_path(output_path: str) -> str:
+    """Get the folder that the previous output is moved to while the staging folder is swapped in.
+
+    Args:
+        output_path: The output folder
+
+    Returns:
+        The folder
+    """
+    return os.path.normpath(output_path) + ".old"
+
+
+def prepare(output_path: str) -> str:
+    """Prepare an empty staging folder.
+
+    If a previous build was interrupted while swapping folders, the previous output is
+    restored first.
+
+    Args:
+        output_path: The output folder
+
+    Returns:
+        The staging folder
+    """
+    if not os.path.isdir(output_path) and os.path.isdir(old_path(output_path)):
+        os.rename(old_path(output_path), output_path)
+    staging = staging_path(output_path)
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    return staging
+
+
+def link_unchanged(staging: str, output_path: str) -> typing.Tuple[int, int]:
+    """Replace files in the staging folder that are identical to the previous output with links.
+
+    Args:
+        staging: The staging folder
+        output_path: The output folder containing the previous output
+
+    Returns:
+        The number of changed and unchanged files
+    """
+    changed = 0
+    unchanged = 0
+    for root, dirs, files in os.walk(staging):
+        for file in files:
+            new = os.path.join(root, file)
+            old = os.path.join(output_path, os.path.relpath(new, staging))
+            if os.path.isfile(old) and (
+                os.path.samefile(old, new) or filecmp.cmp(old, new, shallow=False)
+            ):
+                if not os.path.samefile(old, new):
+                    tmp = os.path.join(root, f".tmp-{file}")
+                    link_or_copy(old, tmp)
+                    os.replace(tmp, new)
+                unchanged += 1
+            else:
+                changed += 1
+    return changed, unchanged
+
+
+def swap(staging: str, output_path: str):
+    """Replace the output folder with the staging folder.
+
+    This is not atomic: the output folder is first renamed to the folder given by old_path,
+    then the staging folder is renamed to the output folder, and then the old folder is deleted.
+    If the build is interrupted between the two renames, the output folder is missing until the
+    next build, which restores the previous output in prepare.
+
+    Args:
+        staging: The staging folder
+        output_path: The output folder
+    """
+    old = old_path(output_path)
+    if os.path.isdir(old):
+        shutil.rmtree(old)
+    if os.path.isdir(output_path):
+        os.rename(output_path, old)
+    os.rename(staging, output_path)
+    if os.path.isdir(old):
+        shutil.rmtree(old)
@@ -1,6 +1,12 @@
 """DefElement tools."""
 
+import hashlib
+import json
+import os
+import shutil
+import subprocess
 import typing
+from datetime import datetime, timezone
 
 import yaml
 
@@ -13,6 +19,8 @@ if typing.TYPE_CHECKING:
 else:
     Array = typing.Any
 
+_build_date: typing.List[datetime] = []
+
 
 def parse_metadata(content: str) -> typing.Tuple[typing.Dict[str, typing.Any], str]:
     """Parse metadata.
@@ -82,3 +90,135 @@ def comma_and_join(ls: typing.List[str], oxford_comma: bool = True) -> str:
     if len(ls) == 2:
         return f"{ls[0]} and {ls[1]}"
     return ", ".join(ls[:-1]) + ("," if oxford_comma else "") + " and " + ls[-1]
+
+
+def hash_data(*data: typing.Any) -> str:
+    """Compute a stable hash of some JSON-serialisable data.
+
+    Args:
+        data: The data
+
+    Returns:
+        Hex digest of the hash
+    """
+    h = hashlib.sha256()
+    for d in data:
+        h.update(json.dumps(d, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def hash_files(files: typing.List[str]) -> str:
+    """Compute a hash of the contents of some files.
+
+    Args:
+        files: List of filenames
+
+    Returns:
+        Hex digest of the hash
+    """
+    h = hashlib.sha256()
+    for file in files:
+        h.update(os.path.relpath(file, settings.dir_path).encode())
+        with open(file, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def hash_folder(folder: str, extension: str = "") -> str:
+    """Compute a hash of the contents of all files in a folder and its subfolders.
+
+    Args:
+        folder: The folder
+        extension: Only include files with this extension
+
+    Returns:
+        Hex digest of the hash
+    """
+    files = []
+    for root, dirs, filenames in os.walk(folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        files += [os.path.join(root, f) for f in filenames
+                  if f.endswith(extension) and not f.startswith(".")]
+    return hash_files(sorted(files))
+
+
+def link_or_copy(source: str, destination: str):
+    """Create a hard link to a file, or copy the file if a hard link cannot be created.
+
+    Args:
+        source: The file
+        destination: The path of the link or copy
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def source_date() -> datetime:
+    """Get the time that the source files were last changed.
+
+    This is the time of the latest git commit, or the time that the newest source file was
+    modified if the source is not in a git repository.
+
+    Returns:
+        The time
+    """
+    try:
+        timestamp = subprocess.run(
+            ["git", "log", "-1", "--format=%ct"], cwd=settings.dir_path, capture_output=True,
+            check=True, text=True).stdout.strip()
+        if timestamp != "":
+            return datetime.fromtimestamp(int(timestamp), timezone.utc)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    newest = 0.0
+    for folder in [settings.element_path, settings.template_path, settings.files_path,
+                   settings.pages_path, settings.data_path, settings.img_path]:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for file in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, file)))
+    return datetime.fromtimestamp(int(newest), timezone.utc)
+
+
+def changed_files(revision: str) -> typing.List[str]:
+    """Get the files that have changed since a git revision.
+
+    This includes uncommitted changes and files that are not tracked by git.
+
+    Args:
+        revision: The git revision
+
+    Returns:
+        The paths of the changed files, relative to the root of the repository
+    """
+    changed: typing.Set[str] = set()
+    for command in [["git", "diff", "--name-only", "--relative", revision, "--"],
+                    ["git", "ls-files", "--others", "--exclude-standard"]]:
+        output = subprocess.run(command, cwd=settings.dir_path, capture_output=True, check=True,
+                                text=True).stdout
+        changed.update(line for line in output.split("\n") if line != "")
+    return sorted(changed)
+
+
+def build_date() -> datetime:
+    """Get the date to include in the outputs of the build.
+
+    If the SOURCE_DATE_EPOCH environment variable is set, this is used. Otherwise, the time that
+    the source files were last changed is used for reproducible builds and the current time is
+    used for other builds.
+
+    Returns:
+        The date
+    """
+    if len(_build_date) == 0:
+        if "SOURCE_DATE_EPOCH" in os.environ:
+            _build_date.append(datetime.fromtimestamp(
+                int(os.environ["SOURCE_DATE_EPOCH"]), timezone.utc))
+        elif settings.reproducible:
+            _build_date.append(source_date())
+        else:
+            _build_date.append(datetime.now(timezone.utc))
+    return _build_date[0]
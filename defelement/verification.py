@@ -14,11 +14,39 @@ else:
     Array = typing.Any
 
 
-def points(ref: str) -> Array:
-    """Get tabulation points for a reference cell.
+_lattice_sizes = {
+    "point": 0, "interval": 20, "quadrilateral": 15, "triangle": 15, "hexahedron": 10,
+    "tetrahedron": 10, "prism": 10, "pyramid": 10}
+
+
+def lattice_size(ref: str, degree: typing.Optional[int] = None) -> int:
+    """Get the number of subdivisions of each edge of the lattice of points used on a cell.
+
+    A lattice with n subdivisions is unisolvent for the Lagrange space of degree n on the cell. If
+    the degree of the element is known, a lattice with twice as many subdivisions as are needed
+    (plus 2) is used, as long as this is smaller than the default lattice. Pyramid elements are
+    rational, so the default lattice is always used on a pyramid.
+
+    Args:
+        ref: Reference cell
+        degree: The Lagrange superdegree of the element, or None if this is not known
+
+    Returns:
+        The number of subdivisions
+    """
+    if ref not in _lattice_sizes:
+        raise ValueError(f"Unsupported cell type: {ref}")
+    if degree is None or ref == "pyramid":
+        return _lattice_sizes[ref]
+    return min(_lattice_sizes[ref], 2 * degree + 2)
+
+
+def _lattice(ref: str, n: int) -> Array:
+    """Make a lattice of points on a reference cell.
 
     Args:
         ref: Reference cell
+        n: The number of subdivisions of each edge
 
     Returns:
         Set of points
@@ -28,53 +56,138 @@ def points(ref: str) -> Array:
     if ref == "point":
         return np.array([[0.0]])
 
-    if ref == "interval":
-        return np.array([[i / 20] for i in range(21)])
+    tdim = 1 if ref == "interval" else 2 if ref in ["quadrilateral", "triangle"] else 3
+    indices = np.indices((n + 1, ) * tdim).reshape(tdim, -1).T
+    if ref in ["triangle", "tetrahedron"]:
+        indices = indices[indices.sum(axis=1) <= n]
+    elif ref == "prism":
+        indices = indices[indices[:, 0] + indices[:, 1] <= n]
+    elif ref == "pyramid":
+        indices = indices[indices[:, 2] <= n - indices[:, :2].max(axis=1)]
+    return indices / n
 
-    if ref == "quadrilateral":
-        return np.array([[i / 15, j / 15] for i in range(16) for j in range(16)])
-    if ref == "triangle":
-        return np.array([[i / 15, j / 15] for i in range(16) for j in range(16 - i)])
 
-    if ref == "hexahedron":
-        return np.array([[i / 10, j / 10, k / 10]
-                         for i in range(11) for j in range(11) for k in range(11)])
-    if ref == "tetrahedron":
-        return np.array([[i / 10, j / 10, k / 10]
-                         for i in range(11) for j in range(11 - i) for k in range(11 - i - j)])
-    if ref == "prism":
-        return np.array([[i / 10, j / 10, k / 10]
-                         for i in range(11) for j in range(11 - i) for k in range(11)])
-    if ref == "pyramid":
-        return np.array([[i / 10, j / 10, k / 10]
-                         for i in range(11) for j in range(11) for k in range(11 - max(i, j))])
+def _read_only(array: Array) -> Array:
+    """Make an array read-only.
 
-    raise ValueError(f"Unsupported cell type: {ref}")
+    Args:
+        array: The array
 
+    Returns:
+        The array
+    """
+    array.setflags(write=False)
+    return array
+
+
+class ReferenceGeometry:
+    """Points and sub-entity closures of a reference cell that are used in verification."""
+
+    def __init__(self, ref: str, degree: typing.Optional[int] = None):
+        """Initialise.
+
+        Args:
+            ref: Reference cell
+            degree: The Lagrange superdegree of the elements that will be verified, or None if
+                this is not known
+        """
+        import numpy as np
+
+        n = lattice_size(ref, degree)
+        self.points = _read_only(_lattice(ref, n))
+        # A subset of the points that make a coarser lattice, used for a quick first comparison
+        step = min([i for i in range(2, n + 1) if n % i == 0], default=1)
+        self.coarse_indices = np.flatnonzero(
+            np.all(np.rint(self.points * n).astype(int) % step == 0, axis=1))
+        self.coarse_indices.setflags(write=False)
+        self.entity_points: typing.Tuple[typing.Tuple[Array, ...], ...] = ()
+        self.closures: typing.Tuple[typing.Tuple[typing.Tuple[typing.Tuple[int, int], ...],
+                                                 ...], ...] = ()
+        if ref != "point":
+            r = symfem.create_reference(ref)
+            entity_points = []
+            for d in range(r.tdim):
+                row = []
+                for e_n in range(r.sub_entity_count(d)):
+                    e = r.sub_entity(d, e_n)
+                    epts = _lattice(e.name, lattice_size(e.name, degree))[:, :e.tdim]
+                    axes = np.asarray(to_array(e.axes)).reshape(e.tdim, r.gdim)
+                    row.append(_read_only(to_array(e.origin) + epts @ axes))
+                entity_points.append(tuple(row))
+            self.entity_points = tuple(entity_points)
+
+            sub_entities = [[set(e) for e in r.sub_entities(d)] for d in range(r.tdim + 1)]
+            self.closures = tuple(
+                tuple(
+                    tuple((subdim, se_n) for subdim in range(dim + 1)
+                          for se_n, se in enumerate(sub_entities[subdim]) if se <= e)
+                    for e in sub_entities[dim])
+                for dim in range(r.tdim + 1))
+
+        # The points on the cell followed by the points on each sub-entity, so that an element
+        # can be tabulated at all of them at once
+        self.all_points = _read_only(np.concatenate(
+            [self.points] + [epts for epoints_d in self.entity_points for epts in epoints_d]))
+        self.entity_slices: typing.Tuple[typing.Tuple[slice, ...], ...] = ()
+        start = self.points.shape[0]
+        for epoints_d in self.entity_points:
+            slices_d = []
+            for epts in epoints_d:
+                slices_d.append(slice(start, start + epts.shape[0]))
+                start += epts.shape[0]
+            self.entity_slices += (tuple(slices_d), )
+
+
+_geometries: typing.Dict[typing.Tuple[str, typing.Optional[int]], ReferenceGeometry] = {}
+
+
+def reference_geometry(ref: str, degree: typing.Optional[int] = None) -> ReferenceGeometry:
+    """Get the points and sub-entity closures of a reference cell.
+
+    These are computed once for each reference cell and degree and shared: the arrays are
+    read-only.
 
-def entity_points(ref: str) -> typing.List[typing.List[Array]]:
-    """Get tabulation points for sub-entities of a reference cell.
+    Args:
+        ref: Reference cell
+        degree: The Lagrange superdegree of the elements that will be verified, or None if this
+            is not known
+
+    Returns:
+        The reference geometry
+    """
+    if (ref, degree) not in _geometries:
+        _geometries[(ref, degree)] = ReferenceGeometry(ref, degree)
+    return _geometries[(ref, degree)]
+
+
+def points(ref: str, degree: typing.Optional[int] = None) -> Array:
+    """Get tabulation points for a reference cell.
 
     Args:
         ref: Reference cell
+        degree: The Lagrange superdegree of the elements that will be verified, or None if this
+            is not known
 
     Returns:
         Set of points
     """
-    import numpy as np
+    return reference_geometry(ref, degree).points
+
+
+def entity_points(
+    ref: str, degree: typing.Optional[int] = None
+) -> typing.Tuple[typing.Tuple[Array, ...], ...]:
+    """Get tabulation points for sub-entities of a reference cell.
+
+    Args:
+        ref: Reference cell
+        degree: The Lagrange superdegree of the elements that will be verified, or None if this
+            is not known
 
-    r = symfem.create_reference(ref)
-    out = []
-    for d in range(r.tdim):
-        row = []
-        for n in range(r.sub_entity_count(d)):
-            e = r.sub_entity(d, n)
-            epts = points(e.name)
-            row.append(np.array([
-                to_array(e.origin) + sum(i * to_array(a) for i, a in zip(p, e.axes))
-                for p in epts]))
-        out.append(row)
-    return out
+    Returns:
+        Set of points
+    """
+    return reference_geometry(ref, degree).entity_points
 
 
 def closure_dofs(
@@ -90,24 +203,71 @@ def closure_dofs(
     Returns:
         Entity closure DOFs
     """
-    r = symfem.create_reference(ref)
-    out: typing.List[typing.List[typing.List[int]]] = [[[] for j in i] for i in entity_dofs]
-    for dim in range(r.tdim + 1):
-        for e_n, e in enumerate(r.sub_entities(dim)):
-            for subdim in range(dim + 1):
-                for se_n, se in enumerate(r.sub_entities(subdim)):
-                    if all(i in e for i in se):
-                        out[dim][e_n] += entity_dofs[subdim][se_n]
-    return out
-
-
-def same_span(table0: Array, table1: Array, complete: bool = True) -> bool:
+    return [[[k for subdim, se_n in closure for k in entity_dofs[subdim][se_n]]
+             for closure in closures_d]
+            for closures_d in reference_geometry(ref).closures]
+
+
+def _small_span_basis(matrix: Array) -> typing.Tuple[Array, Array]:
+    """Get an orthonormal basis of the span of the columns of a matrix and its singular values.
+
+    The rank is computed using the same tolerance as numpy.linalg.matrix_rank.
+
+    Args:
+        matrix: The matrix
+
+    Returns:
+        A matrix whose columns are an orthonormal basis of the span, and the nonzero singular
+        values of the matrix
+    """
+    import numpy as np
+
+    u, s, _ = np.linalg.svd(matrix)
+    if s.size == 0:
+        return u[:, :0], s
+    rank = np.count_nonzero(s > s[0] * max(matrix.shape) * np.finfo(s.dtype).eps)
+    return u[:, :rank], s[:rank]
+
+
+def _joint_r(table0: Array, table1: Array) -> typing.Tuple[Array, Array]:
+    """Get the R factors of two tables in a common orthonormal basis.
+
+    The two tables are factorised together as QR using a QR decomposition of the tables stacked
+    side by side. Q is not computed: as it has orthonormal columns, the spans of the tables can be
+    compared using the columns of R, which form a much smaller matrix.
+
+    Args:
+        table0: First table, with shape (npoints, ndofs)
+        table1: Second table, with shape (npoints, ndofs)
+
+    Returns:
+        The columns of R for the first table and for the second table
+    """
+    import numpy as np
+
+    ndofs = table0.shape[1]
+    # With mode="r", only R is returned
+    r = typing.cast(Array, np.linalg.qr(np.hstack([table0, table1]), mode="r"))
+    return r[:, :ndofs], r[:, ndofs:]
+
+
+def same_span(table0: Array, table1: Array, complete: bool = True, tol: float = 1e-6) -> bool:
     """Check if two tables span the same space.
 
+    The spans are compared using the principal angles between them. The sines of the principal
+    angles are the singular values of the part of an orthonormal basis of the second span that is
+    orthogonal to the first span.
+
+    The spans of badly conditioned tables can only be computed to an accuracy of about the
+    machine precision multiplied by the condition number, so the tolerance is increased to this
+    for badly conditioned tables.
+
     Args:
         table0: First table
         table1: Second table
         complete: Should the tables have full rank?
+        tol: Tolerance for the principal angles. The spans are treated as the same if the square
+            root of the sum of the squares of the sines of the principal angles is at most this
 
     Returns:
         True if span is the same, otherwise False
@@ -118,20 +278,61 @@ def same_span(table0: Array, table1: Array, complete: bool = True) -> bool:
         return False
 
     ndofs = table0.shape[-1]
-    table0 = table0.reshape(-1, ndofs)
-    table1 = table1.reshape(-1, ndofs)
-
-    rank0 = np.linalg.matrix_rank(table0)
-    rank1 = np.linalg.matrix_rank(table1)
-    if complete and rank0 != ndofs:
+    t0 = table0.reshape(-1, ndofs)
+    if t0.size == 0:
+        return not complete or ndofs == 0
+    r0, r1 = _joint_r(t0, table1.reshape(-1, ndofs))
+    basis0, s0 = _small_span_basis(r0)
+    basis1, s1 = _small_span_basis(r1)
+    if complete and basis0.shape[1] != ndofs:
         return False
+    if basis0.shape[1] != basis1.shape[1]:
+        return False
+    if basis0.shape[1] == 0:
+        return True
+
+    accuracy = max(t0.shape) * np.finfo(s0.dtype).eps * (s0[0] / s0[-1] + s1[0] / s1[-1])
+    residual = basis1 - basis0 @ (basis0.T @ basis1)
+    return bool(np.linalg.norm(residual) <= max(tol, accuracy))
+
+
+def clearly_different(table0: Array, table1: Array, tol: float = 1e-2) -> bool:
+    """Check if two tables clearly do not span the same space.
+
+    Unlike same_span, this does not depend on the tables having the same numerical rank, so can
+    be used with tables at sets of points that are not unisolvent. The tolerance is large, and is
+    increased for badly conditioned tables in the same way as in same_span, so that tables that
+    are not clearly different are left to be checked by same_span.
+
+    Args:
+        table0: First table
+        table1: Second table
+        tol: Relative size of the part of a table outside the span of the other table above
+            which the tables are treated as different
 
-    if rank0 != rank1:
+    Returns:
+        True if the spans are clearly different, otherwise False
+    """
+    import numpy as np
+
+    if table0.shape != table1.shape:
+        return True
+
+    ndofs = table0.shape[-1]
+    t0 = table0.reshape(-1, ndofs)
+    if t0.size == 0:
         return False
+    r0, r1 = _joint_r(t0, table1.reshape(-1, ndofs))
+    basis0, s0 = _small_span_basis(r0)
+    basis1, s1 = _small_span_basis(r1)
+    if s0.size == 0 or s1.size == 0:
+        return s0.size != s1.size
 
-    stack = np.hstack([table0, table1])
-    srank = np.linalg.matrix_rank(stack)
-    return rank0 == srank
+    accuracy = max(t0.shape) * np.finfo(s0.dtype).eps * (s0[0] / s0[-1] + s1[0] / s1[-1])
+    for basis, r in [(basis0, r1), (basis1, r0)]:
+        if np.linalg.norm(r - basis @ (basis.T @ r)) > max(tol, accuracy) * np.linalg.norm(r):
+            return True
+    return False
 
 
 def verify(
@@ -140,19 +341,37 @@ def verify(
                         typing.Callable[[Array], Array]],
     info1: typing.Tuple[typing.List[typing.List[typing.List[int]]],
                         typing.Callable[[Array], Array]],
+    stats: typing.Optional[typing.Dict[str, int]] = None,
+    degree: typing.Optional[int] = None
 ) -> typing.Tuple[bool, typing.Optional[str]]:
     """Run verification.
 
+    A coarse check is done first, which compares the spans of the tables at a subset of the points
+    and the continuity on one sub-entity of each dimension. The full check is only done if the
+    coarse check does not find a difference.
+
     Args:
         ref: Reference cell
         info0: Verification info for first implementation
         info1: Verification info for second implementation
+        stats: If this is not None, the number of coarse checks, the number of full checks that
+            were skipped because the coarse check found a difference, the number of coarse checks
+            that were extra work because they did not find a difference, and the number of full
+            checks are added to this
+        degree: The Lagrange superdegree of the elements. If this is not None, the elements are
+            compared at a number of points that depends on the degree rather than the default
+            set of points
 
     Returns:
         (True, None) if verification successful, otherwise False plus a reason
     """
     import numpy as np
 
+    if stats is None:
+        stats = {}
+    for key in ["coarse checks", "full checks skipped", "extra coarse checks", "full checks"]:
+        stats[key] = stats.get(key, 0)
+
     edofs0, tab0 = info0
     edofs1, tab1 = info1
 
@@ -172,30 +391,94 @@ def verify(
                 return False, ("Wrong number of DOFs associated with an entity"
                                f" {dim},{e_n} ({len(j0)} vs {len(j1)})")
 
-    # Check that polysets span the same space
-    pts = points(ref)
-    table0 = tab0(pts)
-    table1 = tab1(pts)
+    # Tabulate both elements at the points on the cell and on every sub-entity
+    geometry = reference_geometry(ref, degree)
+    npts = geometry.points.shape[0]
+    all_table0 = tab0(geometry.all_points.copy())
+    all_table1 = tab1(geometry.all_points.copy())
+
+    table0 = all_table0[:npts]
+    table1 = all_table1[:npts]
 
     if table0.shape != table1.shape:
         return False, f"Non-matching table shapes ({table0.shape} vs {table1.shape})"
 
+    def continuity_matches(d: int, e: int) -> bool:
+        """Check that the continuity of the two elements is the same on a sub-entity.
+
+        Args:
+            d: The dimension of the sub-entity
+            e: The index of the sub-entity
+
+        Returns:
+            True if the continuity is the same, otherwise False
+        """
+        ed0 = ecdofs0[d][e]
+        if len(ed0) == 0:
+            return True
+        ed1 = ecdofs1[d][e]
+
+        not_ed0 = [k for i in edofs0 for j in i for k in j if k not in ed0]
+        not_ed1 = [k for i in edofs1 for j in i for k in j if k not in ed1]
+        t0 = all_table0[geometry.entity_slices[d][e]][:, :, not_ed0]
+        t1 = all_table1[geometry.entity_slices[d][e]][:, :, not_ed1]
+        return np.allclose(t0, t1) or same_span(t0, t1, False)
+
+    # Coarse check
+    stats["coarse checks"] += 1
+    if clearly_different(table0[geometry.coarse_indices], table1[geometry.coarse_indices]):
+        stats["full checks skipped"] += 1
+        return False, "Polysets do not span the same space"
+    coarse_entities = [(d, 0) for d in range(len(geometry.entity_slices))]
+    for d, e in coarse_entities:
+        if not continuity_matches(d, e):
+            stats["full checks skipped"] += 1
+            return False, f"Continuity does not match for ({d},{e})"
+
+    # Check that polysets span the same space
+    stats["extra coarse checks"] += 1
+    stats["full checks"] += 1
     if not same_span(table0, table1):
         return False, "Polysets do not span the same space"
 
     # Check that continuity will be the same
-    epoints = entity_points(ref)
-    for d, epoints_d in enumerate(epoints):
-        for e, pts in enumerate(epoints_d):
-            ed0 = ecdofs0[d][e]
-            if len(ed0) > 0:
-                ed1 = ecdofs1[d][e]
-
-                not_ed0 = [k for i in edofs0 for j in i for k in j if k not in ed0]
-                not_ed1 = [k for i in edofs1 for j in i for k in j if k not in ed1]
-                t0 = tab0(pts)[:, :, not_ed0]
-                t1 = tab1(pts)[:, :, not_ed1]
-                if not np.allclose(t0, t1) and not same_span(t0, t1, False):
-                    return False, f"Continuity does not match for ({d},{e})"
+    for d, slices_d in enumerate(geometry.entity_slices):
+        for e in range(len(slices_d)):
+            if (d, e) not in coarse_entities and not continuity_matches(d, e):
+                return False, f"Continuity does not match for ({d},{e})"
 
     return True, None
+
+
+def verify_implementation(
+    element_id: str, example: str, entity_dofs: typing.List[typing.List[typing.List[int]]],
+    tabulate: typing.Callable[[Array], Array]
+) -> typing.Tuple[bool, typing.Optional[str]]:
+    """Verify an implementation of an element against DefElement.
+
+    The implementation is compared with Symfem's implementation of the element. The Symfem data
+    is taken from the store of reference tables, so Symfem only needs to be run the first time
+    that each example is verified.
+
+    Args:
+        element_id: The filename of the element's .def file (without the extension), eg "lagrange"
+        example: The example, eg "triangle,2,equispaced"
+        entity_dofs: The DOFs associated with each sub-entity of the cell, as a list of lists for
+            each dimension
+        tabulate: Function that takes an array of points with shape (npoints, tdim) and returns
+            the values of the basis functions at these points as an array with shape
+            (npoints, value_size, ndofs)
+
+    Returns:
+        (True, None) if verification successful, otherwise False plus a reason
+    """
+    from defelement.element import load_element
+    from defelement.reference_tables import symfem_reference
+
+    element = load_element(element_id)
+    if not element.implemented("symfem"):
+        raise ValueError(f"{element_id} is not implemented in Symfem, so cannot be verified")
+
+    sym_edofs, sym_tab, degree = symfem_reference(element, example)
+    return verify(example.split(",")[0], (entity_dofs, tabulate), (sym_edofs, sym_tab),
+                  degree=degree)
@@ -0,0 +1,159 @@
+"""Cache of verification results."""
+
+import inspect
+import json
+import os
+import typing
+
+from defelement import settings
+from defelement.cache import symfem_hash
+from defelement.element import Element
+from defelement.implementations import implementations, versions
+from defelement.tools import hash_data, hash_files
+
+_hashes: typing.Dict[str, str] = {}
+
+# Files (other than the implementations) whose changes affect every verification result
+verification_code = [
+    "verify.py", "defelement/verification.py", "defelement/reference_tables.py",
+    "defelement/cache.py", "defelement/element.py", "defelement/implementations/core.py",
+    "defelement/implementations/__init__.py"]
+
+
+def code_hash(implementation: str) -> str:
+    """Get a hash of the code that verification of an implementation depends on.
+
+    This includes the files in verification_code, Symfem's implementation and the
+    implementation.
+
+    Args:
+        implementation: The implementation
+
+    Returns:
+        Hex digest of the hash
+    """
+    if implementation not in _hashes:
+        files = [os.path.join(settings.dir_path, *f.split("/")) for f in verification_code]
+        for i in ["symfem", implementation]:
+            file = inspect.getsourcefile(implementations[i])
+            assert file is not None
+            if file not in files:
+                files.append(file)
+        _hashes[implementation] = hash_files(files)
+    return _hashes[implementation]
+
+
+def result_key(element: Element, example: str, implementation: str) -> typing.Optional[str]:
+    """Get the key used to cache a verification result.
+
+    Args:
+        element: The element
+        example: The example
+        implementation: The implementation
+
+    Returns:
+        The key, or None if the result cannot be cached because the version of the
+        implementation or Symfem is not known
+    """
+    version = versions[implementation]()
+    symfem_version = versions["symfem"]()
+    if version is None or symfem_version is None:
+        return None
+    return hash_data(
+        hash_files([os.path.join(settings.element_path, f"{element.filename}.def")]), example,
+        implementation, version, symfem_version, symfem_hash(), code_hash(implementation),
+        settings.exact_symfem_tabulation)
+
+
+def affected_results(
+    changed: typing.List[str]
+) -> typing.Tuple[bool, typing.Set[str], typing.Set[str]]:
+    """Find the verification results that are affected by changes to some files.
+
+    Args:
+        changed: The paths of the changed files, relative to the root of the repository
+
+    Returns:
+        True if every result is affected, the filenames of the elements whose results are
+        affected, and the implementations whose results are affected
+    """
+    everything = False
+    elements = set()
+    implementations_changed = set()
+    modules = {}
+    for i, c in implementations.items():
+        file = inspect.getsourcefile(c)
+        assert file is not None
+        modules[os.path.relpath(file, settings.dir_path).replace(os.sep, "/")] = i
+    for file in changed:
+        if file.startswith("elements/") and file.endswith(".def"):
+            elements.add(file[9:-4])
+        elif file in modules:
+            if modules[file] == "symfem":
+                everything = True
+            else:
+                implementations_changed.add(modules[file])
+        elif file in verification_code:
+            everything = True
+    return everything, elements, implementations_changed
+
+
+class VerificationCache:
+    """Results of previous verification runs.
+
+    Results are stored for each element, example and implementation using a key that changes
+    whenever the element's .def file, the installed version of the implementation or Symfem, the
+    verification code, or the way Symfem elements are tabulated changes.
+    """
+
+    def __init__(self, filename: str):
+        """Initialise.
+
+        Args:
+            filename: The file the results are stored in
+        """
+        self.filename = filename
+        self.results: typing.Dict[str, str] = {}
+        self.new_results: typing.Dict[str, str] = {}
+        if os.path.isfile(filename):
+            with open(filename) as f:
+                self.results = json.load(f)
+
+    def get(self, key: typing.Optional[str]) -> typing.Optional[str]:
+        """Get a result.
+
+        Args:
+            key: The key
+
+        Returns:
+            The result ("pass", "fail" or "not implemented"), or None if there is no cached
+            result
+        """
+        if key is None:
+            return None
+        return self.results.get(key)
+
+    def set(self, key: typing.Optional[str], result: str):
+        """Store a result.
+
+        Args:
+            key: The key. If this is None, the result is not stored
+            result: The result
+        """
+        if key is not None:
+            self.results[key] = result
+            self.new_results[key] = result
+
+    def save(self):
+        """Save the results.
+
+        Results saved by other processes since this cache was loaded are kept.
+        """
+        results = {}
+        if os.path.isfile(self.filename):
+            with open(self.filename) as f:
+                results = json.load(f)
+        results.update(self.new_results)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        with open(self.filename, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
@@ -0,0 +1,164 @@
+"""Rebuild the website when its source files change."""
+
+import functools
+import os
+import subprocess
+import threading
+import time
+import typing
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from defelement import settings
+
+# The targets that need to be rebuilt when a file in each folder changes (None if every target
+# needs to be rebuilt). Outputs of these targets whose inputs have not changed are skipped using
+# the build manifest.
+watched_folders: typing.Dict[str, typing.Optional[typing.List[str]]] = {
+    settings.element_path: [
+        "elements", "examples", "verification", "index", "recent", "categories",
+        "implementations", "references", "families", "sitemap"],
+    settings.pages_path: ["pages", "sitemap"],
+    settings.img_path: ["pages", "sitemap"],
+    settings.template_path: None,
+    settings.data_path: None,
+}
+
+
+def snapshot(folders: typing.List[str]) -> typing.Dict[str, float]:
+    """Get the modification time of every file in some folders.
+
+    Args:
+        folders: The folders
+
+    Returns:
+        The modification time of each file
+    """
+    times = {}
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            for file in files:
+                if not file.startswith("."):
+                    path = os.path.join(root, file)
+                    try:
+                        times[path] = os.path.getmtime(path)
+                    except FileNotFoundError:
+                        pass
+    return times
+
+
+def changed_files(
+    old: typing.Dict[str, float], new: typing.Dict[str, float]
+) -> typing.List[str]:
+    """Get the files that have been added, changed or removed between two snapshots.
+
+    Args:
+        old: The old snapshot
+        new: The new snapshot
+
+    Returns:
+        The changed files
+    """
+    return sorted(
+        [f for f, t in new.items() if old.get(f) != t] + [f for f in old if f not in new])
+
+
+def affected_targets(files: typing.List[str]) -> typing.Optional[typing.List[str]]:
+    """Get the targets that need to be rebuilt after some files have changed.
+
+    Args:
+        files: The changed files
+
+    Returns:
+        The targets to rebuild, or None if every target needs to be rebuilt
+    """
+    affected: typing.List[str] = []
+    for file in files:
+        for folder, folder_targets in watched_folders.items():
+            if file.startswith(folder + os.sep):
+                if folder_targets is None:
+                    return None
+                affected += [t for t in folder_targets if t not in affected]
+    return affected
+
+
+def select_targets(
+    targets: typing.Optional[typing.List[str]], only: typing.Optional[typing.List[str]]
+) -> typing.Optional[typing.List[str]]:
+    """Restrict the targets to rebuild to the targets selected using --only.
+
+    Args:
+        targets: The targets to rebuild, or None if every target needs to be rebuilt
+        only: The selected targets, or None if every target is selected
+
+    Returns:
+        The targets to rebuild, or None if every target needs to be rebuilt
+    """
+    if only is None:
+        return targets
+    if targets is None:
+        return only
+    return [t for t in targets if t in only]
+
+
+def serve(path: str, port: int) -> ThreadingHTTPServer:
+    """Serve a folder over HTTP on a background thread.
+
+    Args:
+        path: The folder
+        port: The port
+
+    Returns:
+        The server
+    """
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=path)
+    server = ThreadingHTTPServer(("localhost", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def watch(
+    build_command: typing.List[str], port: int = 8000, interval: float = 1.0,
+    only: typing.Optional[typing.List[str]] = None
+):
+    """Serve the website and rebuild the affected targets whenever a source file changes.
+
+    Args:
+        build_command: Command that builds the website. The targets to rebuild are passed to
+            this command using --only
+        port: The port to serve the website on
+        interval: The time in seconds between checks for changed files
+        only: The targets to build, or None to build every target
+    """
+    folders = list(watched_folders)
+    times = snapshot(folders)
+    if only is None:
+        subprocess.run(build_command)
+    else:
+        subprocess.run(build_command + ["--only", ",".join(only)])
+
+    server = serve(settings.html_path, port)
+    print(f"Serving {settings.html_path} at http://localhost:{port}/")
+    print("Watching for changes (press Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            if len(changed_files(times, snapshot(folders))) == 0:
+                continue
+            # Wait for editors to finish writing files before rebuilding
+            time.sleep(interval)
+            new_times = snapshot(folders)
+            changed = changed_files(times, new_times)
+            times = new_times
+            for file in changed:
+                print(f"Changed: {os.path.relpath(file, settings.dir_path)}")
+            to_build = select_targets(affected_targets(changed), only)
+            if to_build is None:
+                subprocess.run(build_command)
+            elif len(to_build) > 0:
+                subprocess.run(build_command + ["--only", ",".join(to_build)])
+            print("Watching for changes (press Ctrl+C to stop)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
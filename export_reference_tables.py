@@ -0,0 +1,68 @@
+"""Compute the Symfem tables used in verification and store them in a folder."""
+
+import argparse
+import os
+import sys
+import traceback
+import typing
+
+from defelement import settings
+from defelement.element import Element, load_element
+from defelement.reference_tables import symfem_reference
+from defelement.scheduling import run_tasks
+
+parser = argparse.ArgumentParser(description="Export the Symfem tables used in verification")
+parser.add_argument('destination', metavar='destination',
+                    help="Folder to store the tables in. This folder can be passed to "
+                    "verify_implementation.py using --reference-dir.")
+parser.add_argument('elements', metavar='elements', nargs="*",
+                    help="Filenames of the elements' .def files (without the extension). By "
+                    "default, every element that is implemented in Symfem is exported.")
+parser.add_argument('--processes', metavar="processes", default=None,
+                    help="The number of processes to compute the tables on.")
+
+args = parser.parse_args()
+settings.reference_tables_path = args.destination
+if args.processes is not None:
+    settings.processes = int(args.processes)
+
+if len(args.elements) == 0:
+    filenames = sorted(f[:-4] for f in os.listdir(settings.element_path) if f.endswith(".def"))
+else:
+    filenames = args.elements
+elements = []
+for filename in filenames:
+    try:
+        elements.append(load_element(filename))
+    except ValueError as err:
+        parser.error(str(err))
+
+
+def export_example(task: typing.Tuple[Element, str]) -> typing.Optional[str]:
+    """Compute and store the Symfem table of an example.
+
+    Args:
+        task: The element and the example
+
+    Returns:
+        The reason computing the table failed, or None if it succeeded
+    """
+    e, eg = task
+    try:
+        symfem_reference(e, eg)
+    except Exception:
+        return f"{e.filename} {eg}\n{traceback.format_exc()}"
+    print(f"{e.filename} {eg}", flush=True)
+    return None
+
+
+tasks = [(e, eg) for e in elements if e.implemented("symfem") for eg in e.examples]
+failed = [r for r in run_tasks(export_example, tasks, settings.processes, "examples")
+          if r is not None]
+
+print(f"Exported {len(tasks) - len(failed)} tables to {args.destination}")
+if len(failed) > 0:
+    print("Computing the tables of the following examples failed:")
+    for reason in failed:
+        print("  " + reason.strip().replace("\n", "\n  "))
+    sys.exit(1)
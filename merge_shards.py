@@ -0,0 +1,23 @@
+"""Merge the outputs of sharded builds into a single website."""
+
+import argparse
+import sys
+
+from defelement import shards
+
+parser = argparse.ArgumentParser(description="Merge sharded builds of defelement.org")
+parser.add_argument('destination', metavar='destination', help="Destination of HTML files.")
+parser.add_argument('shards', metavar='shards', nargs="+",
+                    help="Destinations of the HTML files of each shard.")
+
+args = parser.parse_args()
+
+conflicts = shards.merge(args.shards, args.destination)
+if len(conflicts) > 0:
+    print("The following outputs are different in different shards:")
+    for c in conflicts:
+        print(f"  {c}")
+    print("All the shards must be built from the same source using --reproducible.")
+    sys.exit(1)
+
+print(f"Merged {len(args.shards)} shards into {args.destination}")
@@ -0,0 +1,31 @@
+"""Merge the results of sharded verification runs."""
+
+import argparse
+import json
+import sys
+
+from defelement import shards
+
+parser = argparse.ArgumentParser(description="Merge sharded verification results")
+parser.add_argument('destination', metavar='destination', help="Name of output json file.")
+parser.add_argument('shards', metavar='shards', nargs="+",
+                    help="Output json files of each shard.")
+
+args = parser.parse_args()
+
+results = []
+for filename in args.shards:
+    with open(filename) as f:
+        results.append(json.load(f))
+
+merged, problems = shards.merge_verification(results)
+if len(problems) > 0:
+    print("The results of the shards could not be merged:")
+    for p in problems:
+        print(f"  {p}")
+    sys.exit(1)
+
+with open(args.destination, "w") as f:
+    json.dump(merged, f)
+
+print(f"Merged {len(args.shards)} shards into {args.destination}")
@@ -0,0 +1,28 @@
+import os
+
+import sympy
+
+from defelement import cache, settings
+
+
+def test_element_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_path", str(tmp_path))
+    monkeypatch.setattr(cache, "_elements", {})
+
+    e0 = cache.create_element("triangle", "Lagrange", 2, variant="equispaced")
+    key = cache.element_key("triangle", "Lagrange", 2, variant="equispaced")
+    assert os.path.isfile(os.path.join(tmp_path, "elements", f"{key}.pickle"))
+
+    monkeypatch.setattr(cache, "_elements", {})
+    e1 = cache.create_element("triangle", "Lagrange", 2, variant="equispaced")
+    assert e1 is not e0
+    assert [f.as_sympy() for f in e0.get_basis_functions()] == [
+        f.as_sympy() for f in e1.get_basis_functions()]
+    pts = [(0, 0), (sympy.Rational(1, 3), sympy.Rational(1, 5)), (sympy.Rational(1, 2), 0)]
+    assert e0.tabulate_basis(pts) == e1.tabulate_basis(pts)
+
+
+def test_element_key_uses_symfem_source(monkeypatch):
+    key = cache.element_key("triangle", "Lagrange", 2, variant="equispaced")
+    monkeypatch.setattr(cache, "_symfem_hash", "changed")
+    assert cache.element_key("triangle", "Lagrange", 2, variant="equispaced") != key
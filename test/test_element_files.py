@@ -3,6 +3,9 @@ import os
 import pytest
 import yaml
 
+from defelement.element import Element
+from defelement.implementations import example_with_degree
+
 dir_path = os.path.dirname(os.path.realpath(__file__))
 element_path = os.path.join(dir_path, "../elements")
 
@@ -46,3 +49,17 @@ def test_element_page(e):
 
     for key in docs["req"]:
         assert key in data
+
+
+def test_degree_sweep():
+    assert example_with_degree("triangle,1,legendre", 3) == "triangle,3,legendre"
+    assert example_with_degree("triangle,1 {edge_orders=[2,1,1]}", 2) == (
+        "triangle,2 {edge_orders=[2,1,1]}")
+
+    with open(os.path.join(element_path, "bubble.def")) as f:
+        e = Element(yaml.load(f, Loader=yaml.FullLoader), "bubble")
+    assert e.degree_sweep(1, 6) == ["interval,4", "interval,5", "triangle,5"]
+
+    with open(os.path.join(element_path, "bernardi-raugel.def")) as f:
+        e = Element(yaml.load(f, Loader=yaml.FullLoader), "bernardi-raugel")
+    assert e.degree_sweep(1, 6) == []
@@ -0,0 +1,35 @@
+import os
+
+from defelement import settings
+from defelement.manifest import Manifest
+
+
+def test_rebuild_kept_output(tmp_path, monkeypatch):
+    previous = os.path.join(tmp_path, "html")
+    staging = os.path.join(tmp_path, "html.staging")
+    os.makedirs(os.path.join(previous, "img"))
+    os.makedirs(staging)
+    for file in ["page.html", "img/a.png"]:
+        with open(os.path.join(previous, file), "w") as f:
+            f.write("old")
+
+    monkeypatch.setattr(settings, "html_path", previous)
+    m = Manifest()
+    m.load(os.path.join(previous, ".manifest.json"))
+    m.record("/img/a.png", "a")
+    m.record("/page.html", "page", uses=["/img/a.png"])
+    m.save()
+
+    monkeypatch.setattr(settings, "html_path", staging)
+    m = Manifest()
+    m.load(os.path.join(staging, ".manifest.json"), previous)
+    # Keeping the page also keeps the image that it uses
+    assert m.up_to_date("/page.html", "page")
+    assert os.path.samefile(os.path.join(previous, "img/a.png"), os.path.join(staging, "img/a.png"))
+
+    # Rebuilding the image must not change the previous build's file
+    assert not m.up_to_date("/img/a.png", "new")
+    with open(os.path.join(staging, "img/a.png"), "w") as f:
+        f.write("new")
+    with open(os.path.join(previous, "img/a.png")) as f:
+        assert f.read() == "old"
@@ -6,6 +6,8 @@ from random import random
 import pytest
 import yaml
 
+from defelement import polyset
+
 element_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../elements")
 
 inputs = []
@@ -42,3 +44,12 @@ def test_latex(file, cellname):
                 if os.system(f"pdflatex -halt-on-error {filename}.tex > /dev/null") != 0:
                     assert os.system(f"pdflatex -halt-on-error {filename}.tex") == 0
                 os.system(f"rm {filename}.*")
+
+
+def test_named_set_names(monkeypatch):
+    monkeypatch.setattr(polyset, "named", {})
+    p = "poly[k] && <k>[{{x}}{{poly[k]}}] && <k-1>[\\text{A}]^d"
+    polyset.make_poly_set("<k>[\\text{B}]")
+    polyset.make_poly_set(p)
+    assert polyset.named_set_names(p) == ["\\mathcal{Z}^{(1)}", "\\mathcal{Z}^{(2)}"]
+    assert polyset.named_set_names("poly[k]") == []
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import yaml
+
+from defelement import reference_tables, settings
+from defelement.element import Element
+from defelement.reference_tables import (implementation_reference, reference_key, stored_degree,
+                                         symfem_reference)
+from defelement.verification import reference_geometry, verify
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+element_path = os.path.join(dir_path, "../elements")
+
+
+def test_symfem_reference(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_path", str(tmp_path))
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+    eg = [i for i in e.examples if "triangle" in i][0]
+
+    edofs0, tab0, degree = symfem_reference(e, eg)
+    assert degree == 1
+    pts = reference_geometry("triangle", degree).all_points.copy()
+    key = reference_key(e, eg)
+    assert os.path.isfile(os.path.join(tmp_path, "reference-tables", f"{key}.npy"))
+    assert os.path.isfile(os.path.join(tmp_path, "reference-tables", f"{key}.json"))
+
+    def fail(element, example):
+        raise RuntimeError("Symfem should not be used")
+
+    monkeypatch.setitem(reference_tables.verifications, "symfem", fail)
+    monkeypatch.setattr(reference_tables, "symfem_lagrange_superdegree", fail)
+    edofs1, tab1, degree1 = symfem_reference(e, eg)
+    assert edofs1 == edofs0
+    assert degree1 == degree
+    assert np.allclose(tab1(pts), tab0(pts))
+    assert verify("triangle", (edofs0, tab0), (edofs1, tab1), degree=degree)[0]
+
+
+def test_reference_tables_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_path", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "reference_tables_path", str(tmp_path / "tables"))
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+    eg = [i for i in e.examples if "triangle" in i][0]
+
+    symfem_reference(e, eg)
+    key = reference_key(e, eg)
+    assert reference_tables.tables_folder() == str(tmp_path / "tables")
+    assert os.path.isfile(os.path.join(tmp_path, "tables", f"{key}.npy"))
+    assert not os.path.isdir(os.path.join(tmp_path, "cache", "reference-tables"))
+
+
+def test_implementation_reference(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_path", str(tmp_path))
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+    eg = [i for i in e.examples if "quadrilateral" in i][0]
+
+    assert stored_degree(e, eg) is None
+    edofs0, tab0, degree = symfem_reference(e, eg)
+    assert stored_degree(e, eg) == degree
+
+    edofs1, tab1 = implementation_reference(e, eg, "symfem", degree)
+    assert edofs1 == edofs0
+
+    def fail(element, example):
+        raise RuntimeError("The implementation should not be used")
+
+    monkeypatch.setitem(reference_tables.verifications, "symfem", fail)
+    edofs2, tab2 = implementation_reference(e, eg, "symfem", degree)
+    assert edofs2 == edofs0
+    pts = reference_geometry("quadrilateral", degree).all_points.copy()
+    assert np.allclose(tab2(pts), tab0(pts))
+    assert verify("quadrilateral", (edofs1, tab1), (edofs2, tab2), degree=degree)[0]
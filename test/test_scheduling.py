@@ -0,0 +1,121 @@
+import functools
+import os
+import time
+
+import pytest
+
+from defelement.scheduling import (TimingDatabase, extrapolate_time, longest_first, run_queue,
+                                   run_targets)
+
+
+def test_longest_first():
+    assert longest_first(["a", "b", "c", "d"], [1.0, 4.0, 2.0, 3.0]) == ["b", "d", "c", "a"]
+
+
+def test_timing_database(tmp_path):
+    filename = str(tmp_path / "timings.json")
+    db = TimingDatabase(filename)
+    assert db.get(("lagrange", "triangle,1", "basix")) is None
+    assert db.estimate(("lagrange", "triangle,1", "basix")) == 1.0
+    db.set(("lagrange", "triangle,1", "basix"), 2.5)
+    db.set(("lagrange", "triangle,2", "basix"), 4.0)
+    db.save()
+
+    db = TimingDatabase(filename)
+    assert db.get(("lagrange", "triangle,1", "basix")) == 2.5
+    assert db.estimate(("lagrange", "triangle,3", "basix")) == 4.0
+
+
+def test_extrapolate_time():
+    assert extrapolate_time({}, 3) is None
+    assert extrapolate_time({1: 2.0}, 3) == pytest.approx(16.0)
+    assert extrapolate_time({1: 2.0}, 3, power=1) == pytest.approx(4.0)
+    assert extrapolate_time({0: 1.0, 1: 4.0}, 3) == pytest.approx(16.0)
+    assert extrapolate_time({0: 1.0, 1: 1.0, 3: 2.0}, 7) == pytest.approx(4.0)
+
+
+def test_run_targets():
+    order = []
+    targets = {
+        "a": (lambda: "A", ["b", "c"]),
+        "b": (lambda: "B", ["c"]),
+        "c": (lambda: "C", ["d"]),
+    }
+    run_targets(targets, 1, lambda name, result: order.append((name, result)))
+    assert order == [("c", "C"), ("b", "B"), ("a", "A")]
+
+
+def timed_target(folder, name):
+    with open(os.path.join(folder, name), "w") as f:
+        f.write(f"{time.time()}\n")
+        time.sleep(0.5)
+        f.write(f"{time.time()}\n")
+    return name
+
+
+def test_run_targets_weights(tmp_path):
+    targets = {
+        t: (functools.partial(timed_target, str(tmp_path), t), [])
+        for t in ["a", "heavy", "b", "c"]}
+    run_targets(targets, 2, weights={"heavy": 2})
+    times = {}
+    for t in targets:
+        with open(os.path.join(tmp_path, t)) as f:
+            times[t] = [float(i) for i in f.read().split()]
+    for t in ["a", "b", "c"]:
+        assert times[t][1] <= times["heavy"][0] or times[t][0] >= times["heavy"][1]
+
+
+def test_run_targets_circular():
+    targets = {"a": (lambda: None, ["b"]), "b": (lambda: None, ["a"])}
+    with pytest.raises(ValueError):
+        run_targets(targets)
+
+
+def queue_task(task, report):
+    if task == "hang":
+        time.sleep(60)
+    if task == "crash":
+        os._exit(1)
+    if task == "error":
+        raise ValueError()
+    for i in range(2):
+        report(f"{task}{i}")
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_queue(processes):
+    reports = []
+    failures = []
+    run_queue(queue_task, ["a", "error", "b"], lambda i, r: reports.append((i, r)),
+              lambda i, reason: failures.append(i), processes)
+    assert sorted(reports) == [(0, "a0"), (0, "a1"), (2, "b0"), (2, "b1")]
+    assert failures == [1]
+
+
+def test_run_queue_timeout():
+    reports = []
+    failures = []
+    start = time.monotonic()
+    run_queue(queue_task, ["hang", "crash", "a", "b", "c"], lambda i, r: reports.append((i, r)),
+              lambda i, reason: failures.append(i), 2, 2.0)
+    assert time.monotonic() - start < 30
+    assert sorted(failures) == [0, 1]
+    assert sorted(reports) == [(2, "a0"), (2, "a1"), (3, "b0"), (3, "b1"), (4, "c0"), (4, "c1")]
+
+
+def group_task(task, report):
+    report((task, os.getpid()))
+
+
+@pytest.mark.parametrize("processes", [1, 4])
+def test_run_queue_groups(processes):
+    reports = []
+    tasks = ["a", "b", "a", "c", "a", "b"]
+    run_queue(group_task, tasks, lambda i, r: reports.append(r),
+              lambda i, reason: None, processes, groups=tasks)
+    assert sorted(task for task, _ in reports) == sorted(tasks)
+    groups = {}
+    for task, pid in reports:
+        assert pid != os.getpid()
+        assert groups.setdefault(pid, task) == task
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from defelement import settings, shards
+
+
+def test_parse_shard():
+    assert shards.parse_shard("2/3") == (2, 3)
+    for shard in ["0/3", "4/3", "3", "a/b"]:
+        with pytest.raises(ValueError):
+            shards.parse_shard(shard)
+
+
+def test_in_shard(monkeypatch):
+    keys = [f"element-{i}" for i in range(50)]
+    counts = []
+    for i in range(1, 4):
+        monkeypatch.setattr(settings, "shard", (i, 3))
+        counts.append([k for k in keys if shards.in_shard(k)])
+    assert sorted(sum(counts, [])) == sorted(keys)
+    assert all(len(c) > 0 for c in counts)
+
+
+def write_shard(path, files, manifest):
+    for file, content in files.items():
+        os.makedirs(os.path.dirname(os.path.join(path, file)), exist_ok=True)
+        with open(os.path.join(path, file), "w") as f:
+            f.write(content)
+    with open(os.path.join(path, ".manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def test_merge(tmp_path):
+    page = {"hash": "p", "title": "Page", "files": [], "target": "elements"}
+    write_shard(tmp_path / "1", {"index.html": "index", "img/a.png": "a"}, {
+        "/index.html": dict(page, uses=["/img/a.png"]),
+        "/img/a.png": {"hash": "a", "title": None, "files": [], "uses": [], "target": "elements"}})
+    write_shard(tmp_path / "2", {"index.html": "index", "img/b.png": "b"}, {
+        "/index.html": dict(page, uses=["/img/b.png"]),
+        "/img/b.png": {"hash": "b", "title": None, "files": [], "uses": [], "target": "elements"}})
+
+    output = str(tmp_path / "html")
+    assert shards.merge([str(tmp_path / "1"), str(tmp_path / "2")], output) == []
+    assert sorted(os.listdir(os.path.join(output, "img"))) == ["a.png", "b.png"]
+    with open(os.path.join(output, ".manifest.json")) as f:
+        manifest = json.load(f)
+    assert manifest["/index.html"]["uses"] == ["/img/a.png", "/img/b.png"]
+
+    write_shard(tmp_path / "2", {"index.html": "different index"}, {})
+    assert shards.merge([str(tmp_path / "1"), str(tmp_path / "2")], output) == ["index.html"]
+    with open(os.path.join(output, "index.html")) as f:
+        assert f.read() == "index"
+
+
+def test_merge_verification():
+    shard1 = {
+        "metadata": {"date": "2024-01-01", "shard": [1, 2],
+                     "tasks": [["lagrange", "triangle,1", "basix"]]},
+        "verification": {"lagrange": {"basix": {
+            "pass": ["triangle,1"], "fail": [], "not implemented": []}}}}
+    shard2 = {
+        "metadata": {"date": "2024-01-02", "shard": [2, 2],
+                     "tasks": [["lagrange", "triangle,1", "fiat"],
+                               ["lagrange", "triangle,2", "fiat"]]},
+        "verification": {"lagrange": {"fiat": {
+            "pass": [], "fail": ["triangle,1"], "not implemented": []}}}}
+
+    merged, problems = shards.merge_verification([shard1, shard2])
+    assert merged["metadata"] == {"date": "2024-01-02"}
+    assert merged["verification"] == {"lagrange": {
+        "basix": {"pass": ["triangle,1"], "fail": [], "not implemented": []},
+        "fiat": {"pass": [], "fail": ["triangle,1"], "not implemented": []}}}
+    assert problems == ["lagrange fiat triangle,2 does not have a result"]
+
+    shard2["verification"]["lagrange"]["basix"] = {
+        "pass": [], "fail": ["triangle,1"], "not implemented": []}
+    shard2["metadata"]["tasks"] = shard2["metadata"]["tasks"][:1]
+    merged, problems = shards.merge_verification([shard1, shard2])
+    assert problems == [
+        "lagrange basix triangle,1 has different results in different shards (pass vs fail)"]
+
+    merged, problems = shards.merge_verification([shard1])
+    assert problems == ["Shard 2/2 is missing"]
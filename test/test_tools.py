@@ -0,0 +1,51 @@
+import os
+import subprocess
+
+from defelement import settings, tools
+from defelement.markup import insert_dates
+
+
+def test_build_date_from_environment(monkeypatch):
+    monkeypatch.setattr(tools, "_build_date", [])
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+
+    assert tools.build_date().strftime("%Y-%m-%d") == "2023-11-14"
+    assert insert_dates("{{date:Y}} {{date:D-M-Y}}") == "2023 14-November-2023"
+
+
+def test_reproducible_build_date(monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    monkeypatch.setattr(settings, "reproducible", True)
+    monkeypatch.setattr(tools, "_build_date", [])
+    date = tools.build_date()
+
+    monkeypatch.setattr(tools, "_build_date", [])
+    assert tools.build_date() == date
+    assert date == tools.source_date()
+
+
+def test_changed_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "dir_path", str(tmp_path))
+
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+                       + list(args), cwd=tmp_path, check=True, capture_output=True)
+
+    git("init")
+    for file in ["a.def", "b.def", "c.py"]:
+        with open(os.path.join(tmp_path, file), "w") as f:
+            f.write("old\n")
+    git("add", ".")
+    git("commit", "-m", "Initial commit")
+
+    with open(os.path.join(tmp_path, "b.def"), "w") as f:
+        f.write("new\n")
+    with open(os.path.join(tmp_path, "d.def"), "w") as f:
+        f.write("new\n")
+    assert tools.changed_files("HEAD") == ["b.def", "d.def"]
+
+    git("add", ".")
+    git("commit", "-m", "Change b")
+    os.remove(os.path.join(tmp_path, "c.py"))
+    assert tools.changed_files("HEAD") == ["c.py"]
+    assert tools.changed_files("HEAD~1") == ["b.def", "c.py", "d.def"]
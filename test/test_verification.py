@@ -1,10 +1,17 @@
 import os
 
+import numpy as np
+import pytest
+import symfem
 import yaml
 
+from defelement import settings
 from defelement.element import Element
 from defelement.implementations import verifications
-from defelement.verification import verify
+from defelement.implementations.symfem import CachedSymfemTabulator
+from defelement.verification import (clearly_different, closure_dofs, entity_points, lattice_size,
+                                     points, reference_geometry, same_span, verify,
+                                     verify_implementation)
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 element_path = os.path.join(dir_path, "../elements")
@@ -18,7 +25,29 @@ def test_self():
     eg = [i for i in e.examples if "triangle" in i][0]
 
     info = verifications["symfem"](e, eg)
-    assert verify("triangle", info, info)[0]
+    stats = {}
+    assert verify("triangle", info, info, stats)[0]
+    assert verify("triangle", info, info, stats)[0]
+    assert stats == {"coarse checks": 2, "full checks skipped": 0, "extra coarse checks": 2,
+                     "full checks": 2}
+
+
+def test_tabulate_once():
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+
+    eg = [i for i in e.examples if "quadrilateral" in i][0]
+    edofs, tab = verifications["symfem"](e, eg)
+
+    calls = []
+
+    def counted_tab(points):
+        calls.append(points.shape)
+        return tab(points)
+
+    assert verify("quadrilateral", (edofs, counted_tab), (edofs, counted_tab))[0]
+    assert len(calls) == 2
 
 
 def test_variant():
@@ -61,4 +90,152 @@ def test_verify_bdm_vs_n2():
 
     info0 = verifications["symfem"](e0, eg)
     info1 = verifications["symfem"](e1, eg)
-    assert not verify("triangle", info0, info1)[0]
+    stats = {}
+    assert not verify("triangle", info0, info1, stats)[0]
+    assert stats == {"coarse checks": 1, "full checks skipped": 1, "extra coarse checks": 0,
+                     "full checks": 0}
+
+
+def test_same_span():
+    rng = np.random.default_rng(0)
+    table0 = rng.random((50, 2, 10))
+    table1 = table0 @ (rng.random((10, 10)) + 5 * np.eye(10))
+    assert same_span(table0, table1)
+    assert not same_span(table0, table1 + 1e-3 * rng.random(table1.shape))
+    assert same_span(table0, table1 + 1e-3 * rng.random(table1.shape), tol=0.1)
+    assert not same_span(table0, table1[:, :, :9])
+
+    # Tables that do not have full rank
+    table0[:, :, 9] = table0[:, :, 0] + table0[:, :, 1]
+    table1 = table0 @ (rng.random((10, 10)) + 5 * np.eye(10))
+    assert not same_span(table0, table1)
+    assert same_span(table0, table1, False)
+    table1[:, :, 3] = rng.random((50, 2))
+    assert not same_span(table0, table1, False)
+    assert same_span(np.zeros((5, 1, 3)), np.zeros((5, 1, 3)), False)
+
+
+def test_same_span_badly_conditioned():
+    # Monomials of degree up to 8 in each direction are very badly conditioned
+    pts = points("quadrilateral")
+    table0 = np.array([pts[:, 0] ** i * pts[:, 1] ** j
+                       for i in range(9) for j in range(9)]).T[:, None, :]
+    assert np.linalg.cond(table0[:, 0]) > 1e11
+    rng = np.random.default_rng(0)
+    table1 = table0 @ (rng.random((81, 81)) + 81 * np.eye(81))
+    assert same_span(table0, table1)
+    table1[:, :, 0] += 1e-3 * np.sin(7 * pts[:, :1])
+    assert not same_span(table0, table1)
+
+
+def test_clearly_different():
+    rng = np.random.default_rng(0)
+    # Tables whose rank is less than the number of columns
+    table0 = rng.random((8, 1, 5)) @ rng.random((5, 10))
+    table1 = table0 @ (rng.random((10, 10)) + 5 * np.eye(10))
+    assert not clearly_different(table0, table1)
+    assert not clearly_different(table0, table1 + 1e-8 * rng.random(table1.shape))
+    assert clearly_different(table0, rng.random((8, 1, 5)) @ rng.random((5, 10)))
+
+    table0 = rng.random((20, 1, 10))
+    table1 = table0 @ (rng.random((10, 10)) + 5 * np.eye(10))
+    assert not clearly_different(table0, table1)
+    assert clearly_different(table0, rng.random((20, 1, 10)))
+    # Small differences are left to be found by same_span
+    assert not clearly_different(table0, table1 + 1e-4 * rng.random(table1.shape))
+
+
+def test_clearly_different_badly_conditioned():
+    pts = points("quadrilateral")
+    table0 = np.array([pts[:, 0] ** i * pts[:, 1] ** j
+                       for i in range(9) for j in range(9)]).T[:, None, :]
+    rng = np.random.default_rng(0)
+    table1 = table0 @ (rng.random((81, 81)) + 81 * np.eye(81))
+    assert not clearly_different(table0[::4], table1[::4])
+
+
+@pytest.mark.parametrize("ref", ["interval", "quadrilateral", "triangle", "hexahedron",
+                                 "tetrahedron", "prism", "pyramid"])
+def test_reference_geometry(ref):
+    pts = points(ref)
+    assert pts is points(ref)
+    assert not pts.flags.writeable
+    with pytest.raises(ValueError):
+        pts[0, 0] = 1.0
+
+    r = symfem.create_reference(ref)
+    for d, epoints_d in enumerate(entity_points(ref)):
+        assert len(epoints_d) == r.sub_entity_count(d)
+        for e, epts in enumerate(epoints_d):
+            assert not epts.flags.writeable
+            vertices = [r.vertices[i] for i in r.sub_entities(d)[e]]
+            assert np.allclose(epts[0], np.array(vertices[0], dtype=float))
+            assert epts.shape == (len(points(r.sub_entity(d, e).name)), r.gdim)
+
+    geometry = reference_geometry(ref)
+    assert np.allclose(geometry.all_points[:len(pts)], pts)
+    for epoints_d, slices_d in zip(geometry.entity_points, geometry.entity_slices):
+        for epts, entity_slice in zip(epoints_d, slices_d):
+            assert np.allclose(geometry.all_points[entity_slice], epts)
+
+
+def test_closure_dofs():
+    entity_dofs = [[[0], [1], [2]], [[3], [4], [5]], [[6]]]
+    assert closure_dofs(entity_dofs, "triangle") == [
+        [[0], [1], [2]], [[1, 2, 3], [0, 2, 4], [0, 1, 5]], [[0, 1, 2, 3, 4, 5, 6]]]
+
+
+@pytest.mark.parametrize("ref, element, degree", [
+    ("triangle", "Lagrange", 3), ("triangle", "N1curl", 2), ("triangle", "Regge", 1),
+    ("quadrilateral", "Q", 2), ("triangle", "HCT", 3)])
+def test_compiled_symfem_tabulation(ref, element, degree):
+    e = symfem.create_element(ref, element, degree)
+    pts = reference_geometry(ref).all_points.copy()
+    compiled = CachedSymfemTabulator(e).tabulate(pts)
+    exact = CachedSymfemTabulator(e, exact=True).tabulate(pts)
+    assert compiled.shape == exact.shape == (pts.shape[0], e.range_dim, e.space_dim)
+    assert np.allclose(compiled, exact)
+
+
+def test_lattice_size():
+    assert lattice_size("tetrahedron") == 10
+    assert lattice_size("tetrahedron", 1) == 4
+    assert lattice_size("hexahedron", 5) == 10
+    assert lattice_size("pyramid", 1) == 10
+    assert len(points("tetrahedron", 1)) == 35
+    assert len(points("quadrilateral", 2)) == 49
+
+
+def test_degree_aware_points():
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+    eg0, eg1 = [i for i in e.examples if "quadrilateral,2" in i][:2]
+    info0 = verifications["symfem"](e, eg0)
+    info1 = verifications["symfem"](e, eg1)
+    assert verify("quadrilateral", info0, info1, degree=2)[0]
+
+    with open(os.path.join(element_path, "serendipity.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "serendipity")
+    info1 = verifications["symfem"](e, [i for i in e.examples if "quadrilateral,2" in i][0])
+    assert not verify("quadrilateral", info0, info1, degree=2)[0]
+
+
+def test_verify_implementation(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cache_path", str(tmp_path))
+
+    def tabulate(pts):
+        return np.array([[[1 - p[0] - p[1], p[0], p[1]]] for p in pts])
+
+    edofs = [[[0], [1], [2]], [[], [], []], [[]]]
+    assert verify_implementation("lagrange", "triangle,1,equispaced", edofs, tabulate) == (
+        True, None)
+
+    edofs = [[[1], [0], [2]], [[], [], []], [[]]]
+    v, info = verify_implementation("lagrange", "triangle,1,equispaced", edofs, tabulate)
+    assert not v
+    assert "Continuity does not match" in info
+
+    with pytest.raises(ValueError):
+        verify_implementation("not-an-element", "triangle,1", edofs, tabulate)
@@ -0,0 +1,67 @@
+import os
+
+import yaml
+
+from defelement import settings, verification_cache
+from defelement.element import Element
+from defelement.verification_cache import VerificationCache, affected_results, result_key
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+element_path = os.path.join(dir_path, "../elements")
+
+
+def test_result_key(monkeypatch):
+    with open(os.path.join(element_path, "lagrange.def")) as f:
+        data = yaml.load(f, Loader=yaml.FullLoader)
+    e = Element(data, "lagrange")
+    eg0, eg1 = e.examples[:2]
+
+    key = result_key(e, eg0, "symfem")
+    assert key is not None
+    assert result_key(e, eg0, "symfem") == key
+    assert result_key(e, eg1, "symfem") != key
+
+    monkeypatch.setitem(verification_cache.versions, "symfem", lambda: None)
+    assert result_key(e, eg0, "symfem") is None
+
+
+def test_code_hash(tmp_path, monkeypatch):
+    code = tmp_path / "code.py"
+    code.write_text("a = 1\n")
+    monkeypatch.setattr(verification_cache, "verification_code", [
+        os.path.relpath(code, settings.dir_path).replace(os.sep, "/")])
+    monkeypatch.setattr(verification_cache, "_hashes", {})
+    key = verification_cache.code_hash("basix")
+
+    code.write_text("a = 2\n")
+    monkeypatch.setattr(verification_cache, "_hashes", {})
+    assert verification_cache.code_hash("basix") != key
+
+
+def test_verification_cache(tmp_path):
+    filename = os.path.join(tmp_path, "results.json")
+    cache = VerificationCache(filename)
+    cache.set("a", "pass")
+    cache.set(None, "fail")
+    cache.save()
+
+    other = VerificationCache(filename)
+    other.set("b", "not implemented")
+    cache.set("c", "fail")
+    other.save()
+    cache.save()
+
+    cache = VerificationCache(filename)
+    assert cache.results == {"a": "pass", "b": "not implemented", "c": "fail"}
+    assert cache.get("a") == "pass"
+    assert cache.get("d") is None
+    assert cache.get(None) is None
+
+
+def test_affected_results():
+    assert affected_results([]) == (False, set(), set())
+    assert affected_results(["elements/lagrange.def", "README.md", "elements/README"]) == (
+        False, {"lagrange"}, set())
+    assert affected_results(["defelement/implementations/basix.py"]) == (False, set(), {"basix"})
+    assert affected_results(["defelement/implementations/symfem.py"])[0]
+    assert affected_results(["defelement/verification.py"])[0]
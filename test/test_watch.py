@@ -0,0 +1,25 @@
+import os
+
+from defelement import settings
+from defelement.watch import affected_targets, changed_files, select_targets
+
+
+def test_changed_files():
+    assert changed_files({"a": 1.0, "b": 1.0, "c": 1.0}, {"a": 1.0, "b": 2.0, "d": 1.0}) == [
+        "b", "c", "d"]
+
+
+def test_affected_targets():
+    assert affected_targets([
+        os.path.join(settings.pages_path, "index.md"), os.path.join(settings.img_path, "a.img")
+    ]) == ["pages", "sitemap"]
+    assert "elements" in affected_targets([os.path.join(settings.element_path, "lagrange.def")])
+    assert affected_targets([os.path.join(settings.template_path, "intro.html")]) is None
+    assert affected_targets([os.path.join(settings.dir_path, "README.md")]) == []
+
+
+def test_select_targets():
+    assert select_targets(["pages", "sitemap"], None) == ["pages", "sitemap"]
+    assert select_targets(None, None) is None
+    assert select_targets(["pages", "sitemap"], ["pages", "index"]) == ["pages"]
+    assert select_targets(None, ["pages", "index"]) == ["pages", "index"]
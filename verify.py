@@ -1,15 +1,25 @@
 """Perform verification checks."""
 
 import argparse
+import functools
 import json
 import os
+import subprocess
+import sys
+import traceback
 import typing
 from datetime import datetime
 
 from defelement import settings
 from defelement.element import Categoriser, Element
-from defelement.implementations import verifications
+from defelement.implementations import example_with_degree, parse_example, verifications
+from defelement.reference_tables import implementation_reference, stored_degree, symfem_reference
+from defelement.scheduling import (TimingDatabase, TimingKey, extrapolate_time, longest_first,
+                                   run_queue)
+from defelement.shards import in_shard, parse_shard
+from defelement.tools import changed_files
 from defelement.verification import verify
+from defelement.verification_cache import VerificationCache, affected_results, result_key
 
 start_all = datetime.now()
 
@@ -26,12 +36,58 @@ parser.add_argument('--print-reasons', default="false",
                     help="Show reasons for failed verification")
 parser.add_argument('--impl', metavar="impl", default=None,
                     help="libraries to run verification for")
+parser.add_argument('--timeout', metavar="timeout", default=None,
+                    help="The maximum time in seconds that verifying each example may take.")
+parser.add_argument('--log', metavar="log", default=None,
+                    help="Name of the file to write each result to as soon as it is known. "
+                    "By default, this is the output json file with the extension .jsonl.")
+parser.add_argument('--use-cache', default="true",
+                    help="Reuse results of examples whose inputs have not changed since a "
+                    "previous run.")
+parser.add_argument('--since', metavar="since", default=None,
+                    help="Only verify the elements and implementations affected by changes since "
+                    "this git revision, and take all other results from the existing output "
+                    "json file.")
+parser.add_argument('--pin-workers', default="false",
+                    help="Give each worker process the examples of only one implementation. The "
+                    "Symfem data for every example is computed first.")
+parser.add_argument('--pairwise', metavar="pairwise", default=None,
+                    help="Instead of verifying each implementation against Symfem, compare every "
+                    "pair of other implementations and write the results to this json file.")
+parser.add_argument('--shard', metavar="shard", default=None,
+                    help="Only verify the examples and implementations in shard i of N, given as "
+                    "i/N. The outputs of the shards can be combined using merge_verification.py.")
+parser.add_argument('--degrees', metavar="degrees", default=None,
+                    help="Also verify each element at every degree from start to end - 1, given as "
+                    "start:end. The extra examples are made from the element's examples.")
+parser.add_argument('--degree-budget', metavar="degree_budget", default="60",
+                    help="The maximum estimated time in seconds to spend verifying the extra "
+                    "examples of each element when using --degrees.")
+parser.add_argument('--exact-tabulation', default="false",
+                    help="Tabulate Symfem elements exactly rather than by compiling their basis "
+                    "functions. This is much slower.")
 
 args = parser.parse_args()
 if args.destination is not None:
     settings.verification_json = args.destination
 if args.processes is not None:
     settings.processes = int(args.processes)
+if args.shard is not None:
+    try:
+        settings.shard = parse_shard(args.shard)
+    except ValueError as err:
+        parser.error(str(err))
+degree_range: typing.Optional[typing.Tuple[int, int]] = None
+if args.degrees is not None:
+    if args.pairwise is not None:
+        parser.error("--degrees cannot be used with --pairwise")
+    try:
+        start, end = [int(i) for i in args.degrees.split(":")]
+    except ValueError:
+        parser.error(f"Invalid degrees: {args.degrees}. Degrees must be given as start:end")
+    degree_range = (start, end)
+degree_budget = float(args.degree_budget)
+settings.exact_symfem_tabulation = args.exact_tabulation == "true"
 if args.test is None:
     test_elements = None
 elif args.test == "auto":
@@ -48,6 +104,31 @@ else:
     test_implementations = args.impl.split(",")
 skip_missing = args.skip_missing_libraries == "true"
 print_reasons = args.print_reasons == "true"
+use_cache = args.use_cache == "true"
+pin_workers = args.pin_workers == "true"
+timeout = None if args.timeout is None else float(args.timeout)
+log_file = os.path.splitext(settings.verification_json)[0] + ".jsonl"
+if args.log is not None:
+    log_file = args.log
+
+# Find the results that are affected by changes since a git revision
+previous: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.List[str]]]]]
+previous = None
+changed_elements: typing.Set[str] = set()
+changed_implementations: typing.Set[str] = set()
+if args.since is not None:
+    try:
+        changed = changed_files(args.since)
+    except (OSError, subprocess.CalledProcessError) as err:
+        parser.error(f"Could not find the files changed since {args.since}: {err}")
+    everything, changed_elements, changed_implementations = affected_results(changed)
+    if everything:
+        print(f"The verification code has changed since {args.since}: verifying everything")
+    elif not os.path.isfile(settings.verification_json):
+        print(f"{settings.verification_json} does not exist: verifying everything")
+    else:
+        with open(settings.verification_json) as f:
+            previous = json.load(f)["verification"]
 
 categoriser = Categoriser()
 categoriser.load_references(os.path.join(settings.data_path, "references"))
@@ -56,117 +137,516 @@ categoriser.load_families(os.path.join(settings.data_path, "families"))
 # Load elements from .def files
 categoriser.load_folder(settings.element_path)
 
+
+def implementations_to_verify(e: Element) -> typing.List[str]:
+    """Get the implementations to verify the examples of an element for.
+
+    Args:
+        e: The element
+
+    Returns:
+        The implementations
+    """
+    return [
+        i for i in verifications
+        if i != "symfem" and e.implemented(i) and (
+            test_implementations is None or i in test_implementations)
+    ]
+
+
+def implements(e: Element, eg: str, implementation: str) -> bool:
+    """Check if an implementation supports the cell, degree and variant of an example.
+
+    Args:
+        e: The element
+        eg: The example
+        implementation: The implementation
+
+    Returns:
+        True if the example is supported, otherwise False
+    """
+    ref, degree, variant, _ = parse_example(eg)
+    try:
+        e.get_implementation_string(implementation, ref, degree, variant)
+    except NotImplementedError:
+        return False
+    return True
+
+
 elements_to_verify = []
 for e in categoriser.elements:
     if test_elements is None or e.filename in test_elements:
         for eg in e.examples:
-            implementations = [
-                i for i in verifications
-                if i != "symfem" and e.implemented(i) and (
-                    test_implementations is None or i in test_implementations)
-            ]
+            implementations = implementations_to_verify(e)
+            if args.pairwise is None:
+                implementations = [i for i in implementations
+                                   if in_shard(f"{e.filename} {eg} {i}")]
+            elif not in_shard(f"{e.filename} {eg}"):
+                # Every comparison for an example is done by the same shard
+                continue
             if len(implementations) > 0:
                 elements_to_verify.append((e, eg, implementations))
 
+# Make the extra examples of each degree, if sweeping degrees
+sweep: typing.Dict[int, typing.List[typing.Tuple[Element, str, typing.List[str]]]] = {}
+if degree_range is not None:
+    for e in categoriser.elements:
+        if test_elements is None or e.filename in test_elements:
+            for eg in e.degree_sweep(*degree_range):
+                if not implements(e, eg, "symfem"):
+                    continue
+                implementations = [i for i in implementations_to_verify(e)
+                                   if implements(e, eg, i) and in_shard(f"{e.filename} {eg} {i}")]
+                if len(implementations) > 0:
+                    sweep.setdefault(parse_example(eg)[1], []).append((e, eg, implementations))
+
+timings = TimingDatabase(os.path.join(settings.cache_path, "verification-timings.json"))
+cache = VerificationCache(os.path.join(settings.cache_path, "verification-results.json"))
+
+
+def estimate_time(task: typing.Tuple[Element, str, typing.List[str]]) -> float:
+    """Estimate the time it will take to verify an example.
+
+    Args:
+        task: The element, example and implementations to verify
+
+    Returns:
+        The estimated time in seconds
+    """
+    e, eg, implementations = task
+    return sum(timings.estimate((e.filename, eg, i)) for i in ["symfem"] + implementations)
+
+
+def estimate_sweep_time(task: typing.Tuple[Element, str, typing.List[str]]) -> float:
+    """Estimate the time it will take to verify an example of the degree sweep.
 
-def verify_examples(
-    egs: typing.List[typing.Tuple[Element, str, typing.List[str]]], process: str = "",
-    result_dict: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Dict[
-        str, typing.Dict[str, typing.List[str]]]]]] = None
-) -> typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.List[str]]]]:
-    """Verify examples.
+    If an example has not been verified before, the time is estimated from the times taken to
+    verify the same example at other degrees.
 
     Args:
-        egs: Examples
-        process: String to print on this process
-        result_dict: Dictionary to write results into
+        task: The element, example and implementations to verify
 
     Returns:
-        Results
+        The estimated time in seconds
+    """
+    assert degree_range is not None
+    e, eg, implementations = task
+    degree = parse_example(eg)[1]
+    total = 0.0
+    for i in ["symfem"] + implementations:
+        time = timings.get((e.filename, eg, i))
+        if time is None:
+            times = {}
+            for d in range(degree_range[1]):
+                t = timings.get((e.filename, example_with_degree(eg, d), i))
+                if d != degree and t is not None:
+                    times[d] = t
+            time = extrapolate_time(times, degree)
+        if time is None:
+            time = timings.estimate((e.filename, eg, i))
+        total += time
+    return total
+
+
+def previous_result(filename: str, implementation: str, eg: str) -> typing.Optional[str]:
+    """Get the result of an example from the existing output json file.
+
+    Results are only taken from this file if they are not affected by the changes since the
+    revision passed to --since.
+
+    Args:
+        filename: The filename of the element
+        implementation: The implementation
+        eg: The example
+
+    Returns:
+        The result, or None if the example needs to be verified
+    """
+    if previous is None or filename in changed_elements or (
+        implementation in changed_implementations
+    ):
+        return None
+    for result, examples in previous.get(filename, {}).get(implementation, {}).items():
+        if eg in examples:
+            return result
+    return None
+
+
+def print_result(filename: str, implementation: str, eg: str, result: str, extra: str = ""):
+    """Print a verification result.
+
+    Args:
+        filename: The filename of the element
+        implementation: The implementation
+        eg: The example
+        result: The result
+        extra: String to print after the result
     """
     green = "\033[32m"
     red = "\033[31m"
     blue = "\033[34m"
     default = "\033[0m"
 
-    results: typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.List[str]]]] = {}
-    for e, eg, implementations in egs:
-        if e.filename not in results:
-            results[e.filename] = {
-                i: {"pass": [], "fail": [], "not implemented": []}
-                for i in implementations
-            }
-        cell = eg.split(",")[0]
+    symbol = {"pass": f"{green}\u2713", "fail": f"{red}\u2715",
+              "not implemented": f"{blue}\u2013", "timeout": f"{red}timed out",
+              "error": f"{red}error"}[result]
+    print(f"{filename} {implementation} {eg} {symbol}{default}{extra}")
+
+
+def report_symfem_failure(
+    task: typing.Tuple[Element, str, typing.List[str]],
+    report: typing.Callable[[typing.Dict[str, typing.Any]], None], reason: str
+):
+    """Report that every implementation of an example failed because Symfem failed.
+
+    Args:
+        task: The element, example and implementations to verify
+        report: Function that each result is passed to as soon as it is known
+        reason: The reason Symfem failed
+    """
+    e, eg, implementations = task
+    for i in implementations:
+        report({"element": e.filename, "example": eg, "implementation": i, "result": "fail",
+                "time": None, "info": f"Symfem failed: {reason}"})
+
+
+def prepare_reference(
+    task: typing.Tuple[Element, str, typing.List[str]],
+    report: typing.Callable[[typing.Dict[str, typing.Any]], None]
+):
+    """Compute the Symfem data for an example.
+
+    Args:
+        task: The element, example and implementations to verify
+        report: Function that each result is passed to as soon as it is known
+    """
+    e, eg, _ = task
+    start = datetime.now()
+    try:
+        symfem_reference(e, eg)
+    except Exception:
+        report_symfem_failure(task, report, traceback.format_exc())
+        return
+    report({"element": e.filename, "example": eg, "implementation": "symfem", "result": None,
+            "time": (datetime.now() - start).total_seconds()})
+
+
+def verify_example(
+    task: typing.Tuple[Element, str, typing.List[str]],
+    report: typing.Callable[[typing.Dict[str, typing.Any]], None]
+):
+    """Verify an example.
 
-        sym_info = verifications["symfem"](e, eg)
+    Args:
+        task: The element, example and implementations to verify
+        report: Function that each result is passed to as soon as it is known
+    """
+    e, eg, implementations = task
+    cell = eg.split(",")[0]
+
+    start = datetime.now()
+    try:
+        sym_edofs, sym_tab, degree = symfem_reference(e, eg)
+    except Exception:
+        report_symfem_failure(task, report, traceback.format_exc())
+        return
+    if not pin_workers:
+        # If workers are pinned, the Symfem data has already been computed by prepare_reference
+        report({"element": e.filename, "example": eg, "implementation": "symfem",
+                "result": None, "time": (datetime.now() - start).total_seconds()})
+    for i in implementations:
+        try:
+            start = datetime.now()
+            vinfo = verifications[i](e, eg)
+            example_stats: typing.Dict[str, int] = {}
+            v, info = verify(cell, vinfo, (sym_edofs, sym_tab), example_stats, degree)
+            report({"element": e.filename, "example": eg, "implementation": i,
+                    "result": "pass" if v else "fail",
+                    "time": (datetime.now() - start).total_seconds(),
+                    "info": None if v else info, "stats": example_stats})
+        except ImportError as err:
+            if skip_missing:
+                print(f"{i} not installed")
+            else:
+                raise err
+        except NotImplementedError:
+            report({"element": e.filename, "example": eg, "implementation": i,
+                    "result": "not implemented",
+                    "time": (datetime.now() - start).total_seconds()})
+
+
+def log_result(entry: typing.Dict[str, typing.Any]):
+    """Write a result to the log.
+
+    Args:
+        entry: The result
+    """
+    log.write(json.dumps(entry) + "\n")
+    log.flush()
+
+
+def on_report(index: int, entry: typing.Dict[str, typing.Any]):
+    """Record a result.
+
+    Args:
+        index: The index of the task
+        entry: The result
+    """
+    log_result(entry)
+    for key, value in entry.get("stats", {}).items():
+        stats[key] = stats.get(key, 0) + value
+    if entry["time"] is not None:
+        timings.set((entry["element"], entry["example"], entry["implementation"]), entry["time"])
+    if entry["result"] is not None:
+        reported.add((entry["element"], entry["example"], entry["implementation"]))
+        print_result(entry["element"], entry["implementation"], entry["example"], entry["result"])
+        if entry["result"] == "fail" and print_reasons:
+            print(f"  {entry['info']}")
+
+
+def on_failure(
+    tasks: typing.List[typing.Tuple[Element, str, typing.List[str]]], index: int, reason: str
+):
+    """Record the results of a task that failed.
+
+    Args:
+        tasks: The tasks
+        index: The index of the task
+        reason: The reason the task failed
+    """
+    e, eg, implementations = tasks[index]
+    result = "timeout" if reason.startswith("Timed out") else "error"
+    for i in implementations:
+        if (e.filename, eg, i) not in reported:
+            log_result({"element": e.filename, "example": eg, "implementation": i,
+                        "result": result, "time": None, "info": reason})
+            print_result(e.filename, i, eg, result)
+    failed.append((e.filename, eg, reason))
+
+
+def compare_example(
+    task: typing.Tuple[Element, str, typing.List[str]],
+    report: typing.Callable[[typing.Dict[str, typing.Any]], None]
+):
+    """Compare every pair of implementations of an example.
+
+    Args:
+        task: The element, example and implementations to compare
+        report: Function that each result is passed to as soon as it is known
+    """
+    e, eg, implementations = task
+    cell = eg.split(",")[0]
+    degree = stored_degree(e, eg)
+
+    infos = {}
+    for i in implementations:
+        try:
+            infos[i] = implementation_reference(e, eg, i, degree)
+        except ImportError as err:
+            if skip_missing:
+                print(f"{i} not installed")
+            else:
+                raise err
+        except NotImplementedError:
+            report({"element": e.filename, "example": eg, "implementations": [i],
+                    "result": "not implemented"})
+    for n, i in enumerate(infos):
+        for j in list(infos)[n + 1:]:
+            v, info = verify(cell, infos[i], infos[j], degree=degree)
+            report({"element": e.filename, "example": eg, "implementations": [i, j],
+                    "result": "pass" if v else "fail", "info": None if v else info})
+
+
+def on_pairwise_report(index: int, entry: typing.Dict[str, typing.Any]):
+    """Record the result of comparing two implementations.
+
+    Args:
+        index: The index of the task
+        entry: The result
+    """
+    matrix = agreement.setdefault(entry["element"], {}).setdefault(entry["example"], {})
+    if entry["result"] == "not implemented":
+        matrix.setdefault(entry["implementations"][0], {})
+        return
+    i, j = entry["implementations"]
+    matrix.setdefault(i, {})[j] = entry["result"]
+    matrix.setdefault(j, {})[i] = entry["result"]
+    print_result(entry["element"], f"{i}/{j}", entry["example"], entry["result"])
+    if entry["result"] == "fail" and print_reasons:
+        print(f"  {entry['info']}")
+
+
+def on_pairwise_failure(index: int, reason: str):
+    """Record a comparison that failed.
+
+    Args:
+        index: The index of the task
+        reason: The reason the task failed
+    """
+    e, eg, implementations = pairwise_tasks[index]
+    failed.append((e.filename, eg, reason))
+
+
+def run_verification(tasks: typing.List[typing.Tuple[Element, str, typing.List[str]]]):
+    """Verify examples, using cached results for examples whose inputs have not changed.
+
+    Args:
+        tasks: The elements, examples and implementations to verify
+    """
+    to_verify = []
+    cached = 0
+    unchanged = 0
+    for e, eg, implementations in tasks:
+        missing = []
         for i in implementations:
-            try:
-                vinfo = verifications[i](e, eg)
-                v, info = verify(cell, vinfo, sym_info)
-                if v:
-                    results[e.filename][i]["pass"].append(eg)
-                    print(f"{process}{e.filename} {i} {eg} {green}\u2713{default}")
-                else:
-                    results[e.filename][i]["fail"].append(eg)
-                    print(f"{process}{e.filename} {i} {eg} {red}\u2715{default}")
-                    if print_reasons:
-                        print(f"  {info}")
-            except ImportError as err:
-                if skip_missing:
-                    print(f"{process}{i} not installed")
-                else:
-                    raise err
-            except NotImplementedError:
-                results[e.filename][i]["not implemented"].append(eg)
-                print(f"{process}{e.filename} {i} {eg} {blue}\u2013{default}")
-
-    if result_dict is not None:
-        result_dict[process] = results
-    return results
-
-
-if settings.processes == 1:
-    data = verify_examples(elements_to_verify)
-else:
-    import multiprocessing
-
-    p = settings.processes
-    n_egs = len(elements_to_verify)
-
-    jobs = []
-    manager = multiprocessing.Manager()
-    results = manager.dict()
-    for i in range(p):
-        process = multiprocessing.Process(
-            target=verify_examples,
-            args=(elements_to_verify[n_egs * i // p: n_egs * (i + 1) // p], f"[{i}] ", results)
-        )
-        jobs.append(process)
-
-    for j in jobs:
-        j.start()
-
-    for j in jobs:
-        j.join()
-
-    for j in jobs:
-        assert j.exitcode == 0
-
-    data = {}
-    for r in results.values():
-        for i0, j0 in r.items():
-            if i0 not in data:
-                data[i0] = {}
-            for i1, j1 in j0.items():
-                if i1 not in data[i0]:
-                    data[i0][i1] = {}
-                for i2, j2 in j1.items():
-                    if i2 not in data[i0][i1]:
-                        data[i0][i1][i2] = []
-                    data[i0][i1][i2] += j2
+            result = previous_result(e.filename, i, eg)
+            if result is not None:
+                log_result({"element": e.filename, "example": eg, "implementation": i,
+                            "result": result, "time": None, "unchanged": True})
+                print_result(e.filename, i, eg, result, " (unchanged)")
+                unchanged += 1
+                continue
+            result = cache.get(result_key(e, eg, i)) if use_cache else None
+            if result is None:
+                missing.append(i)
+            else:
+                log_result({"element": e.filename, "example": eg, "implementation": i,
+                            "result": result, "time": None, "cached": True})
+                print_result(e.filename, i, eg, result, " (cached)")
+                cached += 1
+        if len(missing) > 0:
+            to_verify.append((e, eg, missing))
+    if previous is not None:
+        print(f"Using {unchanged} results from {settings.verification_json}")
+    print(f"Using {cached} cached results")
+
+    to_verify = longest_first(to_verify, [estimate_time(t) for t in to_verify])
+    if pin_workers:
+        # Compute the Symfem data first, then verify each implementation on its own workers
+        run_queue(prepare_reference, to_verify, on_report,
+                  functools.partial(on_failure, to_verify), settings.processes, timeout,
+                  "Symfem examples")
+        not_prepared = [(filename, eg) for filename, eg, _ in failed]
+        pinned = [(e, eg, [i]) for e, eg, implementations in to_verify
+                  if (e.filename, eg) not in not_prepared for i in implementations
+                  if (e.filename, eg, i) not in reported]
+        pinned = longest_first(pinned, [timings.estimate((e.filename, eg, i[0]))
+                                        for e, eg, i in pinned])
+        run_queue(verify_example, pinned, on_report, functools.partial(on_failure, pinned),
+                  settings.processes, timeout, "examples", [i[0] for _, _, i in pinned])
+    else:
+        run_queue(verify_example, to_verify, on_report,
+                  functools.partial(on_failure, to_verify), settings.processes, timeout,
+                  "examples")
+
+
+failed: typing.List[typing.Tuple[str, str, str]] = []
+
+if args.pairwise is not None:
+    agreement: typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.Dict[str, str]]]] = {}
+    pairwise_tasks = [t for t in elements_to_verify if len(t[2]) > 1]
+    run_queue(compare_example, pairwise_tasks, on_pairwise_report, on_pairwise_failure,
+              settings.processes, timeout, "examples")
+    with open(args.pairwise, "w") as f:
+        json.dump({
+            "metadata": {"date": datetime.now().strftime("%Y-%m-%d")},
+            "agreement": agreement,
+        }, f, indent=1, sort_keys=True)
+    disagreements = [
+        (filename, eg, i, j) for filename, egs in agreement.items() for eg, m in egs.items()
+        for i, row in m.items() for j, result in row.items() if i < j and result == "fail"]
+    print(f"{len(disagreements)} pairs of implementations disagree")
+    for filename, eg, i, j in disagreements:
+        print(f"  {filename} {eg}: {i} vs {j}")
+    if len(failed) > 0:
+        print("Comparison of the following examples did not finish:")
+        for filename, eg, reason in failed:
+            print(f"  {filename} {eg}")
+            print("    " + reason.strip().replace("\n", "\n    "))
+    sys.exit(1 if len(failed) > 0 or len(disagreements) > 0 else 0)
 
+log = open(log_file, "w")
+reported: typing.Set[TimingKey] = set()
+stats: typing.Dict[str, int] = {}
+
+run_verification(elements_to_verify)
+verified = list(elements_to_verify)
+
+# Sweep the degrees, stopping for each element when its time would exceed the budget
+sweep_time: typing.Dict[str, float] = {}
+stopped: typing.Dict[str, int] = {}
+for degree in sorted(sweep):
+    by_element: typing.Dict[str, typing.List[typing.Tuple[Element, str, typing.List[str]]]] = {}
+    for task in sweep[degree]:
+        by_element.setdefault(task[0].filename, []).append(task)
+    wave = []
+    for filename, tasks in by_element.items():
+        if filename in stopped:
+            continue
+        estimate = sum(estimate_sweep_time(t) for t in tasks)
+        if sweep_time.get(filename, 0.0) + estimate > degree_budget:
+            stopped[filename] = degree
+            continue
+        wave += tasks
+    if len(wave) == 0:
+        continue
+    print(f"Verifying {len(wave)} extra examples of degree {degree}")
+    run_verification(wave)
+    verified += wave
+    for task in wave:
+        # Now that these examples have been verified, their estimated times are the measured times
+        filename = task[0].filename
+        sweep_time[filename] = sweep_time.get(filename, 0.0) + estimate_sweep_time(task)
+if degree_range is not None:
+    print(f"Verified {len(verified) - len(elements_to_verify)} extra examples")
+    for filename, degree in stopped.items():
+        print(f"  {filename}: stopped before degree {degree} (budget exceeded)")
+log.close()
+timings.save()
+if stats.get("coarse checks", 0) > 0:
+    print(f"The coarse check rejected {stats['full checks skipped']} of "
+          f"{stats['coarse checks']} comparisons, so {stats['full checks']} full checks were "
+          f"needed and {stats['extra coarse checks']} coarse checks were extra work")
+
+# Assemble the results from the log
+elements = {e.filename: e for e, _, _ in verified}
+results: typing.Dict[TimingKey, str] = {}
+with open(log_file) as f:
+    for line in f:
+        entry = json.loads(line)
+        key = (entry["element"], entry["example"], entry["implementation"])
+        if entry["result"] in ["pass", "fail", "not implemented"]:
+            results[key] = entry["result"]
+            if not entry.get("cached", False) and not entry.get("unchanged", False):
+                cache.set(result_key(elements[key[0]], key[1], key[2]), entry["result"])
+cache.save()
+
+data: typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.List[str]]]] = {}
+for e, eg, implementations in verified:
+    if e.filename not in data:
+        data[e.filename] = {}
+    for i in implementations:
+        if i not in data[e.filename]:
+            data[e.filename][i] = {"pass": [], "fail": [], "not implemented": []}
+        if (e.filename, eg, i) in results:
+            data[e.filename][i][results[(e.filename, eg, i)]].append(eg)
+
+metadata: typing.Dict[str, typing.Any] = {"date": datetime.now().strftime("%Y-%m-%d")}
+if settings.shard is not None:
+    metadata["shard"] = list(settings.shard)
+    metadata["tasks"] = [[e.filename, eg, i] for e, eg, implementations in verified
+                         for i in implementations]
+if degree_range is not None:
+    metadata["degrees"] = list(degree_range)
 with open(settings.verification_json, "w") as f:
     json.dump({
-        "metadata": {"date": datetime.now().strftime("%Y-%m-%d")},
+        "metadata": metadata,
         "verification": data,
     }, f)
+
+if len(failed) > 0:
+    print("Verification of the following examples did not finish:")
+    for filename, eg, reason in failed:
+        print(f"  {filename} {eg}")
+        print("    " + reason.strip().replace("\n", "\n    "))
+    sys.exit(1)
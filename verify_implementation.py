@@ -0,0 +1,59 @@
+"""Verify an implementation of an element that is not part of DefElement."""
+
+import argparse
+import importlib
+import sys
+
+from defelement import settings
+from defelement.element import load_element
+from defelement.verification import verify_implementation
+
+parser = argparse.ArgumentParser(description="Verify an implementation of an element")
+parser.add_argument('element', metavar='element',
+                    help="Filename of the element's .def file (without the extension).")
+parser.add_argument('function', metavar='function',
+                    help="The function that creates the implementation, given as module:function. "
+                    "This function is called with the element and example, and must return the "
+                    "entity DOFs and a tabulation function.")
+parser.add_argument('examples', metavar='examples', nargs="*",
+                    help="The examples to verify. By default, every example of the element is "
+                    "verified.")
+parser.add_argument('--reference-dir', metavar="reference_dir", default=None,
+                    help="Folder containing the Symfem tables, as made by "
+                    "export_reference_tables.py. By default, the tables are stored in "
+                    "~/.cache/defelement/reference-tables.")
+
+args = parser.parse_args()
+if args.reference_dir is not None:
+    settings.reference_tables_path = args.reference_dir
+
+if ":" not in args.function:
+    parser.error(f"Invalid function: {args.function}. Functions must be given as module:function")
+module_name, function_name = args.function.split(":", 1)
+try:
+    function = getattr(importlib.import_module(module_name), function_name)
+except (ImportError, AttributeError) as err:
+    parser.error(f"Could not import {args.function}: {err}")
+
+try:
+    element = load_element(args.element)
+except ValueError as err:
+    parser.error(str(err))
+if not element.implemented("symfem"):
+    parser.error(f"{args.element} is not implemented in Symfem, so cannot be verified")
+examples = element.examples if len(args.examples) == 0 else args.examples
+
+failed = 0
+for eg in examples:
+    try:
+        entity_dofs, tabulate = function(args.element, eg)
+    except NotImplementedError:
+        print(f"{args.element} {eg} not implemented")
+        continue
+    v, info = verify_implementation(args.element, eg, entity_dofs, tabulate)
+    print(f"{args.element} {eg} {'pass' if v else 'fail'}")
+    if not v:
+        failed += 1
+        print(f"  {info}")
+
+sys.exit(1 if failed > 0 else 0)